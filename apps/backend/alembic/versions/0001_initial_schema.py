@@ -0,0 +1,143 @@
+"""initial schema with query indexes
+
+Indexes cover the parent dashboard, provider lookup and usage queries;
+daily_usage(user_id, date) is already served by uq_user_date.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 16:48:28.551680
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('timezone', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+
+    op.create_table('children',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=False),
+    sa.Column('primary_language', sa.String(length=10), nullable=False),
+    sa.Column('learning_languages', sa.JSON(), nullable=False),
+    sa.Column('character_id', sa.String(length=50), nullable=False),
+    sa.Column('login_code', sa.String(length=6), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.CheckConstraint('age BETWEEN 3 AND 8', name='check_age_range'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('login_code')
+    )
+    with op.batch_alter_table('children', schema=None) as batch_op:
+        batch_op.create_index('ix_children_user_id', ['user_id'], unique=False)
+
+    op.create_table('daily_usage',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('total_sessions', sa.Integer(), nullable=False),
+    sa.Column('total_duration_ms', sa.BigInteger(), nullable=False),
+    sa.Column('total_tokens', sa.Integer(), nullable=False),
+    sa.Column('total_cost_usd', sa.Numeric(precision=10, scale=4), nullable=False),
+    sa.Column('llm_tokens', sa.Integer(), nullable=False),
+    sa.Column('tts_chars', sa.Integer(), nullable=False),
+    sa.Column('stt_seconds', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('speculative_tts_chars', sa.Integer(), nullable=False),
+    sa.Column('speculative_cost_usd', sa.Numeric(precision=10, scale=4), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'date', name='uq_user_date')
+    )
+    op.create_table('provider_configs',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('provider_type', sa.String(length=20), nullable=False),
+    sa.Column('provider_name', sa.String(length=50), nullable=False),
+    sa.Column('api_key_encrypted', sa.Text(), nullable=True),
+    sa.Column('model_name', sa.String(length=100), nullable=True),
+    sa.Column('config_json', sa.JSON(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('provider_configs', schema=None) as batch_op:
+        batch_op.create_index('ix_provider_configs_user_type_name', ['user_id', 'provider_type', 'provider_name'], unique=False)
+
+    op.create_table('conversations',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('child_id', sa.Uuid(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('total_tokens', sa.Integer(), nullable=False),
+    sa.Column('estimated_cost_usd', sa.Numeric(precision=10, scale=6), nullable=False),
+    sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.create_index('ix_conversations_child_id_started_at', ['child_id', 'started_at'], unique=False)
+        batch_op.create_index('ix_conversations_started_at', ['started_at'], unique=False)
+
+    op.create_table('messages',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('conversation_id', sa.Uuid(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('emotion', sa.String(length=20), nullable=True),
+    sa.Column('audio_duration_ms', sa.Integer(), nullable=True),
+    sa.Column('tokens_used', sa.Integer(), nullable=False),
+    sa.Column('cost_usd', sa.Numeric(precision=10, scale=6), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_messages_conversation_id_created_at', ['conversation_id', 'created_at'], unique=False)
+
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_conversation_id_created_at')
+
+    op.drop_table('messages')
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_started_at')
+        batch_op.drop_index('ix_conversations_child_id_started_at')
+
+    op.drop_table('conversations')
+    with op.batch_alter_table('provider_configs', schema=None) as batch_op:
+        batch_op.drop_index('ix_provider_configs_user_type_name')
+
+    op.drop_table('provider_configs')
+    op.drop_table('daily_usage')
+    with op.batch_alter_table('children', schema=None) as batch_op:
+        batch_op.drop_index('ix_children_user_id')
+
+    op.drop_table('children')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
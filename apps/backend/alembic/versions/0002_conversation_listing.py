@@ -0,0 +1,47 @@
+"""conversation message counters and keyset indexes
+
+Listing pages on (started_at, id), so both conversation indexes gain id as a
+tiebreaker; message_count and audio_duration_ms are backfilled from messages.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 17:20:04.118233
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('audio_duration_ms', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.drop_index('ix_conversations_started_at')
+        batch_op.drop_index('ix_conversations_child_id_started_at')
+        batch_op.create_index('ix_conversations_child_id_started_at_id', ['child_id', 'started_at', 'id'], unique=False)
+        batch_op.create_index('ix_conversations_started_at_id', ['started_at', 'id'], unique=False)
+
+    op.execute(
+        "UPDATE conversations SET "
+        "message_count = (SELECT count(*) FROM messages WHERE messages.conversation_id = conversations.id), "
+        "audio_duration_ms = (SELECT coalesce(sum(audio_duration_ms), 0) FROM messages "
+        "WHERE messages.conversation_id = conversations.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_started_at_id')
+        batch_op.drop_index('ix_conversations_child_id_started_at_id')
+        batch_op.create_index('ix_conversations_child_id_started_at', ['child_id', 'started_at'], unique=False)
+        batch_op.create_index('ix_conversations_started_at', ['started_at'], unique=False)
+        batch_op.drop_column('audio_duration_ms')
+        batch_op.drop_column('message_count')
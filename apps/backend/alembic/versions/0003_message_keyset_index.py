@@ -0,0 +1,32 @@
+"""message keyset index
+
+Message pages are ordered by (created_at, id); including id lets the index
+serve the tiebreak without a sort.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 17:58:41.530912
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_conversation_id_created_at')
+        batch_op.create_index('ix_messages_conversation_id_created_at_id', ['conversation_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_conversation_id_created_at_id')
+        batch_op.create_index('ix_messages_conversation_id_created_at', ['conversation_id', 'created_at'], unique=False)
@@ -0,0 +1,55 @@
+"""full-text search over messages (SQLite FTS5)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 18:36:12.204581
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.search import FTS_CREATE_SQL, FTS_DELETE_TRIGGER_SQL, segment
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    op.execute(FTS_CREATE_SQL)
+    op.execute(FTS_DELETE_TRIGGER_SQL)
+
+    # Existing messages, in rowid batches (segmentation happens in Python)
+    last = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT messages.rowid, messages.content, conversations.child_id FROM messages "
+                "JOIN conversations ON conversations.id = messages.conversation_id "
+                "WHERE messages.rowid > :last ORDER BY messages.rowid LIMIT :n"
+            ),
+            {"last": last, "n": BACKFILL_BATCH},
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("INSERT INTO messages_fts (rowid, body, child) VALUES (:rowid, :body, :child)"),
+            [{"rowid": rowid, "body": segment(content), "child": child} for rowid, content, child in rows],
+        )
+        last = rows[-1][0]
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER IF EXISTS messages_fts_delete")
+    op.execute("DROP TABLE IF EXISTS messages_fts")
@@ -0,0 +1,52 @@
+"""conversation archive segments
+
+Manifest of compressed per-child segment files holding archived messages.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 17:00:04.278184
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('archive_segments',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('child_id', sa.Uuid(), nullable=False),
+    sa.Column('path', sa.String(length=255), nullable=False),
+    sa.Column('conversation_count', sa.Integer(), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('first_started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archive_segments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archive_segments_child_id'), ['child_id'], unique=False)
+
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('archive_segment_id', sa.Uuid(), nullable=True))
+        batch_op.create_foreign_key('fk_conversations_archive_segment_id', 'archive_segments', ['archive_segment_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_conversations_archive_segment_id', type_='foreignkey')
+        batch_op.drop_column('archive_segment_id')
+
+    with op.batch_alter_table('archive_segments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archive_segments_child_id'))
+
+    op.drop_table('archive_segments')
@@ -0,0 +1,55 @@
+"""image jobs
+
+Background image generation jobs; workers claim queued rows, results are cached
+on disk by content hash.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 21:12:37.604118
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('image_jobs',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('dedupe_key', sa.String(length=64), nullable=False),
+    sa.Column('prompt', sa.Text(), nullable=False),
+    sa.Column('style', sa.Text(), nullable=False),
+    sa.Column('provider', sa.String(length=50), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('content_type', sa.String(length=50), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=True),
+    sa.Column('cost_usd', sa.Numeric(precision=10, scale=4), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_image_jobs_status_created_at', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_image_jobs_user_id_dedupe_key', ['user_id', 'dedupe_key'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_image_jobs_user_id_dedupe_key')
+        batch_op.drop_index('ix_image_jobs_status_created_at')
+
+    op.drop_table('image_jobs')
@@ -0,0 +1,36 @@
+"""message llm routing
+
+Records which model answered each character message, the routing tier and reason
+that chose it, and the LLM call latency.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 22:03:51.219874
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('llm_model', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('route_tier', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('route_reason', sa.String(length=40), nullable=True))
+        batch_op.add_column(sa.Column('llm_latency_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_column('llm_latency_ms')
+        batch_op.drop_column('route_reason')
+        batch_op.drop_column('route_tier')
+        batch_op.drop_column('llm_model')
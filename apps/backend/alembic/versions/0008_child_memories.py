@@ -0,0 +1,37 @@
+"""child memories
+
+Per-child long-term memory index (compressed turns plus a read watermark) used to
+recall earlier conversations without replaying them.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 22:47:15.830261
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('child_memories',
+    sa.Column('child_id', sa.Uuid(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.Column('last_message_created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_message_id', sa.Uuid(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('child_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('child_memories')
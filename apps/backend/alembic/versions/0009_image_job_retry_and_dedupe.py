@@ -0,0 +1,58 @@
+"""image job retry backoff and unique dedupe
+
+Jobs sent back to the queue by a provider outage wait until not_before; at most one
+job per account and picture may be live (not failed).
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 09:41:26.318570
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Duplicates that racing submits already created: of each picture's live jobs keep the
+# furthest along (succeeded, then running), the newest among equals
+_RANK = "CASE {t}.status WHEN 'succeeded' THEN 2 WHEN 'running' THEN 1 ELSE 0 END"
+FAIL_DUPLICATES_SQL = f"""
+UPDATE image_jobs SET status = 'failed', error = 'duplicate'
+WHERE status != 'failed' AND EXISTS (
+    SELECT 1 FROM image_jobs AS better
+    WHERE better.user_id = image_jobs.user_id
+      AND better.dedupe_key = image_jobs.dedupe_key
+      AND better.status != 'failed'
+      AND ({_RANK.format(t="better")} > {_RANK.format(t="image_jobs")}
+           OR ({_RANK.format(t="better")} = {_RANK.format(t="image_jobs")}
+               AND (better.created_at > image_jobs.created_at
+                    OR (better.created_at = image_jobs.created_at AND better.id > image_jobs.id))))
+)
+"""
+
+
+def upgrade() -> None:
+    op.execute(FAIL_DUPLICATES_SQL)
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('not_before', sa.DateTime(timezone=True), nullable=True))
+        batch_op.drop_index('ix_image_jobs_user_id_dedupe_key')
+        batch_op.create_index(
+            'uq_image_jobs_user_id_dedupe_key',
+            ['user_id', 'dedupe_key'],
+            unique=True,
+            sqlite_where=sa.text("status != 'failed'"),
+            postgresql_where=sa.text("status != 'failed'"),
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.drop_index('uq_image_jobs_user_id_dedupe_key')
+        batch_op.create_index('ix_image_jobs_user_id_dedupe_key', ['user_id', 'dedupe_key'], unique=False)
+        batch_op.drop_column('not_before')
@@ -0,0 +1,54 @@
+import hashlib
+import uuid
+
+from fastapi import Request, Response, status
+
+from app.config import settings
+from app.services.data_version import data_versions
+
+# Dashboard data changes with every conversation turn: always revalidate, never share
+DASHBOARD_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def user_etag(request: Request, user_id: uuid.UUID, *parts) -> str | None:
+    """ETag for a read of user_id's data, built from their data version and the request URL.
+
+    None while a committed write has not bumped the version yet, and while a replica may
+    still be behind the latest write, so a read is never cached under the wrong version.
+    """
+    if not data_versions.settled(user_id):
+        return None
+    if settings.database_replica_url and data_versions.changed_within(
+        user_id, settings.database_replica_max_lag_seconds
+    ):
+        return None
+    return make_etag(data_versions.tag(user_id), request.url.path, request.url.query, *parts)
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(
+    request: Request, response: Response, etag: str | None, cache_control: str = DASHBOARD_CACHE_CONTROL
+) -> Response | None:
+    """Set the caching headers; returns a 304 to send instead when the client's copy is current."""
+    response.headers["Cache-Control"] = cache_control
+    if etag is None:
+        return None
+    response.headers["ETag"] = etag
+    if _matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.caching import make_etag, not_modified
 from app.database import get_db
 from app.models.child import Child
 from app.prompts.character import CHARACTER_PROFILES
 
 router = APIRouter(prefix="/character", tags=["character"])
 
+CHARACTER_EMOTIONS = ["happy", "curious", "sad", "excited", "encouraging", "empathetic", "patient", "gentle"]
+# Profiles only change with a deploy, so they version every character ETag
+PROFILES_VERSION = make_etag(sorted((k, sorted(v.items())) for k, v in CHARACTER_PROFILES.items()), CHARACTER_EMOTIONS)
+# The child can switch character at any time, so clients revalidate; a match costs
+# one primary-key lookup and no serialization
+CHARACTER_CACHE_CONTROL = "private, no-cache"
+
 
 class CharacterResponse(BaseModel):
     character_id: str
@@ -18,12 +28,16 @@ class CharacterResponse(BaseModel):
 
 
 @router.get("/{child_id}", response_model=CharacterResponse)
-async def get_character(child_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Child).where(Child.id == child_id))
-    child = result.scalar_one_or_none()
+async def get_character(child_id: uuid.UUID, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(Child.character_id, Child.primary_language).where(Child.id == child_id))
+    child = result.one_or_none()
     if not child:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Child not found")
 
+    etag = make_etag(PROFILES_VERSION, child.character_id, child.primary_language)
+    if cached := not_modified(request, response, etag, CHARACTER_CACHE_CONTROL):
+        return cached
+
     profile = CHARACTER_PROFILES.get(child.character_id, CHARACTER_PROFILES["bear"])
     name_key = f"name_{child.primary_language}"
     name = profile.get(name_key, profile["name_en"])
@@ -32,5 +46,5 @@ async def get_character(child_id: str, db: AsyncSession = Depends(get_db)):
         character_id=child.character_id,
         name=name,
         personality=profile["personality"],
-        emotions=["happy", "curious", "sad", "excited", "encouraging", "empathetic", "patient", "gentle"],
+        emotions=CHARACTER_EMOTIONS,
     )
@@ -0,0 +1,38 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.sql import ColumnElement
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(at: datetime, row_id: uuid.UUID) -> str:
+    """Opaque cursor pointing at the last row of a page."""
+    raw = json.dumps([at.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        at, row_id = json.loads(raw)
+        return datetime.fromisoformat(at), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_before(at_col, id_col, cursor: str) -> ColumnElement[bool]:
+    """Rows after the cursor in (at, id) descending order."""
+    at, row_id = decode_cursor(cursor)
+    # Row-value comparison lets SQLite and Postgres seek the (.., at, id) index directly
+    return tuple_(at_col, id_col) < (at, row_id)
+
+
+def keyset_after(at_col, id_col, cursor: str) -> ColumnElement[bool]:
+    """Rows after the cursor in (at, id) ascending order."""
+    at, row_id = decode_cursor(cursor)
+    return tuple_(at_col, id_col) > (at, row_id)
@@ -5,6 +5,8 @@ from app.api.parent.children import router as children_router
 from app.api.parent.providers import router as providers_router
 from app.api.parent.usage import router as usage_router
 from app.api.parent.conversations import router as conversations_router
+from app.api.parent.export import router as export_router
+from app.api.parent.images import router as images_router
 
 router = APIRouter(prefix="/api/parent")
 router.include_router(auth_router)
@@ -12,3 +14,5 @@ router.include_router(children_router)
 router.include_router(providers_router)
 router.include_router(usage_router)
 router.include_router(conversations_router)
+router.include_router(export_router)
+router.include_router(images_router)
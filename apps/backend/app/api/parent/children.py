@@ -2,15 +2,17 @@ import random
 import string
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.api.caching import not_modified, user_etag
+from app.database import get_db, get_read_db
 from app.models.user import User
 from app.models.child import Child
 from app.schemas.child import ChildCreate, ChildUpdate, ChildResponse
 from app.auth.security import get_current_user
+from app.services.data_version import data_versions
 
 router = APIRouter(prefix="/children", tags=["children"])
 
@@ -35,6 +37,7 @@ async def create_child(
         login_code=_generate_login_code(),
     )
     db.add(child)
+    data_versions.touch(db, user.id)
     await db.commit()
     await db.refresh(child)
     return child
@@ -42,9 +45,13 @@ async def create_child(
 
 @router.get("", response_model=list[ChildResponse])
 async def list_children(
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    if cached := not_modified(request, response, user_etag(request, user.id)):
+        return cached
     result = await db.execute(select(Child).where(Child.user_id == user.id))
     return result.scalars().all()
 
@@ -64,6 +71,7 @@ async def update_child(
     for field, value in req.model_dump(exclude_unset=True).items():
         setattr(child, field, value)
 
+    data_versions.touch(db, user.id)
     await db.commit()
     await db.refresh(child)
     return child
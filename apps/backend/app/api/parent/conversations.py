@@ -1,15 +1,36 @@
 import uuid
+from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, literal_column, select, table
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
-from app.database import get_db
+from app.api.caching import not_modified, user_etag
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_after, keyset_before
+from app.api.serialization import (
+    MESSAGE_COLUMNS,
+    JSONBytesResponse,
+    archived_message_dicts,
+    conversation_dict,
+    encode_ndjson,
+    message_dicts,
+)
+from app.database import get_read_db, read_sessionmaker
 from app.models.user import User
 from app.models.child import Child
-from app.models.conversation import Conversation
-from app.schemas.conversation import ConversationResponse, ConversationDetailResponse
+from app.models.archive_segment import ArchiveSegment
+from app.models.conversation import Conversation, Message
+from app.schemas.conversation import (
+    ConversationResponse,
+    ConversationDetailResponse,
+    MessageResponse,
+    MessageSearchHit,
+)
+from app.services.archive import load_archived_messages
+from app.services.search import build_match_query, make_snippet, query_terms
 from app.auth.security import get_current_user
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
@@ -17,45 +38,231 @@ router = APIRouter(prefix="/conversations", tags=["conversations"])
 
 @router.get("", response_model=list[ConversationResponse])
 async def list_conversations(
+    request: Request,
+    response: Response,
     child_id: uuid.UUID | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=20, ge=1, le=100),
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    # Get all child IDs belonging to this parent
-    children_result = await db.execute(select(Child.id).where(Child.user_id == user.id))
-    child_ids = [row[0] for row in children_result.all()]
+    """Newest first. When more rows exist, the next page's cursor is returned in X-Next-Cursor."""
+    if cached := not_modified(request, response, user_etag(request, user.id)):
+        return cached
+    # Each of the parent's children contributes at most one page from its own
+    # (child_id, started_at, id) index range, so the final sort never grows with history
+    per_child = aliased(Conversation)
+    page_ids = select(per_child.id).where(per_child.child_id == Child.id)
+    if since:
+        page_ids = page_ids.where(per_child.started_at >= since)
+    if until:
+        page_ids = page_ids.where(per_child.started_at < until)
+    if cursor:
+        page_ids = page_ids.where(keyset_before(per_child.started_at, per_child.id, cursor))
+    page_ids = page_ids.order_by(per_child.started_at.desc(), per_child.id.desc()).limit(limit + 1)
 
-    if not child_ids:
+    query = select(Conversation).join(Child, Conversation.id.in_(page_ids.correlate(Child))).where(Child.user_id == user.id)
+    if child_id:
+        query = query.where(Child.id == child_id)
+    query = query.order_by(Conversation.started_at.desc(), Conversation.id.desc()).limit(limit + 1)
+    result = await db.execute(query)
+    conversations = result.scalars().all()
+
+    if len(conversations) > limit:
+        conversations = conversations[:limit]
+        last = conversations[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.started_at, last.id)
+    return conversations
+
+
+_messages_fts = table("messages_fts")
+
+
+@router.get("/search", response_model=list[MessageSearchHit])
+async def search_messages(
+    q: str = Query(min_length=1, max_length=200),
+    child_id: uuid.UUID | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0, le=1000),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Messages matching every word of `q` across the parent's children, best matches first.
+
+    Only conversations still in the hot tables are searched: once archived (after
+    `archive_after_days` of inactivity) their messages leave the index. Archived
+    conversations stay listed and readable, and are included in exports.
+    """
+    terms = query_terms(q)
+    children_query = select(Child.id).where(Child.user_id == user.id)
+    if child_id:
+        children_query = children_query.where(Child.id == child_id)
+    child_ids = list((await db.execute(children_query)).scalars())
+    if not terms or not child_ids:
         return []
 
-    query = select(Conversation).where(Conversation.child_id.in_(child_ids))
-    if child_id and child_id in child_ids:
-        query = select(Conversation).where(Conversation.child_id == child_id)
+    columns = (Message.id, Message.conversation_id, Conversation.child_id, Message.role, Message.content, Message.created_at)
+    if db.bind.dialect.name == "sqlite":
+        # Only the body column contributes to the score
+        rank = func.bm25(literal_column("messages_fts"), 1.0, 0.0)
+        query = (
+            select(*columns)
+            .select_from(_messages_fts)
+            .join(Message, literal_column("messages.rowid") == literal_column("messages_fts.rowid"))
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .where(literal_column("messages_fts").op("MATCH")(build_match_query(terms, [c.hex for c in child_ids])))
+            .order_by(rank)
+        )
+    else:
+        query = (
+            select(*columns)
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .where(Conversation.child_id.in_(child_ids), *(Message.content.ilike(f"%{term}%") for term in terms))
+            .order_by(Message.created_at.desc())
+        )
 
-    query = query.order_by(Conversation.started_at.desc()).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+    rows = (await db.execute(query.limit(limit).offset(offset))).all()
+    hits = []
+    for message_id, conversation_id, hit_child_id, role, content, created_at in rows:
+        snippet, highlights = make_snippet(content, terms)
+        hits.append(
+            MessageSearchHit(
+                message_id=message_id,
+                conversation_id=conversation_id,
+                child_id=hit_child_id,
+                role=role,
+                created_at=created_at,
+                snippet=snippet,
+                highlights=highlights,
+            )
+        )
+    return hits
 
 
 @router.get("/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation(
     conversation_id: uuid.UUID,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    # Verify parent owns this child in the same query
     result = await db.execute(
-        select(Conversation)
-        .options(selectinload(Conversation.messages))
-        .where(Conversation.id == conversation_id)
+        select(Conversation, ArchiveSegment.path)
+        .join(Child, Child.id == Conversation.child_id)
+        .outerjoin(ArchiveSegment, ArchiveSegment.id == Conversation.archive_segment_id)
+        .where(Conversation.id == conversation_id, Child.user_id == user.id)
     )
-    conv = result.scalar_one_or_none()
-    if not conv:
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
 
-    # Verify parent owns this child
-    child_result = await db.execute(select(Child).where(Child.id == conv.child_id, Child.user_id == user.id))
-    if not child_result.scalar_one_or_none():
+    conv, archive_path = row
+    if archive_path:
+        messages = archived_message_dicts(await load_archived_messages(archive_path, conv.id))
+    else:
+        result = await db.execute(
+            select(*MESSAGE_COLUMNS)
+            .where(Message.conversation_id == conv.id)
+            .order_by(Message.created_at, Message.id)
+        )
+        messages = message_dicts(result.all())
+    return JSONBytesResponse({**conversation_dict(conv), "messages": messages})
+
+
+NDJSON_BATCH_SIZE = 500
+
+
+def _messages_query(conversation_id: uuid.UUID, user_id: uuid.UUID, cursor: str | None):
+    # Outer join: an owned conversation always yields a row (message columns None when
+    # it has none left), so ownership and the page come back from a single query
+    join_on = Message.conversation_id == Conversation.id
+    if cursor:
+        join_on = and_(join_on, keyset_after(Message.created_at, Message.id, cursor))
+    return (
+        select(ArchiveSegment.path.label("archive_path"), *MESSAGE_COLUMNS)
+        .select_from(Conversation)
+        .join(Child, Child.id == Conversation.child_id)
+        .outerjoin(ArchiveSegment, ArchiveSegment.id == Conversation.archive_segment_id)
+        .outerjoin(Message, join_on)
+        .where(Conversation.id == conversation_id, Child.user_id == user_id)
+        .order_by(Message.created_at, Message.id)
+    )
+
+
+async def _archived_messages(archive_path: str, conversation_id: uuid.UUID, cursor: str | None) -> list[dict]:
+    messages = await load_archived_messages(archive_path, conversation_id)
+    if cursor:
+        after = decode_cursor(cursor)
+        messages = [m for m in messages if (m["created_at"], uuid.UUID(m["id"])) > after]
+    return archived_message_dicts(messages)
+
+
+async def _stream_archived(messages: list[dict]):
+    for i in range(0, len(messages), NDJSON_BATCH_SIZE):
+        yield encode_ndjson(messages[i:i + NDJSON_BATCH_SIZE])
+
+
+async def _stream_messages(db: AsyncSession, result, batches, first: list):
+    try:
+        yield encode_ndjson(message_dicts(row[1:] for row in first if row.id is not None))
+        async for rows in batches:
+            yield encode_ndjson(message_dicts(row[1:] for row in rows))
+    finally:
+        await result.close()
+        await db.close()
+
+
+@router.get("/{conversation_id}/messages", response_model=list[MessageResponse])
+async def list_messages(
+    conversation_id: uuid.UUID,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    format: Literal["json", "ndjson"] = Query(default="json"),
+    user: User = Depends(get_current_user),
+):
+    """Oldest first, paged via X-Next-Cursor.
+
+    With format=ndjson every message after the cursor is streamed one JSON object per
+    line from a server-side cursor, so memory stays flat however long the conversation.
+    """
+    db = (await read_sessionmaker())()
+    query = _messages_query(conversation_id, user.id, cursor)
+
+    if format == "ndjson":
+        try:
+            result = await db.stream(query.execution_options(yield_per=NDJSON_BATCH_SIZE))
+            # The first batch settles ownership; partitions() must drive the whole read,
+            # rows buffered by an earlier fetchone() would be skipped
+            batches = result.partitions()
+            first = await anext(batches, [])
+        except BaseException:
+            await db.close()
+            raise
+        if not first or first[0].archive_path:
+            await result.close()
+            await db.close()
+        if not first:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+        if first[0].archive_path:
+            # Archived segments are bounded in size, so reading one whole conversation is fine
+            archived = await _archived_messages(first[0].archive_path, conversation_id, cursor)
+            return StreamingResponse(_stream_archived(archived), media_type="application/x-ndjson")
+        return StreamingResponse(_stream_messages(db, result, batches, first), media_type="application/x-ndjson")
+
+    async with db:
+        rows = (await db.execute(query.limit(limit + 1))).all()
+    if not rows:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
 
-    return conv
+    if rows[0].archive_path:
+        messages = (await _archived_messages(rows[0].archive_path, conversation_id, cursor))[: limit + 1]
+    else:
+        messages = message_dicts(row[1:] for row in rows if row.id is not None)
+    headers = {}
+    if len(messages) > limit:
+        messages = messages[:limit]
+        last = messages[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last["created_at"], uuid.UUID(str(last["id"])))
+    return JSONBytesResponse(messages, headers=headers)
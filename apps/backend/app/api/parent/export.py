@@ -0,0 +1,206 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+import zlib
+from datetime import date
+from typing import AsyncIterator, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_read_db, read_sessionmaker
+from app.models.user import User
+from app.models.child import Child
+from app.models.archive_segment import ArchiveSegment
+from app.models.conversation import Conversation, Message
+from app.auth.security import get_current_user
+from app.services.archive import iter_segment
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_COLUMNS = [
+    "child_id",
+    "child_name",
+    "conversation_id",
+    "conversation_started_at",
+    "message_id",
+    "role",
+    "content",
+    "language",
+    "emotion",
+    "created_at",
+]
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Held for the whole stream; exports beyond the cap are turned away rather than queued
+_export_slots = asyncio.Semaphore(settings.export_max_concurrent)
+
+
+class _ExportResponse(StreamingResponse):
+    """Gives the export slot back however the response ends.
+
+    The stream's own cleanup would miss a client gone before the first chunk: the
+    body iterator is then never started, so its finally never runs.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            _export_slots.release()
+
+
+def _export_query(child_id: uuid.UUID):
+    # Per child, conversations and messages both come off their indexes in order,
+    # so the database only ever sorts within a single conversation
+    return (
+        select(
+            Child.id,
+            Child.name,
+            Conversation.id,
+            Conversation.started_at,
+            Message.id,
+            Message.role,
+            Message.content,
+            Message.language,
+            Message.emotion,
+            Message.created_at,
+        )
+        .select_from(Conversation)
+        .join(Child, Child.id == Conversation.child_id)
+        .join(Message, Message.conversation_id == Conversation.id)
+        .where(Conversation.child_id == child_id)
+        .order_by(Conversation.started_at, Conversation.id, Message.created_at, Message.id)
+    )
+
+
+def _value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_value, row))), ensure_ascii=False) + "\n" for row in rows
+    )
+
+
+def _csv_encoder():
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def encode(rows) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_value(v) for v in row] for row in rows)
+        return buffer.getvalue()
+
+    return encode
+
+
+async def _archived_batches(db: AsyncSession, child_id: uuid.UUID, child_name: str) -> AsyncIterator[list[tuple]]:
+    """Export rows of a child's archived conversations, one segment per batch, oldest first."""
+    segments = await db.execute(
+        select(ArchiveSegment.id, ArchiveSegment.path)
+        .where(ArchiveSegment.child_id == child_id)
+        .order_by(ArchiveSegment.first_started_at)
+    )
+    for segment_id, path in segments.all():
+        started = dict(
+            (await db.execute(
+                select(Conversation.id, Conversation.started_at).where(Conversation.archive_segment_id == segment_id)
+            )).all()
+        )
+        records = await asyncio.to_thread(lambda: list(iter_segment(path)))
+        yield [
+            (
+                child_id, child_name, conversation_id, started.get(uuid.UUID(conversation_id)),
+                m["id"], m["role"], m["content"], m["language"], m["emotion"], m["created_at"],
+            )
+            for conversation_id, messages in records
+            for m in messages
+        ]
+
+
+async def _stream_export(
+    children: list[tuple[uuid.UUID, str]], fmt: str, compress: bool
+) -> AsyncIterator[bytes]:
+    """Reads the transcript in batches (archive segments, then a server-side cursor over
+    the hot tables); memory is one batch."""
+    if fmt == "csv":
+        encode = _csv_encoder()
+        header = ",".join(EXPORT_COLUMNS) + "\r\n"
+    else:
+        encode = _encode_ndjson
+        header = ""
+    # wbits=31 writes a gzip container
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode()
+        return compressor.compress(data) if compressor else data
+
+    if header:
+        yield emit(header)
+    async with (await read_sessionmaker())() as db:
+        for child_id, child_name in children:
+            async for rows in _archived_batches(db, child_id, child_name):
+                chunk = emit(encode(rows))
+                if chunk:
+                    yield chunk
+            result = await db.stream(
+                _export_query(child_id).execution_options(yield_per=settings.export_batch_size)
+            )
+            try:
+                async for rows in result.partitions():
+                    chunk = emit(encode(rows))
+                    if chunk:
+                        yield chunk
+            finally:
+                await result.close()
+    if compressor:
+        yield compressor.flush()
+
+
+@router.get("")
+async def export_transcripts(
+    child_id: uuid.UUID | None = Query(default=None),
+    format: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    gzip: bool = Query(default=False),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Every message of one child (or the whole account), streamed as NDJSON or CSV."""
+    if _export_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many exports in progress, try again shortly",
+            headers={"Retry-After": "30"},
+        )
+    # Taken here, with no await since the check, and handed to the response to release
+    await _export_slots.acquire()
+    try:
+        query = select(Child.id, Child.name).where(Child.user_id == user.id).order_by(Child.created_at, Child.id)
+        if child_id:
+            query = query.where(Child.id == child_id)
+        children = [tuple(row) for row in (await db.execute(query)).all()]
+        if child_id and not children:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Child not found")
+    except BaseException:
+        _export_slots.release()
+        raise
+
+    filename = f"transcripts-{date.today().isoformat()}.{format}" + (".gz" if gzip else "")
+    return _ExportResponse(
+        _stream_export(children, format, gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
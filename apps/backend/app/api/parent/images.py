@@ -0,0 +1,91 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.caching import not_modified
+from app.database import get_db
+from app.models.image_job import IMAGE_JOB_FAILED, IMAGE_JOB_SUCCEEDED, ImageJob
+from app.models.user import User
+from app.schemas.image import ImageJobCreate, ImageJobResponse
+from app.auth.security import get_current_user
+from app.services.image_jobs import cache_path, image_jobs
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+# Suggested status polling interval while a job is queued or running
+POLL_AFTER_SECONDS = 2
+# Image bytes are addressed by their hash and never change
+IMAGE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _job_response(request: Request, response: Response, job: ImageJob) -> ImageJobResponse:
+    body = ImageJobResponse.model_validate(job)
+    if job.status == IMAGE_JOB_SUCCEEDED:
+        body.image_url = str(request.url_for("get_image_job_image", job_id=job.id).path)
+    elif job.status != IMAGE_JOB_FAILED:
+        response.headers["Retry-After"] = str(POLL_AFTER_SECONDS)
+    return body
+
+
+async def _get_job(db: AsyncSession, job_id: uuid.UUID, user: User) -> ImageJob:
+    result = await db.execute(select(ImageJob).where(ImageJob.id == job_id, ImageJob.user_id == user.id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image job not found")
+    return job
+
+
+@router.post("/jobs", response_model=ImageJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_image_job(
+    req: ImageJobCreate,
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue an image generation and return at once; poll the job for its result.
+
+    Submitting a picture the account already has queued, running or generated returns
+    that job (200) instead of starting another one (202).
+    """
+    try:
+        job, created = await image_jobs.submit(db, user.id, req.prompt, req.style)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return _job_response(request, response, job)
+
+
+@router.get("/jobs/{job_id}", response_model=ImageJobResponse)
+async def get_image_job(
+    job_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return _job_response(request, response, await _get_job(db, job_id, user))
+
+
+@router.get("/jobs/{job_id}/image")
+async def get_image_job_image(
+    job_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    job = await _get_job(db, job_id, user)
+    if job.status != IMAGE_JOB_SUCCEEDED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not ready")
+    etag = f'"{job.content_hash}"'
+    if cached := not_modified(request, response, etag, IMAGE_CACHE_CONTROL):
+        return cached
+    path = cache_path(job.content_hash)
+    if not path.exists():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image no longer cached")
+    return FileResponse(path, media_type=job.content_type, headers={"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL})
@@ -1,10 +1,11 @@
 from datetime import date, timedelta
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.api.caching import not_modified, user_etag
+from app.database import get_read_db
 from app.models.user import User
 from app.models.daily_usage import DailyUsage
 from app.schemas.usage import DailyUsageResponse, UsageSummaryResponse
@@ -15,11 +16,17 @@ router = APIRouter(prefix="/usage", tags=["usage"])
 
 @router.get("/daily", response_model=list[DailyUsageResponse])
 async def get_daily_usage(
+    request: Request,
+    response: Response,
     days: int = Query(default=7, ge=1, le=90),
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    since = date.today() - timedelta(days=days)
+    today = date.today()
+    # The window moves at midnight without any write
+    if cached := not_modified(request, response, user_etag(request, user.id, today)):
+        return cached
+    since = today - timedelta(days=days)
     result = await db.execute(
         select(DailyUsage)
         .where(DailyUsage.user_id == user.id, DailyUsage.date >= since)
@@ -30,9 +37,13 @@ async def get_daily_usage(
 
 @router.get("/summary", response_model=UsageSummaryResponse)
 async def get_usage_summary(
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    if cached := not_modified(request, response, user_etag(request, user.id)):
+        return cached
     result = await db.execute(
         select(
             func.coalesce(func.sum(DailyUsage.total_sessions), 0),
@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import Response
+
+from app.models.conversation import Conversation, Message
+from app.schemas.conversation import ConversationResponse, MessageResponse
+
+# Fast path for the large conversation payloads: rows are selected as plain columns in
+# schema field order and encoded straight to JSON bytes by orjson, skipping per-row
+# model validation. The output matches what the response models would produce.
+# OPT_UTC_Z renders UTC offsets as "Z", like pydantic does.
+_OPTIONS = orjson.OPT_UTC_Z
+
+MESSAGE_FIELDS = tuple(MessageResponse.model_fields)
+MESSAGE_COLUMNS = tuple(getattr(Message, field) for field in MESSAGE_FIELDS)
+CONVERSATION_FIELDS = tuple(ConversationResponse.model_fields)
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def dumps(value) -> bytes:
+    return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+
+def message_dicts(rows) -> list[dict]:
+    """Rows holding MESSAGE_COLUMNS values, in order, as response dicts."""
+    return [dict(zip(MESSAGE_FIELDS, row)) for row in rows]
+
+
+def archived_message_dicts(messages: list[dict]) -> list[dict]:
+    return [{field: message[field] for field in MESSAGE_FIELDS} for message in messages]
+
+
+def conversation_dict(conversation: Conversation) -> dict:
+    return {field: getattr(conversation, field) for field in CONVERSATION_FIELDS}
+
+
+def encode_ndjson(items: list[dict]) -> bytes:
+    return b"".join(dumps(item) + b"\n" for item in items)
+
+
+class JSONBytesResponse(Response):
+    """JSON response rendered with orjson, for payloads built by the helpers above."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,25 +1,111 @@
 import base64
-import json
+import functools
 import uuid
 import logging
+from typing import AsyncIterable
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from sqlalchemy import select
 
 from app.database import async_session
 from app.models.child import Child
 from app.auth.security import decode_token
+from app.providers.base import TTS_FORMATS, TTSResponse
+from app.providers.resilience import ProviderUnavailableError
 from app.services.conversation import ConversationSession
+from app.services.coordination import coordination
+from app.services.metrics import metrics
+from app.services.session_store import hot_sessions, live_sessions
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Multiple of 3 so every base64 frame of a segment except its last is unpadded (clients join
+# a segment's base64 strings before decoding), and of 2 so pcm frames hold whole 16-bit samples.
+AUDIO_CHUNK_SIZE = 65532
+
+
+def _frame(message: dict) -> str:
+    return orjson.dumps(message).decode()
+
+
+async def _send(websocket: WebSocket, message: dict) -> None:
+    # orjson encodes a 64 KiB audio chunk several times faster than send_json's json.dumps
+    await websocket.send_text(_frame(message))
+
+
+# Constant frames are encoded once
+FRAME_LISTENING = _frame({"type": "processing", "stage": "listening"})
+FRAME_THINKING = _frame({"type": "processing", "stage": "thinking"})
+FRAME_NO_AUDIO = _frame({"type": "error", "message": "No audio data"})
+FRAME_CHILD_NOT_FOUND = _frame({"type": "error", "message": "Child not found"})
+FRAME_SESSION_ENDED = _frame({"type": "session_ended"})
+# The worker is shutting down: reconnect (resuming the conversation, if any) to another one
+FRAME_RECONNECT = _frame({"type": "reconnect"})
+
+
+def _accepted_formats(formats: str) -> tuple[str, ...]:
+    """The client's comma-separated TTS formats, in its order, keeping the ones we know."""
+    return tuple(dict.fromkeys(f for f in formats.lower().split(",") if f in TTS_FORMATS))
+
+
+def _provider_unavailable_frame(e: ProviderUnavailableError) -> dict:
+    # Don't leak SDK error text to the kid's UI; the client can retry after the hint
+    frame = {"type": "error", "message": "provider_unavailable"}
+    if e.retry_after is not None:
+        frame["retry_after"] = round(e.retry_after, 1)
+    return frame
+
+
+async def _stream_response(websocket: WebSocket, head: dict, segments: AsyncIterable[TTSResponse]) -> None:
+    """Send response_start, then each audio segment as soon as it is ready, then audio_end."""
+    audio_format = head.get("format", "mp3")
+    start = {"type": "response_start", "emotion": head.get("emotion", "neutral"), "format": audio_format}
+    for key in ("child_text", "child_emotion"):
+        if key in head:
+            start[key] = head[key]
+    await _send(websocket, start)
+
+    sent = 0
+    async for segment in segments:
+        # Each segment is a complete clip that clients start playing at its segment_end, so
+        # its bytes stay in its own frames; only its last frame may be base64-padded
+        audio = segment.audio_bytes
+        for i in range(0, len(audio), AUDIO_CHUNK_SIZE):
+            frame = {
+                "type": "audio_chunk",
+                "data": base64.b64encode(audio[i:i + AUDIO_CHUNK_SIZE]).decode(),
+                "format": audio_format,
+                "segment": segment.segment_index,
+            }
+            if segment.sample_rate:
+                frame["sample_rate"] = segment.sample_rate
+            await _send(websocket, frame)
+        sent += len(audio)
+        await _send(websocket, {
+            "type": "segment_end",
+            "segment": segment.segment_index,
+            "segments": segment.segment_count,
+            "text": segment.text,
+        })
+
+    metrics.inc("tts_audio_bytes_total", sent, format=audio_format)
+
+    await _send(websocket, {
+        "type": "audio_end",
+        "transcript": head.get("text", ""),
+    })
+
 
 @router.websocket("/ws/voice/{child_id}")
 async def voice_websocket(
     websocket: WebSocket,
     child_id: uuid.UUID,
     token: str = Query(...),
+    resume: uuid.UUID | None = Query(default=None),
+    # TTS formats the client plays, most preferred first, e.g. "opus,mp3"; mp3 when absent
+    formats: str = Query(default=""),
 ):
     # Authenticate
     try:
@@ -29,34 +115,74 @@ async def voice_websocket(
         return
 
     await websocket.accept()
+    if live_sessions.draining:
+        await websocket.send_text(FRAME_RECONNECT)
+        await websocket.close(code=1012)
+        return
 
     async with async_session() as db:
-        # Verify child belongs to user
-        result = await db.execute(
-            select(Child).where(Child.id == child_id, Child.user_id == user_id)
-        )
-        child = result.scalar_one_or_none()
-        if not child:
-            await websocket.send_json({"type": "error", "message": "Child not found"})
-            await websocket.close(code=4004)
-            return
-
-        # Start conversation session
-        session = ConversationSession(db=db, child=child, user_id=user_id)
-        await session.start()
-        await websocket.send_json({"type": "session_started", "conversation_id": str(session.conversation.id)})
+        # A quick reconnect picks up the parked in-memory session (ownership checked against it)
+        session = hot_sessions.take(resume, user_id=user_id, child_id=child_id) if resume else None
+        if session:
+            await session.reattach(db)
+        else:
+            # Verify child belongs to user
+            result = await db.execute(
+                select(Child).where(Child.id == child_id, Child.user_id == user_id)
+            )
+            child = result.scalar_one_or_none()
+            if not child:
+                await websocket.send_text(FRAME_CHILD_NOT_FOUND)
+                await websocket.close(code=4004)
+                return
+
+            # Resume the previous conversation if it is recent enough, else start a new one
+            session = ConversationSession(db=db, child=child, user_id=user_id)
+            if not (resume and await session.resume(resume)):
+                await session.start()
+
+        session.set_audio_formats(_accepted_formats(formats))
+        if session.resumed:
+            coordination.publish("session_resumed", {"conversation_id": str(session.conversation.id)})
+        await _send(websocket, {
+            "type": "session_started",
+            "conversation_id": str(session.conversation.id),
+            "resumed": session.resumed,
+        })
 
         audio_buffer = bytearray()
-
+        handed_off = False
+
+        async def hand_off() -> None:
+            # Called by a drain, or by this loop once it notices one; the close makes the
+            # receive below raise, which ends the session
+            nonlocal handed_off
+            if handed_off:
+                return
+            handed_off = True
+            await _send(websocket, {"type": "reconnect", "conversation_id": str(session.conversation.id)})
+            await websocket.close(code=1012)
+
+        live_sessions.register(websocket, hand_off)
         try:
             while True:
+                if live_sessions.draining:
+                    await hand_off()
+                    await session.end()
+                    break
                 raw = await websocket.receive_text()
-                msg = json.loads(raw)
+                msg = orjson.loads(raw)
                 msg_type = msg.get("type", "")
+                # A drain may have begun while we waited; it is waiting for turns to finish,
+                # so nothing new starts here (ending the session is still honoured)
+                if live_sessions.draining and msg_type != "end_session":
+                    await hand_off()
+                    await session.end()
+                    break
 
                 if msg_type == "audio_start":
                     audio_buffer = bytearray()
-                    await websocket.send_json({"type": "processing", "stage": "listening"})
+                    await websocket.send_text(FRAME_LISTENING)
 
                 elif msg_type == "audio_chunk":
                     chunk = base64.b64decode(msg.get("data", ""))
@@ -64,81 +190,54 @@ async def voice_websocket(
 
                 elif msg_type == "audio_end":
                     if not audio_buffer:
-                        await websocket.send_json({"type": "error", "message": "No audio data"})
+                        await websocket.send_text(FRAME_NO_AUDIO)
                         continue
 
-                    await websocket.send_json({"type": "processing", "stage": "thinking"})
+                    await websocket.send_text(FRAME_THINKING)
 
+                    sink = functools.partial(_stream_response, websocket)
                     try:
-                        result = await session.process_audio(bytes(audio_buffer))
+                        async with live_sessions.turn():
+                            result = await session.process_audio(bytes(audio_buffer), sink=sink)
+                    except WebSocketDisconnect:
+                        raise
+                    except ProviderUnavailableError as e:
+                        logger.warning(f"Provider unavailable for child {child_id}: {e}")
+                        await _send(websocket, _provider_unavailable_frame(e))
+                        continue
                     except Exception as e:
                         logger.exception("Error processing audio")
-                        await websocket.send_json({"type": "error", "message": str(e)})
+                        await _send(websocket, {"type": "error", "message": str(e)})
                         continue
 
                     if "error" in result:
-                        await websocket.send_json({"type": "error", "message": result["error"]})
-                        continue
-
-                    # Send response
-                    await websocket.send_json({
-                        "type": "response_start",
-                        "emotion": result.get("emotion", "neutral"),
-                        "child_text": result.get("child_text", ""),
-                        "child_emotion": result.get("child_emotion", "neutral"),
-                    })
-
-                    # Send audio in chunks (64KB each)
-                    audio = result.get("audio", b"")
-                    chunk_size = 65536
-                    for i in range(0, len(audio), chunk_size):
-                        chunk = audio[i:i + chunk_size]
-                        await websocket.send_json({
-                            "type": "audio_chunk",
-                            "data": base64.b64encode(chunk).decode(),
-                            "format": result.get("format", "mp3"),
-                        })
-
-                    await websocket.send_json({
-                        "type": "audio_end",
-                        "transcript": result.get("text", ""),
-                    })
+                        await _send(websocket, {"type": "error", "message": result["error"]})
 
                 elif msg_type == "command":
                     action = msg.get("action", "")
                     value = msg.get("value", "")
-                    result = await session.handle_command(action, value)
-
-                    if "error" in result:
-                        await websocket.send_json({"type": "error", "message": result["error"]})
+                    sink = functools.partial(_stream_response, websocket)
+                    try:
+                        async with live_sessions.turn():
+                            result = await session.handle_command(action, value, sink=sink)
+                    except ProviderUnavailableError as e:
+                        logger.warning(f"Provider unavailable for child {child_id}: {e}")
+                        await _send(websocket, _provider_unavailable_frame(e))
                         continue
 
-                    await websocket.send_json({
-                        "type": "response_start",
-                        "emotion": result.get("emotion", "neutral"),
-                    })
-
-                    audio = result.get("audio", b"")
-                    chunk_size = 65536
-                    for i in range(0, len(audio), chunk_size):
-                        chunk = audio[i:i + chunk_size]
-                        await websocket.send_json({
-                            "type": "audio_chunk",
-                            "data": base64.b64encode(chunk).decode(),
-                            "format": result.get("format", "mp3"),
-                        })
-
-                    await websocket.send_json({
-                        "type": "audio_end",
-                        "transcript": result.get("text", ""),
-                    })
+                    if "error" in result:
+                        await _send(websocket, {"type": "error", "message": result["error"]})
 
                 elif msg_type == "end_session":
                     await session.end()
-                    await websocket.send_json({"type": "session_ended"})
+                    await websocket.send_text(FRAME_SESSION_ENDED)
                     break
 
         except WebSocketDisconnect:
+            # Keep the state around so a flaky connection can resume without losing context;
+            # a draining worker is going away, so the client resumes from the database elsewhere
+            if not live_sessions.draining:
+                hot_sessions.park(session)
             await session.end()
             logger.info(f"WebSocket disconnected for child {child_id}")
         except Exception as e:
@@ -148,3 +247,5 @@ async def voice_websocket(
                 await websocket.close(code=1011, reason=str(e))
             except Exception:
                 pass
+        finally:
+            live_sessions.unregister(websocket)
@@ -0,0 +1,89 @@
+import time
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from app.config import settings
+from app.models.user import User
+from app.services.coordination import coordination, publish_after_commit
+from app.services.metrics import metrics
+
+
+class PrincipalCache:
+    """Per-process cache of verified tokens and authenticated users.
+
+    Tokens map to their user id until the token's own expiry, so a repeat request
+    skips signature verification. Users are kept for a short TTL and dropped
+    explicitly whenever the row changes, so dashboard polling does no DB reads.
+    """
+
+    def __init__(self):
+        # token -> (exp as unix time, user_id)
+        self._tokens: OrderedDict[str, tuple[float, uuid.UUID]] = OrderedDict()
+        # user_id -> (cached_at, detached User)
+        self._users: OrderedDict[uuid.UUID, tuple[float, User]] = OrderedDict()
+
+    def get_token(self, token: str) -> uuid.UUID | None:
+        entry = self._tokens.get(token)
+        if entry is None:
+            metrics.inc("auth_token_cache_total", result="miss")
+            return None
+        exp, user_id = entry
+        if exp <= time.time():
+            del self._tokens[token]
+            metrics.inc("auth_token_cache_total", result="miss")
+            return None
+        self._tokens.move_to_end(token)
+        metrics.inc("auth_token_cache_total", result="hit")
+        return user_id
+
+    def put_token(self, token: str, exp: float, user_id: uuid.UUID) -> None:
+        self._tokens[token] = (exp, user_id)
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > settings.auth_token_cache_size:
+            self._tokens.popitem(last=False)
+
+    def get_user(self, user_id: uuid.UUID) -> User | None:
+        entry = self._users.get(user_id)
+        if entry is None or entry[0] < time.monotonic() - settings.auth_user_cache_ttl_seconds:
+            metrics.inc("auth_user_cache_total", result="miss")
+            return None
+        self._users.move_to_end(user_id)
+        metrics.inc("auth_user_cache_total", result="hit")
+        return entry[1]
+
+    def put_user(self, user: User) -> None:
+        """Cache a user that has been expunged from its session."""
+        self._users[user.id] = (time.monotonic(), user)
+        self._users.move_to_end(user.id)
+        while len(self._users) > settings.auth_user_cache_size:
+            self._users.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Forget the user and every token issued to them; the next request re-verifies."""
+        self._users.pop(user_id, None)
+        for token in [t for t, (_, owner) in self._tokens.items() if owner == user_id]:
+            del self._tokens[token]
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self._users.clear()
+
+
+principal_cache = PrincipalCache()
+coordination.subscribe("principal_invalidated", lambda payload: principal_cache.invalidate(uuid.UUID(payload["user_id"])))
+
+
+# Any ORM update or delete of a user (password change, account deletion) drops the
+# cached principal here at once and, after the commit, in every worker (here again,
+# in case a request re-cached the old row meanwhile). Bulk update()/delete()
+# statements bypass these events and must publish "principal_invalidated" themselves.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        publish_after_commit(session, "principal_invalidated", {"user_id": str(target.id)})
@@ -1,4 +1,7 @@
+import asyncio
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from fastapi import Depends, HTTPException, status
@@ -8,20 +11,84 @@ from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.cache import principal_cache
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.services.metrics import metrics
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 bearer_scheme = HTTPBearer()
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+class _HashPool:
+    """Runs bcrypt off the event loop on a few dedicated threads (bcrypt releases the GIL).
 
+    At most `workers` hashes run at once and at most `queue_size` callers wait for a
+    slot, each for up to the queue timeout; beyond that callers get a 503 instead of
+    piling up, so a login spike can't stall the loop or grow an unbounded backlog.
+    """
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = asyncio.Semaphore(workers)
+        # Callers waiting or hashing. Counted here rather than read off the semaphore,
+        # which a burst in one loop tick sees unlocked before any acquire has run
+        self._admitted = 0
+        self._capacity = workers + queue_size
+        self._timeout = timeout
+        self._waiting = 0
+
+    def _reject(self, reason: str) -> HTTPException:
+        metrics.inc("password_hash_rejected_total", reason=reason)
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins right now, try again shortly",
+            headers={"Retry-After": "5"},
+        )
+
+    async def run(self, fn, *args):
+        if self._admitted >= self._capacity:
+            raise self._reject("queue_full")
+        self._admitted += 1
+        try:
+            return await self._run(fn, *args)
+        finally:
+            self._admitted -= 1
+
+    async def _run(self, fn, *args):
+        queued_at = time.monotonic()
+        self._waiting += 1
+        metrics.set_gauge("password_hash_queued", self._waiting)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._timeout)
+        except TimeoutError:
+            raise self._reject("timeout")
+        finally:
+            self._waiting -= 1
+            metrics.set_gauge("password_hash_queued", self._waiting)
+        metrics.observe("password_hash_wait_seconds", time.monotonic() - queued_at)
+        metrics.add_gauge("password_hash_in_flight", 1)
+        started = time.monotonic()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+            metrics.add_gauge("password_hash_in_flight", -1)
+            metrics.observe("password_hash_seconds", time.monotonic() - started)
+
+
+_hash_pool = _HashPool(
+    settings.password_hash_workers, settings.password_hash_queue_size, settings.password_hash_queue_timeout_seconds
+)
+
+
+async def hash_password(password: str) -> str:
+    return await _hash_pool.run(pwd_context.hash, password)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _hash_pool.run(pwd_context.verify, plain, hashed)
 
 
 def create_access_token(user_id: uuid.UUID) -> str:
@@ -31,14 +98,20 @@ def create_access_token(user_id: uuid.UUID) -> str:
 
 
 def decode_token(token: str) -> uuid.UUID:
+    cached = principal_cache.get_token(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return uuid.UUID(user_id)
-    except JWTError:
+        user_id = uuid.UUID(user_id)
+    except (JWTError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if "exp" in payload:
+        principal_cache.put_token(token, payload["exp"], user_id)
+    return user_id
 
 
 async def get_current_user(
@@ -46,8 +119,14 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db),
 ) -> User:
     user_id = decode_token(credentials.credentials)
+    user = principal_cache.get_user(user_id)
+    if user is not None:
+        return user
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    # Detached, so it is shared read-only across requests and never tied to this session
+    db.expunge(user)
+    principal_cache.put_user(user)
     return user
@@ -4,11 +4,38 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database — SQLite by default, no Docker required
     database_url: str = "sqlite+aiosqlite:///./genius_kid.db"
+    # Optional read replica for parent dashboard reads (PostgreSQL only)
+    database_replica_url: str = ""
+    database_replica_max_lag_seconds: float = 5.0
+    database_replica_lag_check_seconds: float = 10.0
+    # Connection pool (ignored for SQLite)
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout_seconds: float = 30.0
+    database_pool_recycle_seconds: int = 1800
+    # SQLite connection pragmas (ignored for other databases)
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size_bytes: int = 268435456
 
     # Auth
     jwt_secret: str = "change-me-to-a-random-secret"
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 1440
+    # Verified tokens and authenticated users are cached per process; user changes
+    # invalidate immediately, the TTL bounds staleness for changes made elsewhere
+    auth_user_cache_ttl_seconds: float = 30.0
+    auth_user_cache_size: int = 10000
+    auth_token_cache_size: int = 10000
+    # Password hashing runs on a small thread pool; callers beyond the queue, or waiting
+    # longer than the timeout, get a 503 rather than stalling the event loop
+    password_hash_workers: int = 2
+    password_hash_queue_size: int = 64
+    password_hash_queue_timeout_seconds: float = 10.0
+
+    # /metrics exposes provider internals; scrapers send "Authorization: Bearer <metrics_token>".
+    # While the token is empty the endpoint is off.
+    metrics_token: str = ""
 
     # Encryption key for provider API keys
     encryption_key: str = ""
@@ -28,6 +55,137 @@ class Settings(BaseSettings):
     wavespeed_base_url: str = "https://api.wavespeed.ai"
     wavespeed_model: str = "wavespeed-ai/z-image/turbo-lora"
 
+    # Provider resilience — deadlines adapt to observed p95 latency within [min, max]
+    provider_timeout_min_seconds: float = 5.0
+    provider_timeout_max_seconds: float = 60.0
+    provider_timeout_latency_multiplier: float = 3.0
+    provider_max_retries: int = 2
+    provider_retry_base_delay_seconds: float = 0.5
+    provider_retry_max_delay_seconds: float = 8.0
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+    # SDK clients (and their connection pools) are shared per credential, up to this many
+    provider_client_cache_size: int = 256
+
+    # Adaptive LLM routing — each turn is classified locally and answered by the family's
+    # configured model (fast) or its strong model. A turn is hard when it is an open question,
+    # or its utterance (words, or CJK characters) or the history is long. The strong model is
+    # skipped while its p95 latency over the last few minutes, or the turn's estimated cost,
+    # is over the limit. These thresholds are per vendor; an account overrides any of them in
+    # its llm provider config ({"routing_thresholds": {...}} in config_json). Parents who pin
+    # a model in their provider settings are never routed.
+    llm_routing_enabled: bool = True
+    llm_strong_models: dict[str, str] = {
+        "anthropic": "claude-sonnet-4-5-20250929",
+        "openai": "gpt-4o",
+    }
+    llm_routing_thresholds: dict[str, dict[str, float]] = {
+        "anthropic": {"strong_min_units": 15, "strong_min_history": 16, "strong_max_p95_seconds": 6.0, "strong_max_cost_usd": 0.02},
+        "openai": {"strong_min_units": 15, "strong_min_history": 16, "strong_max_p95_seconds": 6.0, "strong_max_cost_usd": 0.02},
+    }
+
+    # Provider scheduler — limits are keyed by "provider:model", falling back to "provider"
+    provider_default_concurrency: int = 8
+    provider_concurrency_limits: dict[str, int] = {
+        "openai": 16,
+        "anthropic": 16,
+        "openai_whisper": 8,
+        "openai_tts": 8,
+        "wavespeed": 2,
+    }
+    # Tokens per minute (characters for TTS); 0 or missing means unlimited
+    provider_tpm_limits: dict[str, int] = {
+        "openai": 200000,
+        "anthropic": 80000,
+    }
+
+    # Chunked TTS — long replies are split into sentences and synthesized concurrently
+    tts_chunking_enabled: bool = True
+    tts_chunk_max_chars: int = 120
+    tts_chunk_min_chars: int = 20
+    tts_chunk_concurrency: int = 3
+
+    # STT preprocessing — WAV input is downmixed, resampled to 16 kHz, trimmed of leading and
+    # trailing silence and loudness-normalized before upload; other formats pass through
+    stt_preprocess_enabled: bool = True
+    stt_target_dbfs: float = -20.0
+    stt_max_gain_db: float = 20.0
+    # Clips whose loudest frame is below the floor are silence; otherwise leading/trailing
+    # frames within the margin of the clip's noise floor are trimmed
+    stt_silence_floor_dbfs: float = -60.0
+    stt_silence_margin_db: float = 12.0
+    stt_silence_padding_ms: int = 200
+
+    # Long-term memory — a per-child BM25 index over past turns (what the child said and the
+    # reply), caught up from new messages whenever a session starts. Each turn the snippets from
+    # earlier conversations most relevant to what the child just said go into the prompt within
+    # memory_max_tokens, and only the last llm_history_messages of the conversation are replayed;
+    # older turns of the conversation are recalled alongside the earlier conversations' turns.
+    memory_enabled: bool = True
+    memory_max_tokens: int = 150
+    memory_top_k: int = 3
+    memory_min_score: float = 0.5
+    memory_max_documents: int = 1000
+    memory_snippet_chars: int = 160
+    memory_cache_size: int = 500
+    llm_history_messages: int = 20
+
+    # TTS speeds; the "slower" variant is pre-synthesized in the background after each
+    # reply, bounded by a per-session character budget (0 disables speculation)
+    tts_default_speed: float = 0.9
+    tts_slower_speed: float = 0.7
+    speculative_tts_budget_chars: int = 3000
+
+    # Session resume — reconnects within the window reattach to the same conversation;
+    # disconnected sessions stay in memory for the grace period so a quick reconnect needs no DB reads
+    session_resume_window_minutes: int = 30
+    session_resume_history_messages: int = 20
+    session_hot_grace_seconds: int = 120
+    session_hot_capacity: int = 500
+
+    # Shutdown — on SIGTERM voice turns in flight get this long to finish before every
+    # client is told to reconnect elsewhere and its session is ended
+    shutdown_drain_seconds: float = 20.0
+
+    # Warm-up — once up, each worker imports its vendor SDKs, opens DB pool connections and
+    # primes hot queries in the background; /health answers 503 until it is done
+    warmup_enabled: bool = True
+    warmup_db_connections: int = 4
+    warmup_timeout_seconds: float = 30.0
+
+    # Cross-worker coordination (cache invalidation events, shared counters): "local" for a
+    # single worker, "sqlite" for several workers on one host sharing coordination_sqlite_path
+    coordination_backend: str = "local"
+    coordination_sqlite_path: str = "./coordination.db"
+    coordination_poll_interval_seconds: float = 0.25
+    coordination_event_retention_seconds: float = 60.0
+
+    # Image jobs — generations run in the background on a bounded worker pool per process.
+    # Jobs are deduplicated per account by normalized (prompt, style, model), and image bytes
+    # are cached under image_cache_dir by content hash. A running job whose worker has not
+    # finished within the lease is picked up again, up to image_job_max_attempts. A job that
+    # hit a provider outage waits before its next attempt: the provider's retry hint, but at
+    # least image_job_retry_base_seconds doubled per attempt, capped at the max.
+    image_job_workers: int = 2
+    image_job_max_attempts: int = 3
+    image_job_retry_base_seconds: float = 30.0
+    image_job_retry_max_seconds: float = 600.0
+    image_job_lease_seconds: float = 300.0
+    image_job_poll_seconds: float = 5.0
+    image_cache_dir: str = "./image_cache"
+    image_max_bytes: int = 10485760
+
+    # Transcript export — concurrent exports are capped so they can't starve voice traffic
+    export_max_concurrent: int = 2
+    export_batch_size: int = 1000
+
+    # Archival — messages of conversations idle for archive_after_days move to gzipped
+    # JSONL segments under archive_dir (0 disables the background job)
+    archive_after_days: int = 180
+    archive_dir: str = "./archive"
+    archive_interval_minutes: int = 60
+    archive_segment_conversations: int = 200
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "extra": "ignore"}
 
 
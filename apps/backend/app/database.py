@@ -1,16 +1,96 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import logging
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    # SQLite requires check_same_thread=False for async
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-)
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    if url.startswith("sqlite"):
+        # SQLite requires check_same_thread=False for async
+        return create_async_engine(url, echo=False, connect_args={"check_same_thread": False})
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout_seconds,
+        pool_recycle=settings.database_pool_recycle_seconds,
+        pool_pre_ping=True,
+    )
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a session writes; NORMAL is durable enough under WAL
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_bytes}")
+    cursor.close()
+
+
+engine = _create_engine(settings.database_url)
+if engine.dialect.name == "sqlite":
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engine = _create_engine(settings.database_replica_url) if settings.database_replica_url else None
+replica_session = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False) if replica_engine else None
+)
+
+# 0 when the replica has replayed everything it received, else time since the last replayed commit
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaRouter:
+    """Decides whether read-only requests may use the replica.
+
+    Lag is sampled at most every `database_replica_lag_check_seconds`; a replica that
+    is too far behind or unreachable sends reads back to the primary until the next check.
+    """
+
+    def __init__(self):
+        self._checked_at = float("-inf")
+        self._healthy = False
+
+    async def _check(self) -> bool:
+        try:
+            async with replica_session() as db:
+                lag = (await db.execute(_REPLICA_LAG_SQL)).scalar()
+        except Exception as e:
+            logger.warning(f"Replica lag check failed, reading from primary: {e}")
+            return False
+        healthy = lag is not None and float(lag) <= settings.database_replica_max_lag_seconds
+        if not healthy:
+            logger.warning(f"Replica lag {lag}s exceeds limit, reading from primary")
+        return healthy
+
+    async def use_replica(self) -> bool:
+        if replica_session is None:
+            return False
+        if replica_engine.dialect.name != "postgresql":
+            return True
+        now = time.monotonic()
+        if now - self._checked_at >= settings.database_replica_lag_check_seconds:
+            self._checked_at = now
+            self._healthy = await self._check()
+        return self._healthy
+
+
+replica_router = ReplicaRouter()
+
 
 class Base(DeclarativeBase):
     pass
@@ -19,3 +99,14 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+async def read_sessionmaker() -> async_sessionmaker:
+    """The replica's sessionmaker when it is fresh enough, else the primary's."""
+    return replica_session if await replica_router.use_replica() else async_session
+
+
+async def get_read_db() -> AsyncSession:
+    """Session for read-only endpoints."""
+    async with (await read_sessionmaker())() as session:
+        yield session
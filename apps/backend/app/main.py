@@ -1,14 +1,104 @@
-from fastapi import FastAPI
+import asyncio
+import secrets
+import signal
+import threading
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from fastapi import FastAPI, Header, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.parent import router as parent_router
 from app.api.kid import router as kid_router
 from app.api.ws.voice import router as ws_router
+from app.config import settings
+from app.providers.clients import close_clients
+from app.services.archive import run_archiver
+from app.services.coordination import coordination
+from app.services.data_version import data_versions
+from app.services.image_jobs import image_jobs
+from app.services.metrics import metrics
+from app.services.session_store import live_sessions
+from app.services.warmup import warmup
+
+_DRAIN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def _drain_on_signal() -> Callable[[], None]:
+    """Drain live voice sessions on SIGTERM/SIGINT before the server's own handler runs.
+
+    Uvicorn closes open websockets as soon as it starts shutting down, before the
+    lifespan shutdown, so the drain has to happen first. The signal is re-raised
+    once the drain is over; a second signal skips the wait. Returns a function that
+    restores the previous handlers.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+    loop = asyncio.get_running_loop()
+    previous = {sig: signal.getsignal(sig) for sig in _DRAIN_SIGNALS}
+    signalled = False
+    drain_task: asyncio.Task | None = None
+
+    def restore() -> None:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+    async def drain_then_exit(sig: int) -> None:
+        try:
+            await live_sessions.drain(settings.shutdown_drain_seconds)
+        finally:
+            restore()
+            signal.raise_signal(sig)
+
+    def start_drain(sig: int) -> None:
+        nonlocal drain_task
+        drain_task = loop.create_task(drain_then_exit(sig))
+
+    def handle(sig: int, frame) -> None:
+        nonlocal signalled
+        if signalled:
+            restore()
+            signal.raise_signal(sig)
+            return
+        signalled = True
+        # Signal handlers run between bytecodes; the drain starts on the loop proper
+        loop.call_soon_threadsafe(start_drain, sig)
+
+    for sig in _DRAIN_SIGNALS:
+        signal.signal(sig, handle)
+    return restore
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await coordination.start()
+    archiver = asyncio.create_task(run_archiver()) if settings.archive_after_days > 0 else None
+    warming = asyncio.create_task(warmup.run()) if settings.warmup_enabled else None
+    if warming is None:
+        warmup.ready = True
+    image_jobs.start()
+    restore_signals = _drain_on_signal()
+    yield
+    restore_signals()
+    if warming:
+        warming.cancel()
+    # Already done when the shutdown came through a signal
+    await live_sessions.drain(settings.shutdown_drain_seconds)
+    if archiver:
+        archiver.cancel()
+    await image_jobs.stop()
+    await close_clients()
+    await data_versions.flush()
+    await coordination.stop()
+
 
 app = FastAPI(
     title="Companion - Kids AI Character Platform",
     version="0.1.0",
     description="Multilingual voice-interactive GenAI character companion for children",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -17,6 +107,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(parent_router)
@@ -25,5 +116,21 @@ app.include_router(ws_router)
 
 
 @app.get("/health")
-async def health():
+async def health(response: Response):
+    # Load balancers route here only once warm-up is done, and stop as soon as a drain starts
+    if live_sessions.draining:
+        response.status_code = 503
+        return {"status": "draining"}
+    if not warmup.ready:
+        response.status_code = 503
+        return {"status": "starting"}
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics(authorization: str = Header(default="")):
+    expected = f"Bearer {settings.metrics_token}"
+    if not settings.metrics_token or not secrets.compare_digest(authorization.encode(), expected.encode()):
+        # Indistinguishable from a missing route, so the endpoint doesn't advertise itself
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return metrics.render()
@@ -3,5 +3,8 @@ from app.models.child import Child
 from app.models.provider_config import ProviderConfig
 from app.models.conversation import Conversation, Message
 from app.models.daily_usage import DailyUsage
+from app.models.archive_segment import ArchiveSegment
+from app.models.image_job import ImageJob
+from app.models.child_memory import ChildMemory
 
-__all__ = ["User", "Child", "ProviderConfig", "Conversation", "Message", "DailyUsage"]
+__all__ = ["User", "Child", "ProviderConfig", "Conversation", "Message", "DailyUsage", "ArchiveSegment", "ImageJob", "ChildMemory"]
@@ -0,0 +1,24 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import String, Integer, BigInteger, DateTime, ForeignKey, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ArchiveSegment(Base):
+    """Manifest entry for one compressed file of archived conversations of a child."""
+
+    __tablename__ = "archive_segments"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    child_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Relative to settings.archive_dir
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    conversation_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    first_started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String, Integer, DateTime, ForeignKey, CheckConstraint, JSON, Uuid
+from sqlalchemy import String, Integer, DateTime, ForeignKey, CheckConstraint, Index, JSON, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,7 +9,10 @@ from app.database import Base
 
 class Child(Base):
     __tablename__ = "children"
-    __table_args__ = (CheckConstraint("age BETWEEN 3 AND 8", name="check_age_range"),)
+    __table_args__ = (
+        CheckConstraint("age BETWEEN 3 AND 8", name="check_age_range"),
+        Index("ix_children_user_id", "user_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
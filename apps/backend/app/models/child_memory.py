@@ -0,0 +1,22 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, LargeBinary, DateTime, ForeignKey, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ChildMemory(Base):
+    """A child's long-term memory index, stored compressed, and how far it has read."""
+
+    __tablename__ = "child_memories"
+
+    child_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), primary_key=True)
+    # zlib-compressed JSON of the indexed turns; postings are rebuilt on load
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    document_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # (created_at, id) of the last message read into the index
+    last_message_created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_message_id: Mapped[uuid.UUID | None] = mapped_column(Uuid(as_uuid=True))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -2,14 +2,19 @@ import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Numeric, Uuid
+from sqlalchemy import DDL, String, Integer, BigInteger, Text, DateTime, ForeignKey, Index, Numeric, Uuid, bindparam, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.services.search import FTS_CREATE_SQL, FTS_DELETE_TRIGGER_SQL, FTS_INSERT_SQL, segment
 
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_child_id_started_at_id", "child_id", "started_at", "id"),
+        Index("ix_conversations_started_at_id", "started_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     child_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("children.id", ondelete="CASCADE"), nullable=False)
@@ -18,6 +23,14 @@ class Conversation(Base):
     language: Mapped[str | None] = mapped_column(String(10))
     total_tokens: Mapped[int] = mapped_column(Integer, default=0)
     estimated_cost_usd: Mapped[Decimal] = mapped_column(Numeric(10, 6), default=Decimal("0"))
+    # Maintained per turn so listings don't have to load messages
+    message_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    audio_duration_ms: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # Set once the messages have been moved out to a compressed archive segment
+    archive_segment_id: Mapped[uuid.UUID | None] = mapped_column(
+        Uuid(as_uuid=True),
+        ForeignKey("archive_segments.id", name="fk_conversations_archive_segment_id", ondelete="SET NULL"),
+    )
 
     child = relationship("Child", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan", order_by="Message.created_at")
@@ -25,6 +38,7 @@ class Conversation(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (Index("ix_messages_conversation_id_created_at_id", "conversation_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
@@ -35,6 +49,25 @@ class Message(Base):
     audio_duration_ms: Mapped[int | None] = mapped_column(Integer)
     tokens_used: Mapped[int] = mapped_column(Integer, default=0)
     cost_usd: Mapped[Decimal] = mapped_column(Numeric(10, 6), default=Decimal("0"))
+    # Character replies from the LLM: the model that answered, the routing tier and reason
+    # that picked it, and how long the call took
+    llm_model: Mapped[str | None] = mapped_column(String(100))
+    route_tier: Mapped[str | None] = mapped_column(String(20))
+    route_reason: Mapped[str | None] = mapped_column(String(40))
+    llm_latency_ms: Mapped[int | None] = mapped_column(Integer)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     conversation = relationship("Conversation", back_populates="messages")
+
+
+# Full-text index (SQLite): created alongside the table, filled on insert, emptied by trigger on delete
+event.listen(Message.__table__, "after_create", DDL(FTS_CREATE_SQL).execute_if(dialect="sqlite"))
+event.listen(Message.__table__, "after_create", DDL(FTS_DELETE_TRIGGER_SQL).execute_if(dialect="sqlite"))
+
+_fts_insert = text(FTS_INSERT_SQL).bindparams(bindparam("id", type_=Uuid(as_uuid=True)))
+
+
+@event.listens_for(Message, "after_insert")
+def _index_message(mapper, connection, target: Message) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.execute(_fts_insert, {"id": target.id, "body": segment(target.content)})
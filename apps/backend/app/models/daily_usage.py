@@ -22,3 +22,6 @@ class DailyUsage(Base):
     llm_tokens: Mapped[int] = mapped_column(Integer, default=0)
     tts_chars: Mapped[int] = mapped_column(Integer, default=0)
     stt_seconds: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=Decimal("0"))
+    # Background pre-synthesis (e.g. the "slower" variant); included in total_cost_usd
+    speculative_tts_chars: Mapped[int] = mapped_column(Integer, default=0)
+    speculative_cost_usd: Mapped[Decimal] = mapped_column(Numeric(10, 4), default=Decimal("0"))
@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Index, Numeric, Uuid, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+# Job lifecycle; "running" jobs whose lease ran out are picked up again
+IMAGE_JOB_QUEUED = "queued"
+IMAGE_JOB_RUNNING = "running"
+IMAGE_JOB_SUCCEEDED = "succeeded"
+IMAGE_JOB_FAILED = "failed"
+
+
+class ImageJob(Base):
+    """One background image generation; the table doubles as the work queue."""
+
+    __tablename__ = "image_jobs"
+    __table_args__ = (
+        # At most one live job per picture per account; failed jobs step aside for a retry
+        Index(
+            "uq_image_jobs_user_id_dedupe_key",
+            "user_id",
+            "dedupe_key",
+            unique=True,
+            sqlite_where=text("status != 'failed'"),
+            postgresql_where=text("status != 'failed'"),
+        ),
+        Index("ix_image_jobs_status_created_at", "status", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # sha256 of the normalized (prompt, style, model)
+    dedupe_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    prompt: Mapped[str] = mapped_column(Text, nullable=False)
+    style: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    provider: Mapped[str] = mapped_column(String(50), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=IMAGE_JOB_QUEUED)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    # A queued job isn't claimed before this; set when an outage sends it back to the queue
+    not_before: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # sha256 of the image bytes, which name the file under settings.image_cache_dir
+    content_hash: Mapped[str | None] = mapped_column(String(64))
+    content_type: Mapped[str | None] = mapped_column(String(50))
+    size_bytes: Mapped[int | None] = mapped_column(Integer)
+    cost_usd: Mapped[Decimal] = mapped_column(Numeric(10, 4), default=Decimal("0"))
+    error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
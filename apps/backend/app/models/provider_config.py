@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String, Boolean, Text, DateTime, ForeignKey, JSON, Uuid
+from sqlalchemy import String, Boolean, Text, DateTime, ForeignKey, Index, JSON, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +9,7 @@ from app.database import Base
 
 class ProviderConfig(Base):
     __tablename__ = "provider_configs"
+    __table_args__ = (Index("ix_provider_configs_user_type_name", "user_id", "provider_type", "provider_name"),)
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
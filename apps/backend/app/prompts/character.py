@@ -75,3 +75,14 @@ def build_system_prompt(
 - Keep the conversation playful and learning-focused
 - End conversations warmly: "I had so much fun talking to you! See you next time! 🐻"
 """
+
+
+def build_memory_section(child_name: str, snippets: list[str]) -> str:
+    """Earlier moments with the child that relate to the current turn, for the system prompt."""
+    lines = "\n".join(f"- {snippet}" for snippet in snippets)
+    return f"""
+
+## Things You Remember About {child_name}
+From earlier conversations, or earlier in this one. Bring them up naturally only if they fit; never recite them.
+{lines}
+"""
@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from decimal import Decimal
+from typing import Sequence
+
+# TTS audio formats: "mp3" (the default), "opus" (Ogg Opus, smallest over slow links) and
+# "pcm" (raw 16-bit little-endian mono; no decoding, so playback can start at once)
+TTS_FORMATS = ("mp3", "opus", "pcm")
 
 
 @dataclass
@@ -19,6 +24,14 @@ class LLMResponse:
     metadata: dict = field(default_factory=dict)
 
 
+@dataclass
+class LLMRoute:
+    """Which model a turn went to, and why."""
+
+    tier: str  # "fast", "strong", or "fixed" when the provider has a single model
+    reason: str
+
+
 @dataclass
 class STTResponse:
     text: str
@@ -34,6 +47,12 @@ class TTSResponse:
     duration_seconds: float = 0.0
     cost_usd: Decimal = Decimal("0")
     format: str = "mp3"
+    # Set for pcm, which has no header to carry it
+    sample_rate: int = 0
+    # Set when a reply is synthesized in chunks; a whole reply is segment 0 of 1
+    segment_index: int = 0
+    segment_count: int = 1
+    text: str = ""
 
 
 @dataclass
@@ -52,6 +71,16 @@ class LLMProvider(ABC):
     def name(self) -> str:
         ...
 
+    def model(self) -> str:
+        return ""
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
+        return Decimal("0")
+
+    def route(self, messages: list[LLMMessage], system_prompt: str = "") -> "tuple[LLMProvider, LLMRoute]":
+        """The provider to answer this turn with; a single-model provider answers everything."""
+        return self, LLMRoute(tier="fixed", reason="single_model")
+
 
 class STTProvider(ABC):
     @abstractmethod
@@ -62,16 +91,37 @@ class STTProvider(ABC):
     def name(self) -> str:
         ...
 
+    def model(self) -> str:
+        return ""
+
 
 class TTSProvider(ABC):
+    # Formats this provider can produce, from TTS_FORMATS
+    formats: tuple[str, ...] = ("mp3",)
+
     @abstractmethod
-    async def synthesize(self, text: str, language: str = "en", voice: str = "") -> TTSResponse:
+    async def synthesize(
+        self,
+        text: str,
+        language: str = "en",
+        voice: str = "",
+        speed: float | None = None,
+        audio_format: str = "mp3",
+    ) -> TTSResponse:
+        """`speed` is a playback-rate multiplier; None means the provider's default for children."""
         ...
 
+    def negotiate(self, accepted: Sequence[str]) -> str:
+        """The first of the client's accepted formats this provider produces, else mp3."""
+        return next((f for f in accepted if f in self.formats), "mp3")
+
     @abstractmethod
     def name(self) -> str:
         ...
 
+    def model(self) -> str:
+        return ""
+
 
 class ImageProvider(ABC):
     @abstractmethod
@@ -81,3 +131,6 @@ class ImageProvider(ABC):
     @abstractmethod
     def name(self) -> str:
         ...
+
+    def model(self) -> str:
+        return ""
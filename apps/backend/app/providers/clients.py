@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import httpx
+
+from app.config import settings
+from app.providers.coalescing import credential_scope
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# SDK clients are shared per credential so their connection pools (and TLS sessions)
+# survive across turns; providers are cheap wrappers built per call around them.
+# (kind, credential fingerprint) -> client; the least recently used is dropped past the cap
+_clients: OrderedDict[tuple[str, str], object] = OrderedDict()
+# Warm-up builds clients in a worker thread while the event loop may be building its own
+_clients_lock = threading.Lock()
+_http: httpx.AsyncClient | None = None
+
+
+def _shared(kind: str, api_key: str, build):
+    key = (kind, credential_scope(api_key))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = build()
+            # Evicted clients are left to in-flight calls and garbage collection, not closed under them
+            while len(_clients) > settings.provider_client_cache_size:
+                _clients.popitem(last=False)
+        _clients.move_to_end(key)
+        return client
+
+
+def openai_client(api_key: str) -> "AsyncOpenAI":
+    # Vendor SDKs are imported with their first client; they dominate worker boot time
+    from openai import AsyncOpenAI
+
+    # Retries and deadlines are handled by call_with_resilience
+    return _shared(
+        "openai",
+        api_key,
+        lambda: AsyncOpenAI(api_key=api_key, max_retries=0, timeout=settings.provider_timeout_max_seconds),
+    )
+
+
+def anthropic_client(api_key: str) -> "AsyncAnthropic":
+    from anthropic import AsyncAnthropic
+
+    return _shared(
+        "anthropic",
+        api_key,
+        lambda: AsyncAnthropic(api_key=api_key, max_retries=0, timeout=settings.provider_timeout_max_seconds),
+    )
+
+
+def http_client() -> httpx.AsyncClient:
+    """Plain HTTP client for vendors without an SDK; credentials go in per-request headers."""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=settings.provider_timeout_max_seconds)
+    return _http
+
+
+async def close_clients() -> None:
+    """Close every pooled client; called once no turn can use them any more."""
+    global _http
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    if _http is not None:
+        clients.append(_http)
+    _http = None
+    results = await asyncio.gather(
+        *(c.aclose() if isinstance(c, httpx.AsyncClient) else c.close() for c in clients),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Closing provider client failed: {result}")
@@ -0,0 +1,86 @@
+import dataclasses
+import hashlib
+from decimal import Decimal
+
+from app.providers.base import TTSProvider, TTSResponse, ImageProvider, ImageResponse
+from app.services.singleflight import SingleFlight
+
+_tts_flight = SingleFlight("tts")
+_image_flight = SingleFlight("image")
+
+
+class _Shared:
+    """One response handed to every coalesced caller; its cost goes to the first one only.
+
+    Each caller records the cost of what it gets, and the provider billed one call.
+    """
+
+    def __init__(self, response: TTSResponse | ImageResponse):
+        self._response = response
+        self._billed = False
+
+    def take(self) -> TTSResponse | ImageResponse:
+        if self._billed:
+            return dataclasses.replace(self._response, cost_usd=Decimal("0"))
+        self._billed = True
+        return self._response
+
+
+def credential_scope(api_key: str) -> str:
+    """Stable fingerprint so only calls billed to the same key are coalesced."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class CoalescingTTSProvider(TTSProvider):
+    """Shares one synthesis between concurrent identical requests (e.g. greetings, safety redirects)."""
+
+    def __init__(self, inner: TTSProvider, scope: str):
+        self._inner = inner
+        self._scope = scope
+
+    def name(self) -> str:
+        return self._inner.name()
+
+    def model(self) -> str:
+        return self._inner.model()
+
+    @property
+    def formats(self) -> tuple[str, ...]:
+        return self._inner.formats
+
+    async def synthesize(
+        self,
+        text: str,
+        language: str = "en",
+        voice: str = "",
+        speed: float | None = None,
+        audio_format: str = "mp3",
+    ) -> TTSResponse:
+        key = (self._scope, self.name(), self.model(), text, language, voice, speed, audio_format)
+
+        async def synthesize() -> _Shared:
+            return _Shared(
+                await self._inner.synthesize(text, language=language, voice=voice, speed=speed, audio_format=audio_format)
+            )
+
+        return (await _tts_flight.do(key, synthesize)).take()
+
+
+class CoalescingImageProvider(ImageProvider):
+    def __init__(self, inner: ImageProvider, scope: str):
+        self._inner = inner
+        self._scope = scope
+
+    def name(self) -> str:
+        return self._inner.name()
+
+    def model(self) -> str:
+        return self._inner.model()
+
+    async def generate(self, prompt: str, style: str = "") -> ImageResponse:
+        key = (self._scope, self.name(), self.model(), prompt, style)
+
+        async def generate() -> _Shared:
+            return _Shared(await self._inner.generate(prompt, style=style))
+
+        return (await _image_flight.do(key, generate)).take()
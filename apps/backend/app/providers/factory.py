@@ -1,79 +1,138 @@
+import functools
+import importlib
+
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.database import async_session
 from app.models.provider_config import ProviderConfig
 from app.auth.encryption import decrypt_api_key
 from app.providers.base import LLMProvider, STTProvider, TTSProvider, ImageProvider
-from app.providers.llm.openai_provider import OpenAILLMProvider
-from app.providers.llm.anthropic_provider import AnthropicLLMProvider
-from app.providers.stt.openai_whisper import OpenAIWhisperSTT
-from app.providers.tts.openai_tts import OpenAITTS
-from app.providers.image.wavespeed import WaveSpeedImageProvider
-
-
-async def _get_api_key(db: AsyncSession, user_id, provider_type: str, provider_name: str) -> str | None:
-    """Get API key from user config, falling back to env defaults."""
-    result = await db.execute(
-        select(ProviderConfig).where(
-            ProviderConfig.user_id == user_id,
-            ProviderConfig.provider_type == provider_type,
-            ProviderConfig.provider_name == provider_name,
-            ProviderConfig.is_active == True,
-        )
-    )
-    config = result.scalar_one_or_none()
-    if config and config.api_key_encrypted:
-        return decrypt_api_key(config.api_key_encrypted)
-    return None
-
-
-async def _get_model_name(db: AsyncSession, user_id, provider_type: str, provider_name: str) -> str | None:
-    result = await db.execute(
-        select(ProviderConfig.model_name).where(
-            ProviderConfig.user_id == user_id,
-            ProviderConfig.provider_type == provider_type,
-            ProviderConfig.provider_name == provider_name,
-            ProviderConfig.is_active == True,
+from app.providers.coalescing import CoalescingTTSProvider, CoalescingImageProvider, credential_scope
+from app.providers.llm.routing import ROUTING_THRESHOLDS_KEY, RoutedLLMProvider, merge_thresholds
+from app.services.singleflight import SingleFlight
+
+# (api_key, model_name, config_json) per provider_name for one user and provider_type
+ProviderSettings = dict[str, tuple[str | None, str | None, dict]]
+
+_config_flight = SingleFlight("provider_config")
+
+# provider_name -> "module:Class". Adapters are imported on first use, so a deployment
+# only pays for the vendor SDKs it actually calls.
+ADAPTERS = {
+    "anthropic": "app.providers.llm.anthropic_provider:AnthropicLLMProvider",
+    "openai": "app.providers.llm.openai_provider:OpenAILLMProvider",
+    "openai_whisper": "app.providers.stt.openai_whisper:OpenAIWhisperSTT",
+    "openai_tts": "app.providers.tts.openai_tts:OpenAITTS",
+    "wavespeed": "app.providers.image.wavespeed:WaveSpeedImageProvider",
+}
+
+
+@functools.cache
+def adapter(provider_name: str) -> type:
+    module_name, _, class_name = ADAPTERS[provider_name].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def prebuild_default_providers() -> list[str]:
+    """Import the adapters that the deployment-wide keys enable and build their clients.
+
+    Blocking (imports); run it in a thread. Returns the provider names built.
+    """
+    built = []
+    for name, api_key in [
+        ("anthropic", settings.anthropic_api_key),
+        ("openai", settings.openai_api_key),
+        ("openai_whisper", settings.openai_api_key),
+        ("openai_tts", settings.openai_api_key),
+        ("wavespeed", settings.wavespeed_api_key),
+    ]:
+        if api_key:
+            adapter(name)(api_key=api_key)
+            built.append(name)
+    return built
+
+
+async def _load_provider_configs(user_id, provider_type: str) -> ProviderSettings:
+    # Uses its own session: the load is shared by every coalesced caller and must
+    # not depend on the lifetime of whichever request happened to start it.
+    async with async_session() as db:
+        result = await db.execute(
+            select(
+                ProviderConfig.provider_name,
+                ProviderConfig.api_key_encrypted,
+                ProviderConfig.model_name,
+                ProviderConfig.config_json,
+            ).where(
+                ProviderConfig.user_id == user_id,
+                ProviderConfig.provider_type == provider_type,
+                ProviderConfig.is_active == True,
+            )
         )
+        rows = result.all()
+    return {
+        name: (decrypt_api_key(encrypted) if encrypted else None, model, config or {})
+        for name, encrypted, model, config in rows
+    }
+
+
+async def _get_provider_configs(user_id, provider_type: str) -> ProviderSettings:
+    """User's active configs for a provider type; concurrent identical lookups share one query."""
+    return await _config_flight.do(
+        (str(user_id), provider_type), lambda: _load_provider_configs(user_id, provider_type)
     )
-    row = result.scalar_one_or_none()
-    return row
 
 
-async def get_llm_provider(db: AsyncSession, user_id) -> LLMProvider:
+async def get_llm_provider(user_id) -> LLMProvider:
+    configs = await _get_provider_configs(user_id, "llm")
     # Try user's Anthropic config first, then OpenAI, then fall back to env keys
-    for name, cls, default_key, default_model in [
-        ("anthropic", AnthropicLLMProvider, settings.anthropic_api_key, settings.anthropic_llm_model),
-        ("openai", OpenAILLMProvider, settings.openai_api_key, settings.openai_llm_model),
+    for name, default_key, default_model in [
+        ("anthropic", settings.anthropic_api_key, settings.anthropic_llm_model),
+        ("openai", settings.openai_api_key, settings.openai_llm_model),
     ]:
-        api_key = await _get_api_key(db, user_id, "llm", name) or default_key
-        if api_key:
-            model = await _get_model_name(db, user_id, "llm", name) or default_model
-            return cls(api_key=api_key, model=model)
+        user_key, user_model, config = configs.get(name, (None, None, {}))
+        api_key = user_key or default_key
+        if not api_key:
+            continue
+        strong_model = settings.llm_strong_models.get(name)
+        # A model the parent picked is used for every turn
+        if user_model or not settings.llm_routing_enabled or not strong_model:
+            return adapter(name)(api_key=api_key, model=user_model or default_model)
+        return RoutedLLMProvider(
+            fast=adapter(name)(api_key=api_key, model=default_model),
+            strong=adapter(name)(api_key=api_key, model=strong_model),
+            # The account's overrides win over the vendor's defaults
+            thresholds=merge_thresholds(
+                settings.llm_routing_thresholds.get(name, {}), config.get(ROUTING_THRESHOLDS_KEY) or {}
+            ),
+        )
 
     raise RuntimeError("No LLM provider configured. Please set an API key in settings.")
 
 
-async def get_stt_provider(db: AsyncSession, user_id) -> STTProvider:
-    api_key = await _get_api_key(db, user_id, "stt", "openai_whisper") or settings.openai_api_key
+async def get_stt_provider(user_id) -> STTProvider:
+    user_key, user_model, _ = (await _get_provider_configs(user_id, "stt")).get("openai_whisper", (None, None, {}))
+    api_key = user_key or settings.openai_api_key
     if api_key:
-        model = await _get_model_name(db, user_id, "stt", "openai_whisper") or settings.openai_stt_model
-        return OpenAIWhisperSTT(api_key=api_key, model=model)
+        return adapter("openai_whisper")(api_key=api_key, model=user_model or settings.openai_stt_model)
     raise RuntimeError("No STT provider configured.")
 
 
-async def get_tts_provider(db: AsyncSession, user_id) -> TTSProvider:
-    api_key = await _get_api_key(db, user_id, "tts", "openai_tts") or settings.openai_api_key
+async def get_tts_provider(user_id) -> TTSProvider:
+    user_key, user_model, _ = (await _get_provider_configs(user_id, "tts")).get("openai_tts", (None, None, {}))
+    api_key = user_key or settings.openai_api_key
     if api_key:
-        model = await _get_model_name(db, user_id, "tts", "openai_tts") or settings.openai_tts_model
-        return OpenAITTS(api_key=api_key, model=model)
+        tts = adapter("openai_tts")(api_key=api_key, model=user_model or settings.openai_tts_model)
+        return CoalescingTTSProvider(tts, scope=credential_scope(api_key))
     raise RuntimeError("No TTS provider configured.")
 
 
-async def get_image_provider(db: AsyncSession, user_id) -> ImageProvider:
-    api_key = await _get_api_key(db, user_id, "image", "wavespeed") or settings.wavespeed_api_key
+async def get_image_provider(user_id) -> ImageProvider:
+    user_key, user_model, _ = (await _get_provider_configs(user_id, "image")).get("wavespeed", (None, None, {}))
+    api_key = user_key or settings.wavespeed_api_key
     if api_key:
-        model = await _get_model_name(db, user_id, "image", "wavespeed") or settings.wavespeed_model
-        return WaveSpeedImageProvider(api_key=api_key, base_url=settings.wavespeed_base_url, model=model)
+        image = adapter("wavespeed")(
+            api_key=api_key, base_url=settings.wavespeed_base_url, model=user_model or settings.wavespeed_model
+        )
+        return CoalescingImageProvider(image, scope=credential_scope(api_key))
     raise RuntimeError("No image provider configured.")
@@ -1,8 +1,8 @@
 from decimal import Decimal
 
-import httpx
-
 from app.providers.base import ImageProvider, ImageResponse
+from app.providers.clients import http_client
+from app.providers.resilience import call_with_resilience
 
 
 class WaveSpeedImageProvider(ImageProvider):
@@ -14,8 +14,13 @@ class WaveSpeedImageProvider(ImageProvider):
     def name(self) -> str:
         return "wavespeed"
 
+    def model(self) -> str:
+        return self._model
+
     async def generate(self, prompt: str, style: str = "") -> ImageResponse:
-        async with httpx.AsyncClient(timeout=60) as client:
+        client = http_client()
+
+        async def request() -> dict:
             response = await client.post(
                 f"{self._base_url}/v1/images/generate",
                 headers={"Authorization": f"Bearer {self._api_key}"},
@@ -28,7 +33,9 @@ class WaveSpeedImageProvider(ImageProvider):
                 },
             )
             response.raise_for_status()
-            data = response.json()
+            return response.json()
+
+        data = await call_with_resilience("wavespeed:generate", request)
 
         return ImageResponse(
             image_url=data.get("url", ""),
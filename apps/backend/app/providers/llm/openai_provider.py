@@ -1,8 +1,8 @@
 from decimal import Decimal
 
-from openai import AsyncOpenAI
-
 from app.providers.base import LLMProvider, LLMMessage, LLMResponse
+from app.providers.clients import openai_client
+from app.providers.resilience import call_with_resilience
 
 # Approximate pricing per 1M tokens (as of 2024)
 PRICING = {
@@ -14,12 +14,19 @@ PRICING = {
 
 class OpenAILLMProvider(LLMProvider):
     def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = openai_client(api_key)
         self._model = model
 
     def name(self) -> str:
         return "openai"
 
+    def model(self) -> str:
+        return self._model
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
+        pricing = PRICING.get(self._model, PRICING["gpt-4o-mini"])
+        return (Decimal(input_tokens) * pricing["input"] + Decimal(output_tokens) * pricing["output"]) / Decimal("1000000")
+
     async def chat(self, messages: list[LLMMessage], system_prompt: str = "") -> LLMResponse:
         openai_messages = []
         if system_prompt:
@@ -27,11 +34,14 @@ class OpenAILLMProvider(LLMProvider):
         for msg in messages:
             openai_messages.append({"role": msg.role, "content": msg.content})
 
-        response = await self._client.chat.completions.create(
-            model=self._model,
-            messages=openai_messages,
-            max_tokens=300,  # Keep responses short for children
-            temperature=0.7,
+        response = await call_with_resilience(
+            "openai:chat",
+            lambda: self._client.chat.completions.create(
+                model=self._model,
+                messages=openai_messages,
+                max_tokens=300,  # Keep responses short for children
+                temperature=0.7,
+            ),
         )
 
         choice = response.choices[0]
@@ -39,13 +49,10 @@ class OpenAILLMProvider(LLMProvider):
         input_tokens = usage.prompt_tokens if usage else 0
         output_tokens = usage.completion_tokens if usage else 0
 
-        pricing = PRICING.get(self._model, PRICING["gpt-4o-mini"])
-        cost = (Decimal(input_tokens) * pricing["input"] + Decimal(output_tokens) * pricing["output"]) / Decimal("1000000")
-
         return LLMResponse(
             text=choice.message.content or "",
             input_tokens=input_tokens,
             output_tokens=output_tokens,
-            cost_usd=cost,
+            cost_usd=self.estimate_cost(input_tokens, output_tokens),
             model=self._model,
         )
@@ -0,0 +1,141 @@
+import re
+import time
+import unicodedata
+from decimal import Decimal
+
+from app.providers.base import LLMMessage, LLMProvider, LLMResponse, LLMRoute
+from app.providers.resilience import LatencyTracker
+from app.services.metrics import metrics
+
+# Same reservation the conversation makes: rough chars per token, and the adapters' output cap
+CHARS_PER_TOKEN = 4
+MAX_OUTPUT_TOKENS = 300
+
+# Used for any threshold the vendor settings and the account's overrides leave out
+DEFAULT_THRESHOLDS = {
+    "strong_min_units": 15,
+    "strong_min_history": 16,
+    "strong_max_p95_seconds": 6.0,
+    "strong_max_cost_usd": 0.02,
+}
+# Key in an account's llm provider config_json holding its overrides of the thresholds
+ROUTING_THRESHOLDS_KEY = "routing_thresholds"
+
+# Whole-utterance replies that never need the strong model
+_SHORT_REPLIES = {
+    "yes", "no", "ok", "okay", "yeah", "yep", "nope", "hi", "hello", "bye", "thanks", "thank you", "again",
+    "好", "好啊", "好的", "對", "对", "是", "不是", "不要", "要", "嗯", "謝謝", "谢谢", "再見", "再见", "你好", "哈囉",
+}
+# Open questions ask for an explanation rather than a quick exchange
+_OPEN_QUESTION = re.compile(
+    r"\b(why|how (come|do|does|did|can|many|much)|what if|what happens|explain|tell me about)\b|為什麼|为什么|怎麼|怎么|如果|為何|为何|なぜ|どうして",
+    re.IGNORECASE,
+)
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]")
+
+# Latency samples older than this are forgotten. A strong model skipped for being slow
+# gets no new samples, so this is what lets it be tried again once the old ones expire.
+LATENCY_WINDOW_SECONDS = 300.0
+
+# "family:model" -> rolling latency of its chat calls in this process
+_latency: dict[str, LatencyTracker] = {}
+
+
+def _tracker(family: str, model: str) -> LatencyTracker:
+    key = f"{family}:{model}"
+    if key not in _latency:
+        _latency[key] = LatencyTracker(max_age=LATENCY_WINDOW_SECONDS)
+    return _latency[key]
+
+
+def merge_thresholds(*layers: dict) -> dict[str, float]:
+    """DEFAULT_THRESHOLDS overlaid with each layer in turn, ignoring unknown or non-numeric entries."""
+    merged = dict(DEFAULT_THRESHOLDS)
+    for layer in layers:
+        merged.update(
+            (key, float(value)) for key, value in layer.items()
+            if key in DEFAULT_THRESHOLDS and isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+    return merged
+
+
+def utterance_units(text: str) -> int:
+    """Length comparable across languages: CJK characters plus words of everything else."""
+    return len(_CJK.findall(text)) + len(_CJK.sub(" ", text).split())
+
+
+def classify_turn(text: str, history_messages: int, thresholds: dict[str, float]) -> LLMRoute:
+    """Cheap, local guess at how hard a turn is; no model call involved."""
+    normalized = unicodedata.normalize("NFKC", text).casefold().strip(" .!?。！？~～")
+    units = utterance_units(normalized)
+    if normalized in _SHORT_REPLIES or units <= 2:
+        return LLMRoute(tier="fast", reason="short_reply")
+    if _OPEN_QUESTION.search(normalized):
+        return LLMRoute(tier="strong", reason="open_question")
+    if units >= thresholds["strong_min_units"]:
+        return LLMRoute(tier="strong", reason="long_utterance")
+    if history_messages >= thresholds["strong_min_history"]:
+        return LLMRoute(tier="strong", reason="long_history")
+    return LLMRoute(tier="fast", reason="simple")
+
+
+class _TimedLLMProvider(LLMProvider):
+    """Feeds each call's latency into the router's rolling stats for the model."""
+
+    def __init__(self, inner: LLMProvider, family: str):
+        self._inner = inner
+        self._family = family
+
+    def name(self) -> str:
+        return self._inner.name()
+
+    def model(self) -> str:
+        return self._inner.model()
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
+        return self._inner.estimate_cost(input_tokens, output_tokens)
+
+    async def chat(self, messages: list[LLMMessage], system_prompt: str = "") -> LLMResponse:
+        started = time.monotonic()
+        response = await self._inner.chat(messages, system_prompt=system_prompt)
+        elapsed = time.monotonic() - started
+        _tracker(self._family, self.model()).record(elapsed)
+        metrics.observe("llm_chat_seconds", elapsed, model=self.model())
+        return response
+
+
+class RoutedLLMProvider(LLMProvider):
+    """One vendor family with a fast and a strong model; each turn goes to one of them.
+
+    Turns classified as hard go to the strong model unless its recent p95 latency or the
+    turn's estimated cost (from the adapter's pricing table) exceeds the thresholds.
+    """
+
+    def __init__(self, fast: LLMProvider, strong: LLMProvider, thresholds: dict[str, float]):
+        self._family = fast.name()
+        self._fast = _TimedLLMProvider(fast, self._family)
+        self._strong = _TimedLLMProvider(strong, self._family)
+        self._thresholds = merge_thresholds(thresholds)
+
+    def name(self) -> str:
+        return self._family
+
+    def model(self) -> str:
+        return self._fast.model()
+
+    def route(self, messages: list[LLMMessage], system_prompt: str = "") -> tuple[LLMProvider, LLMRoute]:
+        text = messages[-1].content if messages and messages[-1].role == "user" else ""
+        decision = classify_turn(text, len(messages), self._thresholds)
+        if decision.tier == "strong":
+            p95 = _tracker(self._family, self._strong.model()).percentile(0.95)
+            input_tokens = (len(system_prompt) + sum(len(m.content) for m in messages)) // CHARS_PER_TOKEN
+            if p95 is not None and p95 > self._thresholds["strong_max_p95_seconds"]:
+                decision = LLMRoute(tier="fast", reason="strong_too_slow")
+            elif self._strong.estimate_cost(input_tokens, MAX_OUTPUT_TOKENS) > self._thresholds["strong_max_cost_usd"]:
+                decision = LLMRoute(tier="fast", reason="strong_too_costly")
+        metrics.inc("llm_routes_total", family=self._family, tier=decision.tier, reason=decision.reason)
+        return (self._strong if decision.tier == "strong" else self._fast), decision
+
+    async def chat(self, messages: list[LLMMessage], system_prompt: str = "") -> LLMResponse:
+        provider, _ = self.route(messages, system_prompt)
+        return await provider.chat(messages, system_prompt=system_prompt)
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+
+from app.config import settings
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status codes worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class ProviderUnavailableError(RuntimeError):
+    """A provider call failed after retries, or its circuit breaker is open."""
+
+    def __init__(self, endpoint: str, message: str, retry_after: float | None = None):
+        super().__init__(f"{endpoint}: {message}")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class LatencyTracker:
+    """Rolling latency window used to derive a per-endpoint deadline.
+
+    With max_age, samples also expire after that many seconds, so the window empties
+    when an endpoint stops being called instead of holding its last latencies forever.
+    """
+
+    def __init__(self, window: int = 100, min_samples: int = 10, max_age: float | None = None):
+        # (recorded_at, seconds)
+        self._samples: deque[tuple[float, float]] = deque(maxlen=window)
+        self._min_samples = min_samples
+        self._max_age = max_age
+
+    def record(self, seconds: float) -> None:
+        self._samples.append((time.monotonic(), seconds))
+
+    def percentile(self, pct: float) -> float | None:
+        if self._max_age is not None:
+            cutoff = time.monotonic() - self._max_age
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+        if len(self._samples) < self._min_samples:
+            return None
+        ordered = sorted(seconds for _, seconds in self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def deadline(self) -> float:
+        # Until we have enough samples, allow the configured maximum
+        p95 = self.percentile(0.95)
+        if p95 is None:
+            return settings.provider_timeout_max_seconds
+        return min(
+            settings.provider_timeout_max_seconds,
+            max(settings.provider_timeout_min_seconds, p95 * settings.provider_timeout_latency_multiplier),
+        )
+
+
+class CircuitBreaker:
+    """Opens after consecutive transient failures, then lets one probe through after a cool-down."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("provider_circuit_state", _STATE_VALUE[self.state], endpoint=self.endpoint)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit for {self.endpoint}: {self.state} -> {state}")
+            self.state = state
+            self._publish()
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < settings.circuit_breaker_reset_seconds:
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def retry_after(self) -> float:
+        return max(0.0, settings.circuit_breaker_reset_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self._failures >= settings.circuit_breaker_failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        # A non-transient error (e.g. bad request) says nothing about backend health
+        self._probe_in_flight = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_latency: dict[str, LatencyTracker] = {}
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    if endpoint not in _breakers:
+        _breakers[endpoint] = CircuitBreaker(endpoint)
+    return _breakers[endpoint]
+
+
+def get_latency_tracker(endpoint: str) -> LatencyTracker:
+    if endpoint not in _latency:
+        _latency[endpoint] = LatencyTracker()
+    return _latency[endpoint]
+
+
+def _status_code(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse OpenAI-style reset durations such as '1s', '6m0s' or '20ms'."""
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Extract the server-requested backoff from Retry-After or rate-limit reset headers."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    if (value := headers.get("retry-after-ms")) is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    if (value := headers.get("retry-after")) is not None:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    # OpenAI: x-ratelimit-reset-requests / x-ratelimit-reset-tokens ("6m0s")
+    resets = [
+        _parse_duration(headers[h])
+        for h in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if h in headers and headers.get(h.replace("reset", "remaining")) == "0"
+    ]
+    # Anthropic: anthropic-ratelimit-*-reset (RFC 3339 timestamp)
+    for h in ("anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-reset"):
+        if h in headers and headers.get(h.replace("reset", "remaining")) == "0":
+            try:
+                reset_at = datetime.fromisoformat(headers[h].replace("Z", "+00:00"))
+                resets.append(max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds()))
+            except ValueError:
+                pass
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, httpx.TransportError)):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # SDK connection errors wrap the underlying httpx error
+    return isinstance(exc.__cause__, (TimeoutError, httpx.TransportError))
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: uniform over [0, min(cap, base * 2^attempt)]
+    ceiling = min(settings.provider_retry_max_delay_seconds, settings.provider_retry_base_delay_seconds * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+
+async def call_with_resilience(endpoint: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """Run a provider call with an adaptive deadline, jittered retries and a circuit breaker.
+
+    `endpoint` identifies the backend operation, e.g. "openai:speech".
+    """
+    breaker = get_breaker(endpoint)
+    tracker = get_latency_tracker(endpoint)
+    timeouts = 0
+
+    for attempt in range(settings.provider_max_retries + 1):
+        if not breaker.allow():
+            metrics.inc("provider_calls_total", endpoint=endpoint, outcome="short_circuited")
+            raise ProviderUnavailableError(endpoint, "circuit open", retry_after=breaker.retry_after())
+
+        # The deadline is learned from typical calls; a long reply can need more, so each
+        # retry after a timeout gets twice as long, up to the configured maximum
+        deadline = min(settings.provider_timeout_max_seconds, tracker.deadline() * 2 ** timeouts)
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(deadline):
+                result = await fn()
+        except asyncio.CancelledError:
+            # The caller went away (our own deadline surfaces as TimeoutError instead);
+            # a half-open probe must not stay claimed or the endpoint never recovers
+            breaker.release()
+            metrics.inc("provider_calls_total", endpoint=endpoint, outcome="cancelled")
+            raise
+        except Exception as e:
+            if not is_transient(e):
+                breaker.release()
+                metrics.inc("provider_calls_total", endpoint=endpoint, outcome="error")
+                raise
+
+            breaker.record_failure()
+            if isinstance(e, TimeoutError):
+                # It took at least this long: counting it lets the learned deadline grow,
+                # where successes alone would keep it fitted to the short calls
+                tracker.record(deadline)
+                timeouts += 1
+            outcome = "timeout" if isinstance(e, TimeoutError) else "transient_error"
+            metrics.inc("provider_calls_total", endpoint=endpoint, outcome=outcome)
+            retry_after = retry_after_seconds(e)
+            if attempt >= settings.provider_max_retries or (
+                retry_after is not None and retry_after > settings.provider_retry_max_delay_seconds
+            ):
+                raise ProviderUnavailableError(endpoint, f"{type(e).__name__} after {attempt + 1} attempt(s)", retry_after) from e
+
+            delay = retry_after if retry_after is not None else _backoff(attempt)
+            logger.warning(f"{endpoint} attempt {attempt + 1} failed ({type(e).__name__}); retrying in {delay:.2f}s")
+            metrics.inc("provider_retries_total", endpoint=endpoint)
+            await asyncio.sleep(delay)
+            continue
+
+        elapsed = time.monotonic() - started
+        tracker.record(elapsed)
+        breaker.record_success()
+        metrics.inc("provider_calls_total", endpoint=endpoint, outcome="ok")
+        metrics.observe("provider_call_seconds", elapsed, endpoint=endpoint)
+        return result
+
+    raise AssertionError("unreachable")
@@ -1,9 +1,11 @@
+import asyncio
 import io
 from decimal import Decimal
 
-from openai import AsyncOpenAI
-
 from app.providers.base import STTProvider, STTResponse
+from app.providers.clients import openai_client
+from app.providers.stt.preprocess import prepare_for_stt
+from app.providers.resilience import call_with_resilience
 
 # OpenAI Whisper pricing: $0.006 per minute
 COST_PER_MINUTE = Decimal("0.006")
@@ -11,23 +13,36 @@ COST_PER_MINUTE = Decimal("0.006")
 
 class OpenAIWhisperSTT(STTProvider):
     def __init__(self, api_key: str, model: str = "whisper-1"):
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = openai_client(api_key)
         self._model = model
 
     def name(self) -> str:
         return "openai_whisper"
 
-    async def transcribe(self, audio_bytes: bytes, language: str = "") -> STTResponse:
-        audio_file = io.BytesIO(audio_bytes)
-        audio_file.name = "audio.webm"
-
-        kwargs = {"model": self._model, "file": audio_file, "response_format": "verbose_json"}
-        if language:
-            kwargs["language"] = language
+    def model(self) -> str:
+        return self._model
 
-        response = await self._client.audio.transcriptions.create(**kwargs)
-
-        duration = getattr(response, "duration", 0.0) or 0.0
+    async def transcribe(self, audio_bytes: bytes, language: str = "") -> STTResponse:
+        audio = await asyncio.to_thread(prepare_for_stt, audio_bytes)
+        if not audio.data:
+            # Nothing but silence: no upload, no charge
+            return STTResponse(text="", language=language)
+
+        def request():
+            # A fresh file object per attempt so retries re-upload from the start
+            audio_file = io.BytesIO(audio.data)
+            audio_file.name = audio.filename
+
+            kwargs = {"model": self._model, "file": audio_file, "response_format": "verbose_json"}
+            if language:
+                kwargs["language"] = language
+            return self._client.audio.transcriptions.create(**kwargs)
+
+        response = await call_with_resilience("openai:transcribe", request)
+
+        duration = audio.duration_seconds
+        if duration is None:
+            duration = getattr(response, "duration", 0.0) or 0.0
         cost = COST_PER_MINUTE * Decimal(str(duration)) / Decimal("60")
 
         return STTResponse(
@@ -0,0 +1,154 @@
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config import settings
+
+# Speech recognizers work at 16 kHz mono; anything above only costs upload time
+STT_SAMPLE_RATE = 16000
+FRAME_MS = 20
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+@dataclass
+class PreparedAudio:
+    data: bytes
+    filename: str
+    # Known only when the audio was decoded here; otherwise the STT response reports it
+    duration_seconds: float | None = None
+
+
+def sniff_format(data: bytes) -> str:
+    """File extension for the container in `data`, from its magic bytes."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if data[4:8] == b"ftyp":
+        return "m4a"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:3] == b"ID3" or data[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "mp3"
+    # What the web client records
+    return "webm"
+
+
+def _wav_samples(data: bytes) -> tuple[np.ndarray, int, int] | None:
+    """(frames x channels view over `data`, sample rate, channels), or None if unsupported.
+
+    The samples are a view into the request's bytes; nothing is copied until downmixing.
+    """
+    view = memoryview(data)
+    pos, fmt = 12, None
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], struct.unpack_from("<I", data, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", data, body)
+            if fmt[0] == _WAVE_FORMAT_EXTENSIBLE and size >= 40:
+                # The real format code leads the sub-format GUID
+                fmt = (struct.unpack_from("<H", data, body + 24)[0], *fmt[1:])
+        elif chunk_id == b"data" and fmt is not None:
+            code, channels, rate, _, _, bits = fmt
+            dtype = {(_WAVE_FORMAT_PCM, 16): "<i2", (_WAVE_FORMAT_IEEE_FLOAT, 32): "<f4"}.get((code, bits))
+            if dtype is None or channels == 0 or rate == 0:
+                return None
+            # Streamed recordings may leave the size unset or too large
+            end = min(body + size, len(data))
+            frame_bytes = channels * bits // 8
+            end -= (end - body) % frame_bytes
+            samples = np.frombuffer(view[body:end], dtype=dtype).reshape(-1, channels)
+            return samples, rate, channels
+        pos = body + size + (size & 1)
+    return None
+
+
+def _to_mono_float(samples: np.ndarray) -> np.ndarray:
+    scale = 1 / 32768 if samples.dtype.kind == "i" else 1.0
+    return samples.mean(axis=1, dtype=np.float32) * np.float32(scale)
+
+
+def _resample(audio: np.ndarray, rate: int) -> np.ndarray:
+    if rate == STT_SAMPLE_RATE or audio.size == 0:
+        return audio
+    if rate % STT_SAMPLE_RATE == 0:
+        # Integer factor (48k, 32k): averaging each group is the low-pass and the decimation
+        factor = rate // STT_SAMPLE_RATE
+        usable = audio.size - audio.size % factor
+        return audio[:usable].reshape(-1, factor).mean(axis=1)
+    if rate > STT_SAMPLE_RATE:
+        # Moving average over one output period keeps most aliasing out before interpolating
+        width = int(np.ceil(rate / STT_SAMPLE_RATE))
+        audio = np.convolve(audio, np.full(width, 1 / width, dtype=np.float32), mode="same")
+    positions = np.arange(0, audio.size * STT_SAMPLE_RATE // rate) * (rate / STT_SAMPLE_RATE)
+    return np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+
+
+def _frame_levels(audio: np.ndarray, frame: int) -> np.ndarray:
+    """RMS level in dBFS of each whole frame."""
+    frames = audio[: audio.size - audio.size % frame].reshape(-1, frame)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-9))
+
+
+def _trim_and_normalize(audio: np.ndarray) -> np.ndarray:
+    frame = STT_SAMPLE_RATE * FRAME_MS // 1000
+    levels = _frame_levels(audio, frame)
+    if levels.size == 0 or levels.max() < settings.stt_silence_floor_dbfs:
+        return audio[:0]
+    # Relative to the clip's own noise floor, so a quiet microphone doesn't lose the speech itself
+    noise = np.percentile(levels, 10)
+    threshold = noise + min(settings.stt_silence_margin_db, (levels.max() - noise) / 2)
+    voiced = np.flatnonzero(levels >= threshold)
+    pad = settings.stt_silence_padding_ms // FRAME_MS
+    start = max(voiced[0] - pad, 0) * frame
+    end = min((voiced[-1] + 1 + pad) * frame, audio.size)
+    audio = audio[start:end]
+
+    # Bring the voiced frames to the target loudness, bounded by the gain cap and the peak
+    speech_level = 10 * np.log10(np.mean(10 ** (levels[voiced] / 10)))
+    gain_db = min(settings.stt_target_dbfs - speech_level, settings.stt_max_gain_db)
+    peak = float(np.max(np.abs(audio)))
+    gain = min(10 ** (gain_db / 20), 0.99 / peak)
+    return audio * np.float32(gain)
+
+
+def _encode_wav(audio: np.ndarray) -> bytes:
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, _WAVE_FORMAT_PCM, 1, STT_SAMPLE_RATE, STT_SAMPLE_RATE * 2, 2, 16,
+        b"data", len(pcm),
+    )
+    return header + pcm
+
+
+def prepare_for_stt(data: bytes) -> PreparedAudio:
+    """Shrink WAV input to trimmed, normalized 16 kHz mono 16-bit PCM.
+
+    Other containers (webm, m4a, ...) would need a decoder and pass through as they are,
+    under a filename matching their format. CPU-bound; run it off the event loop.
+    """
+    extension = sniff_format(data)
+    parsed = None
+    if extension == "wav" and settings.stt_preprocess_enabled:
+        try:
+            parsed = _wav_samples(data)
+        except (struct.error, ValueError):
+            # Truncated or malformed headers: let the STT service judge the file
+            parsed = None
+    if parsed is None:
+        return PreparedAudio(data=data, filename=f"audio.{extension}")
+    samples, rate, _ = parsed
+    audio = _trim_and_normalize(_resample(_to_mono_float(samples), rate))
+    return PreparedAudio(
+        data=_encode_wav(audio) if audio.size else b"",
+        filename="audio.wav",
+        duration_seconds=audio.size / STT_SAMPLE_RATE,
+    )
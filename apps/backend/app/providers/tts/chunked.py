@@ -0,0 +1,109 @@
+import asyncio
+import re
+from dataclasses import replace
+from decimal import Decimal
+from typing import AsyncIterator, Awaitable, Callable
+
+from app.providers.base import TTSResponse
+
+# Sentence enders (Chinese full-width and Latin), kept with the preceding text
+_SENTENCE_RE = re.compile(r"[^。！？!?.…\n]+[。！？!?.…]*[」』”\"')）]*\s*|[。！？!?.…\n]+")
+# Clause separators used only when a sentence is longer than the chunk limit
+_CLAUSE_RE = re.compile(r"[^，、；：,;:]+[，、；：,;:]*\s*")
+_WORD_RE = re.compile(r"\S+\s*")
+
+
+def _pack(pieces: list[str], max_chars: int, min_chars: int) -> list[str]:
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) >= min_chars and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_for_tts(text: str, max_chars: int, min_chars: int) -> list[str]:
+    """Split a reply into sentence-sized chunks, falling back to clauses for long sentences.
+
+    Short neighbouring sentences are packed together so a burst of "Yay! Wow!" doesn't
+    become several tiny requests. Chunks are never empty and concatenate back to the
+    original text modulo surrounding whitespace.
+    """
+    pieces: list[str] = []
+    for sentence in _SENTENCE_RE.findall(text):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+        else:
+            for clause in _CLAUSE_RE.findall(sentence) or [sentence]:
+                if len(clause) <= max_chars:
+                    pieces.append(clause)
+                    continue
+                # Still too long: break between words, hard-wrapping only unbroken runs (e.g. CJK)
+                for word in _WORD_RE.findall(clause) or [clause]:
+                    pieces.extend(word[i:i + max_chars] for i in range(0, len(word), max_chars))
+    chunks = [c.strip() for c in _pack(pieces, max_chars, min_chars)]
+    return [c for c in chunks if c] or [text]
+
+
+async def replay(segments: list[TTSResponse]) -> AsyncIterator[TTSResponse]:
+    """Serve already-synthesized segments through the same interface as SegmentedSynthesis."""
+    for segment in segments:
+        yield segment
+
+
+class SegmentedSynthesis:
+    """Synthesizes text chunks concurrently and yields them in order.
+
+    At most `concurrency` chunks are in flight at once. Iteration yields each segment
+    as soon as it and every earlier segment are ready.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], Awaitable[TTSResponse]],
+        chunks: list[str],
+        concurrency: int,
+        audio_format: str = "mp3",
+    ):
+        self._synthesize = synthesize
+        self.chunks = chunks
+        # What every segment is encoded as; known before the first one is ready
+        self.audio_format = audio_format
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.cost_usd = Decimal("0")
+        self.chars = 0
+        self.duration_seconds = 0.0
+        self._tasks = [asyncio.create_task(self._run(i, chunk)) for i, chunk in enumerate(chunks)]
+
+    async def _run(self, index: int, chunk: str) -> TTSResponse:
+        async with self._semaphore:
+            result = await self._synthesize(chunk)
+        # Account as soon as the provider call completes, even if nobody consumes it
+        self.cost_usd += result.cost_usd
+        self.chars += len(chunk)
+        self.duration_seconds += result.duration_seconds
+        return replace(result, segment_index=index, segment_count=len(self.chunks), text=chunk)
+
+    async def __aiter__(self) -> AsyncIterator[TTSResponse]:
+        try:
+            for task in self._tasks:
+                yield await task
+        finally:
+            await self.aclose()
+
+    def completed(self) -> list[TTSResponse] | None:
+        """All segments, if every one was synthesized successfully; otherwise None."""
+        if not all(t.done() and not t.cancelled() and t.exception() is None for t in self._tasks):
+            return None
+        return [t.result() for t in self._tasks]
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        # Also retrieves exceptions of finished-but-unconsumed segments
+        await asyncio.gather(*self._tasks, return_exceptions=True)
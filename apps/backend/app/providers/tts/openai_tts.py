@@ -1,12 +1,16 @@
 from decimal import Decimal
 
-from openai import AsyncOpenAI
-
+from app.config import settings
 from app.providers.base import TTSProvider, TTSResponse
+from app.providers.clients import openai_client
+from app.providers.resilience import call_with_resilience
 
 # OpenAI TTS pricing: $15.00 per 1M characters
 COST_PER_CHAR = Decimal("15.00") / Decimal("1000000")
 
+# The speech endpoint returns pcm as 24 kHz 16-bit mono
+PCM_SAMPLE_RATE = 24000
+
 VOICE_MAP = {
     "zh": "nova",
     "en": "shimmer",
@@ -15,33 +19,54 @@ VOICE_MAP = {
 
 
 class OpenAITTS(TTSProvider):
+    formats = ("mp3", "opus", "pcm")
+
     def __init__(self, api_key: str, model: str = "tts-1"):
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = openai_client(api_key)
         self._model = model
 
     def name(self) -> str:
         return "openai_tts"
 
-    async def synthesize(self, text: str, language: str = "en", voice: str = "") -> TTSResponse:
+    def model(self) -> str:
+        return self._model
+
+    async def synthesize(
+        self,
+        text: str,
+        language: str = "en",
+        voice: str = "",
+        speed: float | None = None,
+        audio_format: str = "mp3",
+    ) -> TTSResponse:
         if not voice:
             voice = VOICE_MAP.get(language, "shimmer")
+        # Default is slightly slower than normal for children
+        speed = speed or settings.tts_default_speed
 
-        response = await self._client.audio.speech.create(
-            model=self._model,
-            voice=voice,
-            input=text,
-            response_format="mp3",
-            speed=0.9,  # Slightly slower for children
+        response = await call_with_resilience(
+            "openai:speech",
+            lambda: self._client.audio.speech.create(
+                model=self._model,
+                voice=voice,
+                input=text,
+                response_format=audio_format,
+                speed=speed,
+            ),
         )
 
         audio_bytes = response.content
         cost = COST_PER_CHAR * Decimal(len(text))
-        # Rough estimate: ~150 chars per second of audio
-        duration = len(text) / 150.0
+        if audio_format == "pcm":
+            duration = len(audio_bytes) / (2 * PCM_SAMPLE_RATE)
+        else:
+            # Rough estimate: ~150 chars per second of audio at normal speed
+            duration = len(text) / (150.0 * speed)
 
         return TTSResponse(
             audio_bytes=audio_bytes,
             duration_seconds=duration,
             cost_usd=cost,
-            format="mp3",
+            format=audio_format,
+            sample_rate=PCM_SAMPLE_RATE if audio_format == "pcm" else 0,
         )
@@ -1,3 +1,5 @@
+import uuid
+
 from pydantic import BaseModel, Field
 
 
@@ -18,7 +20,7 @@ class ChildUpdate(BaseModel):
 
 
 class ChildResponse(BaseModel):
-    id: str
+    id: uuid.UUID
     name: str
     age: int
     primary_language: str
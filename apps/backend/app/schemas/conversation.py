@@ -1,9 +1,10 @@
+import uuid
 from datetime import datetime
 from pydantic import BaseModel
 
 
 class MessageResponse(BaseModel):
-    id: str
+    id: uuid.UUID
     role: str
     content: str
     language: str | None
@@ -14,16 +15,29 @@ class MessageResponse(BaseModel):
 
 
 class ConversationResponse(BaseModel):
-    id: str
-    child_id: str
+    id: uuid.UUID
+    child_id: uuid.UUID
     started_at: datetime
     ended_at: datetime | None
     language: str | None
     total_tokens: int
     estimated_cost_usd: float
+    message_count: int
+    audio_duration_ms: int
 
     model_config = {"from_attributes": True}
 
 
+class MessageSearchHit(BaseModel):
+    message_id: uuid.UUID
+    conversation_id: uuid.UUID
+    child_id: uuid.UUID
+    role: str
+    created_at: datetime
+    snippet: str
+    # (start, end) character offsets of matched terms within the snippet
+    highlights: list[tuple[int, int]]
+
+
 class ConversationDetailResponse(ConversationResponse):
     messages: list[MessageResponse] = []
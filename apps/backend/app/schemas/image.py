@@ -0,0 +1,26 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ImageJobCreate(BaseModel):
+    prompt: str = Field(min_length=1, max_length=2000)
+    style: str = Field(default="", max_length=500)
+
+
+class ImageJobResponse(BaseModel):
+    id: uuid.UUID
+    status: str
+    prompt: str
+    style: str
+    provider: str
+    model: str
+    attempts: int
+    error: str | None
+    created_at: datetime
+    finished_at: datetime | None
+    # Where to fetch the picture once the job has succeeded
+    image_url: str | None = None
+
+    model_config = {"from_attributes": True}
@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+import uuid
+
+from pydantic import BaseModel, field_validator
+
+from app.providers.llm.routing import DEFAULT_THRESHOLDS, ROUTING_THRESHOLDS_KEY
 
 
 class ProviderConfigCreate(BaseModel):
@@ -8,9 +12,24 @@ class ProviderConfigCreate(BaseModel):
     model_name: str | None = None
     config_json: dict = {}
 
+    @field_validator("config_json")
+    @classmethod
+    def check_routing_thresholds(cls, value: dict) -> dict:
+        overrides = value.get(ROUTING_THRESHOLDS_KEY)
+        if overrides is None:
+            return value
+        if not isinstance(overrides, dict):
+            raise ValueError(f"{ROUTING_THRESHOLDS_KEY} must be an object")
+        for key, threshold in overrides.items():
+            if key not in DEFAULT_THRESHOLDS:
+                raise ValueError(f"unknown routing threshold {key!r}")
+            if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold < 0:
+                raise ValueError(f"routing threshold {key!r} must be a non-negative number")
+        return value
+
 
 class ProviderConfigResponse(BaseModel):
-    id: str
+    id: uuid.UUID
     provider_type: str
     provider_name: str
     model_name: str | None
@@ -11,6 +11,8 @@ class DailyUsageResponse(BaseModel):
     llm_tokens: int
     tts_chars: int
     stt_seconds: float
+    speculative_tts_chars: int = 0
+    speculative_cost_usd: float = 0
 
     model_config = {"from_attributes": True}
 
@@ -0,0 +1,249 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.database import async_session
+from app.models.archive_segment import ArchiveSegment
+from app.models.child import Child
+from app.models.conversation import Conversation, Message
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_DELETED_CHILDREN_KEY = "archive_deleted_children"
+_cleanups: set[asyncio.Task] = set()
+
+# Fields kept per archived message; enough to serve MessageResponse and exports
+ARCHIVED_MESSAGE_FIELDS = (
+    "id", "role", "content", "language", "emotion", "audio_duration_ms", "tokens_used", "cost_usd", "created_at",
+)
+
+
+def _encode(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is not None and not isinstance(value, (str, int, float)):
+        return str(value)
+    return value
+
+
+def _segment_path(relative: str) -> Path:
+    return Path(settings.archive_dir) / relative
+
+
+def _write_segment(relative: str, lines: list[str]) -> int:
+    """Write atomically (temp file + rename) so a crash never leaves a half-written segment."""
+    path = _segment_path(relative)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.writelines(lines)
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+def _read_conversation(relative: str, conversation_id: uuid.UUID) -> list[dict]:
+    key = str(conversation_id)
+    with gzip.open(_segment_path(relative), "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["conversation_id"] == key:
+                return [
+                    {**m, "created_at": datetime.fromisoformat(m["created_at"])} for m in record["messages"]
+                ]
+    return []
+
+
+async def load_archived_messages(segment_path: str, conversation_id: uuid.UUID) -> list[dict]:
+    """Messages of one archived conversation, oldest first. Decompression runs off the event loop."""
+    return await asyncio.to_thread(_read_conversation, segment_path, conversation_id)
+
+
+def iter_segment(segment_path: str):
+    """Yield (conversation_id, messages) for every conversation in a segment, in file order."""
+    with gzip.open(_segment_path(segment_path), "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            yield record["conversation_id"], record["messages"]
+
+
+async def _archive_child(child_id: uuid.UUID, conversations: list[Conversation]) -> int:
+    """Move one child's batch of conversations into a new segment. Returns conversations archived.
+
+    Conversations another archiver claimed since the batch was read are skipped.
+    """
+    segment_id = uuid.uuid4()
+    relative = None
+    try:
+        async with async_session() as db:
+            # Claimed rows must point at an existing segment; its totals are filled in below
+            segment = ArchiveSegment(
+                id=segment_id,
+                child_id=child_id,
+                path="",
+                conversation_count=0,
+                message_count=0,
+                size_bytes=0,
+                first_started_at=conversations[0].started_at,
+                last_started_at=conversations[-1].started_at,
+            )
+            db.add(segment)
+            await db.flush()
+            # One at a time, so a conversation another archiver got to first only drops out itself
+            claimed = []
+            for conversation in conversations:
+                result = await db.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation.id, Conversation.archive_segment_id.is_(None))
+                    .values(archive_segment_id=segment_id)
+                )
+                if result.rowcount:
+                    claimed.append(conversation)
+            if not claimed:
+                await db.rollback()
+                return 0
+
+            ids = [c.id for c in claimed]
+            result = await db.execute(
+                select(Message)
+                .where(Message.conversation_id.in_(ids))
+                .order_by(Message.conversation_id, Message.created_at, Message.id)
+            )
+            by_conversation: dict[uuid.UUID, list[dict]] = defaultdict(list)
+            for message in result.scalars():
+                by_conversation[message.conversation_id].append(
+                    {field: _encode(getattr(message, field)) for field in ARCHIVED_MESSAGE_FIELDS}
+                )
+            lines = [
+                json.dumps({"conversation_id": str(c.id), "messages": by_conversation[c.id]}, ensure_ascii=False) + "\n"
+                for c in claimed
+            ]
+            message_count = sum(len(m) for m in by_conversation.values())
+            relative = f"{child_id}/{claimed[0].started_at:%Y%m%d}-{segment_id}.jsonl.gz"
+            size = await asyncio.to_thread(_write_segment, relative, lines)
+
+            segment.path = relative
+            segment.conversation_count = len(claimed)
+            segment.message_count = message_count
+            segment.size_bytes = size
+            segment.first_started_at = claimed[0].started_at
+            segment.last_started_at = claimed[-1].started_at
+            await db.execute(delete(Message).where(Message.conversation_id.in_(ids)))
+            await db.commit()
+    except BaseException:
+        if relative is not None:
+            _segment_path(relative).unlink(missing_ok=True)
+        raise
+
+    metrics.inc("archived_conversations_total", len(claimed))
+    metrics.inc("archived_messages_total", message_count)
+    return len(claimed)
+
+
+async def archive_old_conversations(now: datetime | None = None) -> int:
+    """Archive conversations idle for longer than archive_after_days. Returns conversations archived.
+
+    Conversation rows stay in place (they carry the listing totals and point at their
+    segment); only their messages leave the hot tables. Daily usage rollups are untouched.
+    """
+    if settings.archive_after_days <= 0:
+        return 0
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.archive_after_days)
+    # Conversations cut off without end() (a crashed worker, a dropped socket) never get
+    # ended_at; their last message marks when they went quiet
+    last_message_at = (
+        select(func.max(Message.created_at)).where(Message.conversation_id == Conversation.id).scalar_subquery()
+    )
+    archivable = (
+        # Implied by the activity check, but lets the scan start from the started_at index
+        Conversation.started_at < cutoff,
+        func.coalesce(Conversation.ended_at, last_message_at, Conversation.started_at) < cutoff,
+        Conversation.archive_segment_id.is_(None),
+    )
+    archived = 0
+    while True:
+        async with async_session() as db:
+            result = await db.execute(select(Conversation.child_id).where(*archivable).distinct().limit(100))
+            child_ids = list(result.scalars())
+        if not child_ids:
+            return archived
+
+        # One child at a time, so each segment holds a run of a single child's history
+        for child_id in child_ids:
+            while True:
+                async with async_session() as db:
+                    result = await db.execute(
+                        select(Conversation)
+                        .where(Conversation.child_id == child_id, *archivable)
+                        .order_by(Conversation.started_at, Conversation.id)
+                        .limit(settings.archive_segment_conversations)
+                    )
+                    conversations = list(result.scalars())
+                if not conversations:
+                    break
+                archived += await _archive_child(child_id, conversations)
+
+
+def _remove_child_archive(child_id: uuid.UUID) -> None:
+    # Segments live under one directory per child
+    shutil.rmtree(_segment_path(str(child_id)), ignore_errors=True)
+
+
+def _cleanup_done(task: asyncio.Task) -> None:
+    _cleanups.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Removing archive of deleted child failed: {task.exception()}")
+
+
+# The manifest rows go with the child in the same transaction (SQLite leaves ON DELETE
+# CASCADE unenforced); the files go once it commits, so a rollback keeps them
+@event.listens_for(Child, "after_delete")
+def _delete_child_archive(mapper, connection, target: Child) -> None:
+    connection.execute(delete(ArchiveSegment).where(ArchiveSegment.child_id == target.id))
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DELETED_CHILDREN_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _remove_deleted_archives(session: Session) -> None:
+    for child_id in session.info.pop(_DELETED_CHILDREN_KEY, ()):
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(_remove_child_archive, child_id))
+        _cleanups.add(task)
+        task.add_done_callback(_cleanup_done)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_deleted_children(session: Session, previous_transaction) -> None:
+    session.info.pop(_DELETED_CHILDREN_KEY, None)
+
+
+async def run_archiver() -> None:
+    """Background loop; errors are logged and retried on the next interval."""
+    while True:
+        try:
+            count = await archive_old_conversations()
+            if count:
+                logger.info(f"Archived {count} conversations")
+        except Exception as e:
+            logger.error(f"Archival failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.archive_interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    print(f"Archived {asyncio.run(archive_old_conversations())} conversations")
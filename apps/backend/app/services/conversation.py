@@ -1,17 +1,35 @@
+import asyncio
+import time
 import uuid
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from typing import AsyncIterable, Awaitable, Callable
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.child import Child
 from app.models.conversation import Conversation, Message
 from app.providers.base import LLMMessage, LLMResponse, STTResponse, TTSResponse
 from app.providers.factory import get_llm_provider, get_stt_provider, get_tts_provider
-from app.prompts.character import build_system_prompt
+from app.providers.tts.chunked import SegmentedSynthesis, replay, split_for_tts
+from app.prompts.character import build_memory_section, build_system_prompt
 from app.services.safety import check_content_safety, sanitize_for_child, get_safety_redirect
 from app.services.emotion import detect_emotion, suggest_character_emotion
 from app.services.cost import track_usage
+from app.services.data_version import data_versions
+from app.services.memory import MemoryIndex, child_memories, recall, turn_doc
+from app.services.metrics import metrics
+from app.services.scheduler import provider_scheduler, PRIORITY_IN_TURN, PRIORITY_NEW_TURN, PRIORITY_BACKGROUND
+
+# Rough chars-per-token ratio used to reserve LLM budget before the call
+CHARS_PER_TOKEN = 4
+LLM_MAX_OUTPUT_TOKENS = 300
+
+# Receives the response metadata and its audio segments in order; the voice socket
+# uses it to stream each segment as soon as it is ready.
+ResponseSink = Callable[[dict, AsyncIterable[TTSResponse]], Awaitable[None]]
 
 
 class ConversationSession:
@@ -32,6 +50,152 @@ class ConversationSession:
             learning_languages=child.learning_languages,
         )
         self._last_response_text = ""
+        self.resumed = False
+        self._last_speech: SegmentedSynthesis | None = None
+        # Background pre-synthesis of the "slower" variant of the last reply
+        self._speculative: asyncio.Task | None = None
+        self._speculative_text = ""
+        self._speculative_chars_used = 0
+        # Speculative spend not yet written to DailyUsage; the background task must not use self.db
+        self._speculative_unrecorded_chars = 0
+        self._speculative_unrecorded_cost = Decimal("0")
+        # TTS formats the connected client plays, in its order of preference; empty means mp3
+        self.audio_formats: tuple[str, ...] = ()
+        # Earlier conversations of this child, recalled into the prompt turn by turn
+        self.memory: MemoryIndex | None = None
+        # Turns of this conversation that no longer fit the replayed history, recalled the same way
+        self._evicted = MemoryIndex()
+
+    def _slot(self, provider, priority: int, tokens: int = 0):
+        # All sessions of one parent account share a fair-queuing family
+        return provider_scheduler.slot(
+            provider.name(), provider.model(), family=self.user_id, priority=priority, tokens=tokens
+        )
+
+    def _estimate_llm_tokens(self, messages: list[LLMMessage], system_prompt: str) -> int:
+        chars = len(system_prompt) + sum(len(m.content) for m in messages)
+        return chars // CHARS_PER_TOKEN + LLM_MAX_OUTPUT_TOKENS
+
+    async def _load_memory(self) -> None:
+        if settings.memory_enabled:
+            self.memory = await child_memories.load(self.child.id)
+
+    def _evict(self) -> None:
+        """Move the turns beyond the last llm_history_messages out of the history, into recall."""
+        excess = len(self.history) - settings.llm_history_messages
+        if self.memory is None or excess <= 0:
+            return
+        evicted, self.history = self.history[:excess], self.history[excess:]
+        # The history must still open with what the child said
+        while self.history and self.history[0].role != "user":
+            evicted.append(self.history.pop(0))
+        day = datetime.now(timezone.utc).date().isoformat()
+        said = None
+        for message in evicted:
+            if message.role == "user":
+                said = message.content
+            elif said is not None:
+                self._evicted.add(turn_doc(self.conversation.id, day, said, message.content))
+                said = None
+
+    def _llm_context(self, child_text: str) -> tuple[list[LLMMessage], str]:
+        """The messages and system prompt for this turn.
+
+        With memory on, only the recent history is replayed; what the child says can bring
+        back related older turns, of this conversation or earlier ones, so the prompt stays
+        about the same size. Without it the whole history is replayed.
+        """
+        messages = self.history
+        system_prompt = self.system_prompt
+        if self.memory is not None:
+            snippets = recall(self.memory, child_text, exclude_conversation=self.conversation.id, session=self._evicted)
+            if snippets:
+                system_prompt += build_memory_section(self.child.name, snippets)
+        return messages, system_prompt
+
+    async def _synthesize(
+        self, tts, text: str, language: str, priority: int, speed: float | None, audio_format: str
+    ) -> TTSResponse:
+        async with self._slot(tts, priority, tokens=len(text)):
+            return await tts.synthesize(text, language=language, speed=speed, audio_format=audio_format)
+
+    def _speech(
+        self, tts, text: str, language: str, priority: int, speed: float | None = None
+    ) -> SegmentedSynthesis:
+        chunks = (
+            split_for_tts(text, settings.tts_chunk_max_chars, settings.tts_chunk_min_chars)
+            if settings.tts_chunking_enabled
+            else [text]
+        )
+        audio_format = tts.negotiate(self.audio_formats)
+        return SegmentedSynthesis(
+            lambda chunk: self._synthesize(tts, chunk, language, priority, speed, audio_format),
+            chunks,
+            settings.tts_chunk_concurrency,
+            audio_format,
+        )
+
+    def _start_speculation(self, tts, text: str) -> None:
+        """Pre-synthesize the slower variant of the reply just delivered, within the session budget."""
+        if self._speculative_chars_used + len(text) > settings.speculative_tts_budget_chars:
+            metrics.inc("speculative_tts_total", outcome="over_budget")
+            return
+        self._speculative_chars_used += len(text)
+        self._speculative_text = text
+        self._speculative = asyncio.create_task(self._presynthesize(tts, text, self.language))
+        metrics.inc("speculative_tts_total", outcome="started")
+
+    async def _presynthesize(self, tts, text: str, language: str) -> list[TTSResponse]:
+        speech = self._speech(tts, text, language, PRIORITY_BACKGROUND, speed=settings.tts_slower_speed)
+        try:
+            return [segment async for segment in speech]
+        finally:
+            self._speculative_unrecorded_chars += speech.chars
+            self._speculative_unrecorded_cost += speech.cost_usd
+
+    async def _cancel_speculation(self) -> None:
+        task, self._speculative, self._speculative_text = self._speculative, None, ""
+        if task and not task.done():
+            task.cancel()
+            # Let it record what it already spent before usage is drained
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _take_speculation(self, text: str) -> list[TTSResponse] | None:
+        task = self._speculative
+        if task is None or self._speculative_text != text:
+            return None
+        try:
+            # Usually finished while the kid was listening; otherwise it is already underway
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            return None
+        except Exception:
+            return None
+
+    def _drain_speculative_usage(self) -> tuple[int, Decimal]:
+        chars, cost = self._speculative_unrecorded_chars, self._speculative_unrecorded_cost
+        self._speculative_unrecorded_chars = 0
+        self._speculative_unrecorded_cost = Decimal("0")
+        return chars, cost
+
+    async def _deliver(
+        self, head: dict, speech: AsyncIterable[TTSResponse], sink: ResponseSink | None, audio_format: str
+    ) -> dict:
+        """Stream speech through the sink, or collect it into one audio blob when there is none."""
+        head = {**head, "format": audio_format}
+        try:
+            if sink is not None:
+                await sink(head, speech)
+                return head
+            segments = [segment async for segment in speech]
+            return {**head, "audio": b"".join(s.audio_bytes for s in segments)}
+        finally:
+            # Segments start synthesizing up front; a sink that failed before iterating,
+            # or stopped partway, must not leave them running (and billing) unaccounted
+            if isinstance(speech, SegmentedSynthesis):
+                await speech.aclose()
 
     async def start(self) -> Conversation:
         self.conversation = Conversation(
@@ -42,16 +206,116 @@ class ConversationSession:
         await self.db.flush()
         await track_usage(self.db, self.user_id, is_new_session=True)
         await self.db.commit()
+        await self._load_memory()
         return self.conversation
 
-    async def process_audio(self, audio_bytes: bytes) -> dict:
-        """Full pipeline: STT -> safety check -> LLM -> safety check -> TTS."""
-        stt = await get_stt_provider(self.db, self.user_id)
-        llm = await get_llm_provider(self.db, self.user_id)
-        tts = await get_tts_provider(self.db, self.user_id)
+    async def resume(self, conversation_id: uuid.UUID) -> bool:
+        """Reattach to a recent conversation of this child, rebuilding history from its latest messages.
+
+        Returns False when the conversation is unknown, belongs to another child or is too old.
+        """
+        conversation = await self.db.get(Conversation, conversation_id)
+        if conversation is None or conversation.child_id != self.child.id:
+            return False
+
+        # One bounded query for the newest messages only
+        result = await self.db.execute(
+            select(Message.role, Message.content, Message.language, Message.created_at)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc())
+            .limit(settings.session_resume_history_messages)
+        )
+        rows = list(reversed(result.all()))
+
+        # SQLite hands back naive datetimes; everything is stored in UTC
+        timestamps = [conversation.started_at, conversation.ended_at, *(row.created_at for row in rows)]
+        last_activity = max(t.replace(tzinfo=timezone.utc) if t.tzinfo is None else t for t in timestamps if t)
+        if datetime.now(timezone.utc) - last_activity > timedelta(minutes=settings.session_resume_window_minutes):
+            return False
+
+        self.conversation = conversation
+        self.history = self._history_from_messages(rows)
+        if rows:
+            if rows[-1].role == "character":
+                self._last_response_text = rows[-1].content
+            if rows[-1].language and rows[-1].language != self.language:
+                # The kid had switched language before the drop
+                self.language = rows[-1].language
+                self.system_prompt = build_system_prompt(
+                    character_id=self.child.character_id,
+                    child_name=self.child.name,
+                    child_age=self.child.age,
+                    language=self.language,
+                    learning_languages=self.child.learning_languages,
+                )
+
+        conversation.ended_at = None
+        data_versions.touch(self.db, self.user_id)
+        await self.db.commit()
+        await self._load_memory()
+        if self.memory is not None:
+            # Turns stored before the drop that the rebuilt history doesn't cover; the index
+            # has every stored turn of this conversation, the newest of them replayed
+            stored = [doc for doc in self.memory.docs if doc.conversation_id == str(conversation.id)]
+            replayed = sum(1 for message in self.history if message.role == "assistant")
+            for doc in stored[:max(0, len(stored) - replayed)]:
+                self._evicted.add(doc)
+            self._evict()
+        self.resumed = True
+        metrics.inc("session_resume_total", source="db")
+        return True
+
+    @staticmethod
+    def _history_from_messages(rows) -> list[LLMMessage]:
+        history: list[LLMMessage] = []
+        skip_reply = False
+        for row in rows:
+            if row.role == "child":
+                # Unsafe inputs were answered with a canned redirect and never entered the history
+                skip_reply = not check_content_safety(row.content)[0]
+                if not skip_reply:
+                    history.append(LLMMessage(role="user", content=row.content))
+            elif row.role == "character":
+                if not skip_reply and history and history[-1].role == "user":
+                    history.append(LLMMessage(role="assistant", content=row.content))
+                skip_reply = False
+        # The LLM expects the history to start with a user turn and alternate
+        while history and history[0].role != "user":
+            history.pop(0)
+        if history and history[-1].role == "user":
+            history.pop()
+        return history
+
+    def set_audio_formats(self, formats: tuple[str, ...]) -> None:
+        """Record the TTS formats the connected client plays, in its order of preference."""
+        if formats != self.audio_formats:
+            # Audio kept for "repeat" was encoded for the previous connection's client
+            self._last_speech = None
+        self.audio_formats = formats
+
+    async def reattach(self, db: AsyncSession) -> None:
+        """Continue a parked in-memory session on a new connection's DB session."""
+        self.db = db
+        db.add(self.child)
+        db.add(self.conversation)
+        self.conversation.ended_at = None
+        data_versions.touch(db, self.user_id)
+        await db.commit()
+        self.resumed = True
+
+    async def process_audio(self, audio_bytes: bytes, sink: ResponseSink | None = None) -> dict:
+        """Full pipeline: STT -> safety check -> LLM -> safety check -> TTS.
+
+        With a sink, audio is streamed through it segment by segment and the returned
+        dict carries only metadata; without one, the full audio is returned.
+        """
+        stt, llm, tts = await asyncio.gather(
+            get_stt_provider(self.user_id), get_llm_provider(self.user_id), get_tts_provider(self.user_id)
+        )
 
         # 1. Speech to text
-        stt_result: STTResponse = await stt.transcribe(audio_bytes, language=self.language)
+        async with self._slot(stt, PRIORITY_NEW_TURN):
+            stt_result: STTResponse = await stt.transcribe(audio_bytes, language=self.language)
         child_text = stt_result.text.strip()
 
         if not child_text:
@@ -80,19 +344,57 @@ class ConversationSession:
             llm_result = None
         else:
             self.history.append(LLMMessage(role="user", content=child_text))
-            llm_result: LLMResponse = await llm.chat(self.history, system_prompt=self.system_prompt)
+            messages, system_prompt = self._llm_context(child_text)
+            llm, route = llm.route(messages, system_prompt)
+            async with self._slot(llm, PRIORITY_IN_TURN, tokens=self._estimate_llm_tokens(messages, system_prompt)) as lease:
+                started = time.monotonic()
+                llm_result: LLMResponse = await llm.chat(messages, system_prompt=system_prompt)
+                lease.settle(llm_result.input_tokens + llm_result.output_tokens)
+            llm_result.metadata.update(
+                route_tier=route.tier, route_reason=route.reason, latency_ms=int((time.monotonic() - started) * 1000)
+            )
             response_text = sanitize_for_child(llm_result.text)
             char_emotion = suggest_character_emotion(child_emotion)
             self.history.append(LLMMessage(role="assistant", content=response_text))
+            self._evict()
 
         self._last_response_text = response_text
+        await self._cancel_speculation()
 
-        # 4. Text to speech
-        tts_result: TTSResponse = await tts.synthesize(response_text, language=self.language)
+        # 4. Text to speech, streamed to the client as segments become ready
+        head = {
+            "text": response_text,
+            "emotion": char_emotion,
+            "child_text": child_text,
+            "child_emotion": child_emotion,
+        }
+        speech = self._speech(tts, response_text, self.language, PRIORITY_IN_TURN)
+        try:
+            result = await self._deliver(head, speech, sink, speech.audio_format)
+        finally:
+            # Record spend even if the socket dropped mid-stream
+            await self._record_turn(
+                child_text, response_text, char_emotion, stt_result, llm_result, speech.cost_usd, speech.duration_seconds
+            )
+
+        self._last_speech = speech
+        self._start_speculation(tts, response_text)
+        return result
 
+    async def _record_turn(
+        self,
+        child_text: str,
+        response_text: str,
+        char_emotion: str,
+        stt_result: STTResponse,
+        llm_result: LLMResponse | None,
+        tts_cost: Decimal,
+        tts_duration_seconds: float,
+    ) -> None:
         # Save character message
-        total_cost = (llm_result.cost_usd if llm_result else Decimal("0")) + tts_result.cost_usd + stt_result.cost_usd
+        total_cost = (llm_result.cost_usd if llm_result else Decimal("0")) + tts_cost + stt_result.cost_usd
         total_tokens = (llm_result.input_tokens + llm_result.output_tokens) if llm_result else 0
+        routing = llm_result.metadata if llm_result else {}
 
         char_msg = Message(
             conversation_id=self.conversation.id,
@@ -100,16 +402,24 @@ class ConversationSession:
             content=response_text,
             language=self.language,
             emotion=char_emotion,
+            audio_duration_ms=int(tts_duration_seconds * 1000),
             tokens_used=total_tokens,
             cost_usd=total_cost,
+            llm_model=llm_result.model if llm_result else None,
+            route_tier=routing.get("route_tier"),
+            route_reason=routing.get("route_reason"),
+            llm_latency_ms=routing.get("latency_ms"),
         )
         self.db.add(char_msg)
 
         # Update conversation totals
         self.conversation.total_tokens += total_tokens
         self.conversation.estimated_cost_usd += total_cost
+        self.conversation.message_count += 2
+        self.conversation.audio_duration_ms += int(stt_result.duration_seconds * 1000) + char_msg.audio_duration_ms
 
         # Track usage
+        speculative_chars, speculative_cost = self._drain_speculative_usage()
         await track_usage(
             self.db,
             self.user_id,
@@ -117,43 +427,38 @@ class ConversationSession:
             tts_chars=len(response_text),
             stt_seconds=stt_result.duration_seconds,
             cost_usd=total_cost,
+            speculative_tts_chars=speculative_chars,
+            speculative_cost_usd=speculative_cost,
         )
         await self.db.commit()
 
-        return {
-            "audio": tts_result.audio_bytes,
-            "text": response_text,
-            "emotion": char_emotion,
-            "child_text": child_text,
-            "child_emotion": child_emotion,
-            "format": tts_result.format,
-        }
-
-    async def handle_command(self, action: str, value: str = "") -> dict:
+    async def handle_command(self, action: str, value: str = "", sink: ResponseSink | None = None) -> dict:
         """Handle round control commands."""
         if action == "repeat" and self._last_response_text:
-            tts = await get_tts_provider(self.db, self.user_id)
-            tts_result = await tts.synthesize(self._last_response_text, language=self.language)
-            return {
-                "audio": tts_result.audio_bytes,
-                "text": self._last_response_text,
-                "emotion": "happy",
-                "format": tts_result.format,
-            }
+            head = {"text": self._last_response_text, "emotion": "happy"}
+            # Replay the audio we just sent when we still have all of it
+            segments = self._last_speech.completed() if self._last_speech else None
+            if segments is not None:
+                return await self._deliver(head, replay(segments), sink, segments[0].format)
+            tts = await get_tts_provider(self.user_id)
+            speech = self._speech(tts, self._last_response_text, self.language, PRIORITY_NEW_TURN)
+            return await self._deliver(head, speech, sink, speech.audio_format)
 
         elif action == "slower" and self._last_response_text:
-            tts = await get_tts_provider(self.db, self.user_id)
-            # Re-synthesize at slower speed (handled in TTS provider)
-            tts_result = await tts.synthesize(self._last_response_text, language=self.language)
-            return {
-                "audio": tts_result.audio_bytes,
-                "text": self._last_response_text,
-                "emotion": "patient",
-                "format": tts_result.format,
-            }
+            head = {"text": self._last_response_text, "emotion": "patient"}
+            segments = await self._take_speculation(self._last_response_text)
+            metrics.inc("speculative_tts_total", outcome="hit" if segments is not None else "miss")
+            if segments is not None:
+                return await self._deliver(head, replay(segments), sink, segments[0].format)
+            tts = await get_tts_provider(self.user_id)
+            speech = self._speech(
+                tts, self._last_response_text, self.language, PRIORITY_NEW_TURN, speed=settings.tts_slower_speed
+            )
+            return await self._deliver(head, speech, sink, speech.audio_format)
 
         elif action == "switch_language" and value:
             self.language = value
+            await self._cancel_speculation()
             # Rebuild system prompt for new language
             self.system_prompt = build_system_prompt(
                 character_id=self.child.character_id,
@@ -168,19 +473,23 @@ class ConversationSession:
                 "es": f"¡Está bien! ¡Hablemos español ahora, {self.child.name}!",
             }
             text = greetings.get(value, greetings["en"])
-            tts = await get_tts_provider(self.db, self.user_id)
-            tts_result = await tts.synthesize(text, language=value)
-            return {
-                "audio": tts_result.audio_bytes,
-                "text": text,
-                "emotion": "excited",
-                "format": tts_result.format,
-            }
+            tts = await get_tts_provider(self.user_id)
+            speech = self._speech(tts, text, value, PRIORITY_NEW_TURN)
+            return await self._deliver({"text": text, "emotion": "excited"}, speech, sink, speech.audio_format)
 
         return {"error": "unknown_command"}
 
     async def end(self):
+        await self._cancel_speculation()
         if self.conversation:
-            from datetime import datetime, timezone
             self.conversation.ended_at = datetime.now(timezone.utc)
+            data_versions.touch(self.db, self.user_id)
+            speculative_chars, speculative_cost = self._drain_speculative_usage()
+            if speculative_chars:
+                await track_usage(
+                    self.db,
+                    self.user_id,
+                    speculative_tts_chars=speculative_chars,
+                    speculative_cost_usd=speculative_cost,
+                )
             await self.db.commit()
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], None]
+
+_PENDING_KEY = "coordination_pending"
+
+
+class LocalBackend:
+    """In-process coordination: events reach this process's subscribers only and
+    counters live in memory. Correct for a single worker, the default."""
+
+    def __init__(self):
+        # Identifies the counter space; counters restart with the process, so must the epoch
+        self.epoch = uuid.uuid4().hex[:8]
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+        self._counters: dict[str, int] = defaultdict(int)
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel].append(handler)
+
+    def _dispatch(self, channel: str, payload: dict) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception(f"Coordination handler for {channel} failed")
+
+    def publish(self, channel: str, payload: dict) -> None:
+        """Deliver to every subscriber, in this process immediately and in others as
+        soon as the backend carries it there. Payloads must be JSON-serializable."""
+        metrics.inc("coordination_events_total", channel=channel, direction="out")
+        self._dispatch(channel, payload)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        self._counters[key] += amount
+        return self._counters[key]
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class SQLiteBackend(LocalBackend):
+    """Coordinates every worker on one host through a shared SQLite file.
+
+    Events are appended to a table that each worker polls; counters are rows updated
+    atomically. A stand-in for a network backend when scaling out across processes.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.origin = uuid.uuid4().hex
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, payload TEXT NOT NULL, "
+            "origin TEXT NOT NULL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        # Counters outlive any one worker, so the epoch is stored with them
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (self.epoch,))
+        self.epoch = self._conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+        self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        self._lock = asyncio.Lock()
+        self._outbox: list[tuple[str, str, str, float]] = []
+        self._poller: asyncio.Task | None = None
+
+    async def _run(self, fn, *args):
+        # One connection, used from one thread at a time
+        async with self._lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def publish(self, channel: str, payload: dict) -> None:
+        super().publish(channel, payload)
+        self._outbox.append((channel, json.dumps(payload), self.origin, time.time()))
+
+    def _exchange(self, outbox: list) -> list[tuple[int, str, str]]:
+        if outbox:
+            self._conn.executemany(
+                "INSERT INTO events (channel, payload, origin, created_at) VALUES (?, ?, ?, ?)", outbox
+            )
+        return self._conn.execute(
+            "SELECT id, channel, payload FROM events WHERE id > ? AND origin != ? ORDER BY id",
+            (self._last_id, self.origin),
+        ).fetchall()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - settings.coordination_event_retention_seconds
+        self._conn.execute("DELETE FROM events WHERE created_at < ?", (cutoff,))
+
+    async def poll(self) -> None:
+        """Flush this worker's events and deliver everyone else's."""
+        outbox, self._outbox = self._outbox, []
+        try:
+            rows = await self._run(self._exchange, outbox)
+        except BaseException:
+            self._outbox[:0] = outbox
+            raise
+        for event_id, channel, payload in rows:
+            self._last_id = max(self._last_id, event_id)
+            metrics.inc("coordination_events_total", channel=channel, direction="in")
+            self._dispatch(channel, json.loads(payload))
+
+    async def _poll_loop(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            try:
+                await self.poll()
+                if time.monotonic() - last_prune > settings.coordination_event_retention_seconds:
+                    await self._run(self._prune)
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Coordination poll failed")
+            await asyncio.sleep(settings.coordination_poll_interval_seconds)
+
+    def _incr(self, key: str, amount: int) -> int:
+        return self._conn.execute(
+            "INSERT INTO counters (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value RETURNING value",
+            (key, amount),
+        ).fetchone()[0]
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self._run(self._incr, key, amount)
+
+    async def start(self) -> None:
+        self._poller = asyncio.create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        if self._poller:
+            self._poller.cancel()
+            self._poller = None
+        await self.poll()
+
+
+def _create_backend(name: str) -> LocalBackend:
+    if name == "sqlite":
+        return SQLiteBackend(settings.coordination_sqlite_path)
+    if name != "local":
+        raise ValueError(f"Unknown coordination backend: {name}")
+    return LocalBackend()
+
+
+coordination = _create_backend(settings.coordination_backend)
+
+
+def publish_after_commit(session: Session, channel: str, payload: dict) -> None:
+    """Publish once the session's transaction commits; dropped if it rolls back.
+
+    Publishing earlier would let another worker reload the old row and cache it.
+    """
+    session.info.setdefault(_PENDING_KEY, []).append((channel, payload))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for channel, payload in session.info.pop(_PENDING_KEY, ()):
+        coordination.publish(channel, payload)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,10 +1,14 @@
-from datetime import date, timezone, datetime
+from datetime import date
 from decimal import Decimal
 
-from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.daily_usage import DailyUsage
+from app.services.data_version import data_versions
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
 
 async def track_usage(
@@ -16,26 +20,50 @@ async def track_usage(
     cost_usd: Decimal = Decimal("0"),
     duration_ms: int = 0,
     is_new_session: bool = False,
+    speculative_tts_chars: int = 0,
+    speculative_cost_usd: Decimal = Decimal("0"),
 ):
-    """Increment daily usage counters."""
+    """Increment daily usage counters.
+
+    Increments are applied in SQL so concurrent sessions of the same parent never
+    overwrite each other's counts, whichever writer creates the day's row.
+    """
     today = date.today()
+    data_versions.touch(db, user_id)
+
+    # Column defaults only apply at INSERT, so start the counters explicitly
+    insert = _INSERTS[db.bind.dialect.name]
+    await db.execute(
+        insert(DailyUsage)
+        .values(
+            user_id=user_id,
+            date=today,
+            total_sessions=0,
+            total_duration_ms=0,
+            total_tokens=0,
+            total_cost_usd=Decimal("0"),
+            llm_tokens=0,
+            tts_chars=0,
+            stt_seconds=Decimal("0"),
+            speculative_tts_chars=0,
+            speculative_cost_usd=Decimal("0"),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "date"])
+    )
 
-    result = await db.execute(
-        select(DailyUsage).where(DailyUsage.user_id == user_id, DailyUsage.date == today)
+    await db.execute(
+        update(DailyUsage)
+        .where(DailyUsage.user_id == user_id, DailyUsage.date == today)
+        .values(
+            total_tokens=DailyUsage.total_tokens + llm_tokens,
+            total_cost_usd=DailyUsage.total_cost_usd + cost_usd + speculative_cost_usd,
+            total_duration_ms=DailyUsage.total_duration_ms + duration_ms,
+            llm_tokens=DailyUsage.llm_tokens + llm_tokens,
+            tts_chars=DailyUsage.tts_chars + tts_chars,
+            stt_seconds=DailyUsage.stt_seconds + Decimal(str(stt_seconds)),
+            speculative_tts_chars=DailyUsage.speculative_tts_chars + speculative_tts_chars,
+            speculative_cost_usd=DailyUsage.speculative_cost_usd + speculative_cost_usd,
+            total_sessions=DailyUsage.total_sessions + (1 if is_new_session else 0),
+        )
+        .execution_options(synchronize_session=False)
     )
-    usage = result.scalar_one_or_none()
-
-    if usage is None:
-        usage = DailyUsage(user_id=user_id, date=today)
-        db.add(usage)
-
-    usage.total_tokens += llm_tokens
-    usage.total_cost_usd += cost_usd
-    usage.total_duration_ms += duration_ms
-    usage.llm_tokens += llm_tokens
-    usage.tts_chars += tts_chars
-    usage.stt_seconds += Decimal(str(stt_seconds))
-    if is_new_session:
-        usage.total_sessions += 1
-
-    await db.flush()
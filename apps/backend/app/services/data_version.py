@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.services.coordination import coordination
+
+logger = logging.getLogger(__name__)
+
+_TOUCHED_KEY = "data_version_touched"
+
+
+class DataVersions:
+    """Per-user counters bumped whenever a parent's dashboard data changes.
+
+    Read endpoints derive their ETags from the counter, so a poll can be answered with
+    304 before any query runs. The counters are shared through the coordination backend
+    and each bump is broadcast, so every worker tags the same data with the same version.
+    A user this worker has not heard about yet gets a tag only this worker issues.
+    """
+
+    def __init__(self):
+        self.boot_id = uuid.uuid4().hex[:8]
+        # user_id -> (version, applied_at)
+        self._versions: dict[uuid.UUID, tuple[int, float]] = {}
+        # Committed writes whose bump hasn't landed yet, and users whose last bump failed;
+        # either way the current tag may still describe the old data
+        self._pending: Counter[uuid.UUID] = Counter()
+        self._failed: set[uuid.UUID] = set()
+        self._tasks: set[asyncio.Task] = set()
+        coordination.subscribe("data_version", self._on_version)
+
+    def tag(self, user_id: uuid.UUID) -> str:
+        entry = self._versions.get(user_id)
+        if entry is None:
+            return f"{self.boot_id}:unseen"
+        return f"{coordination.epoch}:{entry[0]}"
+
+    def settled(self, user_id: uuid.UUID) -> bool:
+        """False while a committed write of user_id's is not yet reflected in its tag."""
+        return user_id not in self._pending and user_id not in self._failed
+
+    def changed_within(self, user_id: uuid.UUID, seconds: float) -> bool:
+        return time.monotonic() - self._versions.get(user_id, (0, float("-inf")))[1] < seconds
+
+    def _on_version(self, payload: dict) -> None:
+        user_id = uuid.UUID(payload["user_id"])
+        if payload["version"] > self._versions.get(user_id, (0, 0.0))[0]:
+            self._versions[user_id] = (payload["version"], time.monotonic())
+            self._failed.discard(user_id)
+
+    async def bump(self, user_id: uuid.UUID) -> None:
+        version = await coordination.incr(f"data_version:{user_id}")
+        coordination.publish("data_version", {"user_id": str(user_id), "version": version})
+
+    def _schedule_bump(self, user_id: uuid.UUID) -> None:
+        # Marked before the commit returns, so until the bump lands polls get full
+        # responses rather than a 304 for the old version
+        self._pending[user_id] += 1
+        task = asyncio.get_running_loop().create_task(self._settle(user_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._bump_done)
+
+    async def _settle(self, user_id: uuid.UUID) -> None:
+        try:
+            # Publishing applies the new version here before this returns
+            await self.bump(user_id)
+        except BaseException:
+            self._failed.add(user_id)
+            raise
+        finally:
+            self._pending[user_id] -= 1
+            if not self._pending[user_id]:
+                del self._pending[user_id]
+
+    def _bump_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Data version bump failed: {task.exception()}")
+
+    async def flush(self) -> None:
+        """Wait for bumps already scheduled, so they are published before shutdown."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def touch(self, db: AsyncSession, user_id: uuid.UUID) -> None:
+        """Bump user_id's version once the session's transaction commits.
+
+        Bumping before the commit would let a concurrent poll pair the new version
+        with the old data.
+        """
+        db.info.setdefault(_TOUCHED_KEY, set()).add(user_id)
+
+
+data_versions = DataVersions()
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_touched(session: Session) -> None:
+    for user_id in session.info.pop(_TOUCHED_KEY, ()):
+        data_versions._schedule_bump(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_touched(session: Session, previous_transaction) -> None:
+    session.info.pop(_TOUCHED_KEY, None)
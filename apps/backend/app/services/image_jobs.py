@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import unicodedata
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.image_job import (
+    IMAGE_JOB_FAILED,
+    IMAGE_JOB_QUEUED,
+    IMAGE_JOB_RUNNING,
+    IMAGE_JOB_SUCCEEDED,
+    ImageJob,
+)
+from app.providers.clients import http_client
+from app.providers.factory import get_image_provider
+from app.providers.resilience import ProviderUnavailableError, call_with_resilience
+from app.services.cost import track_usage
+from app.services.metrics import metrics
+from app.services.scheduler import provider_scheduler, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text: str) -> str:
+    # Case, width and spacing variants of a prompt ask for the same picture
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def dedupe_key(prompt: str, style: str, model: str) -> str:
+    return hashlib.sha256(f"{_normalize(prompt)}\x1f{_normalize(style)}\x1f{model}".encode()).hexdigest()
+
+
+def sniff_content_type(data: bytes) -> str:
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "application/octet-stream"
+
+
+def cache_path(content_hash: str) -> Path:
+    # Fanned out by the first byte so no directory grows too large
+    return Path(settings.image_cache_dir) / content_hash[:2] / content_hash
+
+
+def _store(data: bytes) -> str:
+    """Write the bytes under their sha256 unless already cached; returns the hash."""
+    content_hash = hashlib.sha256(data).hexdigest()
+    path = cache_path(content_hash)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Temp file + rename, so readers never see a partial image
+        tmp = path.with_name(f"{content_hash}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    return content_hash
+
+
+def _retry_delay(attempts: int, e: ProviderUnavailableError) -> float:
+    # Doubling per attempt, so a long outage isn't hit again every poll; a longer hint wins
+    backoff = min(settings.image_job_retry_max_seconds, settings.image_job_retry_base_seconds * 2 ** (attempts - 1))
+    return max(backoff, e.retry_after or 0.0)
+
+
+async def _download(url: str) -> bytes:
+    client = http_client()
+
+    async def request() -> bytes:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            chunks, size = [], 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > settings.image_max_bytes:
+                    raise ValueError(f"image exceeds {settings.image_max_bytes} bytes")
+                chunks.append(chunk)
+            return b"".join(chunks)
+
+    return await call_with_resilience("image:download", request)
+
+
+class ImageJobQueue:
+    """Bounded pool of background workers draining the image_jobs table.
+
+    Each worker runs one job at a time, so a process never has more than
+    image_job_workers generations in flight, and request handlers only insert rows.
+    Submitting wakes the local workers; jobs submitted to other processes, and jobs
+    whose worker died mid-run, are found by polling.
+    """
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+
+    async def submit(self, db: AsyncSession, user_id: uuid.UUID, prompt: str, style: str = "") -> tuple[ImageJob, bool]:
+        """Queue a generation, or return the account's existing job for the same picture.
+
+        Returns (job, created). Failed jobs don't count as duplicates, so resubmitting retries.
+        Raises RuntimeError when the account has no image provider.
+        """
+        provider = await get_image_provider(user_id)
+        key = dedupe_key(prompt, style, provider.model())
+        if existing := await self._existing(db, user_id, key):
+            metrics.inc("image_jobs_total", outcome="deduplicated")
+            return existing, False
+
+        job = ImageJob(
+            user_id=user_id,
+            dedupe_key=key,
+            prompt=prompt,
+            style=style,
+            provider=provider.name(),
+            model=provider.model(),
+        )
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent submit of the same picture committed first
+            await db.rollback()
+            if not (existing := await self._existing(db, user_id, key)):
+                raise
+            metrics.inc("image_jobs_total", outcome="deduplicated")
+            return existing, False
+        metrics.inc("image_jobs_total", outcome="queued")
+        self._wakeup.set()
+        return job, True
+
+    async def _existing(self, db: AsyncSession, user_id: uuid.UUID, key: str) -> ImageJob | None:
+        # The unique index allows at most one job that hasn't failed
+        result = await db.execute(
+            select(ImageJob).where(
+                ImageJob.user_id == user_id, ImageJob.dedupe_key == key, ImageJob.status != IMAGE_JOB_FAILED
+            )
+        )
+        return result.scalar_one_or_none()
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(settings.image_job_workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running go back to the queue."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _claim(self) -> ImageJob | None:
+        """Mark the oldest runnable job as running by this worker and return it."""
+        now = datetime.now(timezone.utc)
+        expired = now - timedelta(seconds=settings.image_job_lease_seconds)
+        async with async_session() as db:
+            result = await db.execute(
+                select(ImageJob)
+                .where(or_(
+                    and_(
+                        ImageJob.status == IMAGE_JOB_QUEUED,
+                        or_(ImageJob.not_before.is_(None), ImageJob.not_before <= now),
+                    ),
+                    and_(ImageJob.status == IMAGE_JOB_RUNNING, ImageJob.started_at < expired),
+                ))
+                .order_by(ImageJob.created_at)
+                .limit(settings.image_job_workers)
+            )
+            for job in result.scalars().all():
+                # Another worker, here or in another process, that got there first wins
+                unchanged = ImageJob.started_at.is_(None) if job.started_at is None else ImageJob.started_at == job.started_at
+                claimed = await db.execute(
+                    update(ImageJob)
+                    .where(ImageJob.id == job.id, ImageJob.status == job.status, unchanged)
+                    .values(status=IMAGE_JOB_RUNNING, started_at=now, attempts=ImageJob.attempts + 1)
+                )
+                await db.commit()
+                if claimed.rowcount == 1:
+                    await db.refresh(job)
+                    return job
+        return None
+
+    async def _finish(self, job_id: uuid.UUID, **values) -> None:
+        async with async_session() as db:
+            await db.execute(update(ImageJob).where(ImageJob.id == job_id).values(**values))
+            await db.commit()
+
+    async def _run(self, job: ImageJob) -> None:
+        if job.attempts > settings.image_job_max_attempts:
+            # Reclaimed after its last lease ran out: the worker keeps dying on this job
+            await self._finish(
+                job.id, status=IMAGE_JOB_FAILED, error="worker lease expired", finished_at=datetime.now(timezone.utc)
+            )
+            metrics.inc("image_jobs_total", outcome="failed")
+            return
+        started = time.monotonic()
+        try:
+            provider = await get_image_provider(job.user_id)
+            # Same lanes as voice turns, behind them: pre-generation never delays a reply
+            async with provider_scheduler.slot(
+                provider.name(), provider.model(), family=job.user_id, priority=PRIORITY_BACKGROUND
+            ):
+                image = await provider.generate(job.prompt, style=job.style)
+            data = image.image_bytes or await _download(image.image_url)
+            if not data:
+                raise ValueError("provider returned no image")
+            content_hash = await asyncio.to_thread(_store, data)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._finish(job.id, status=IMAGE_JOB_QUEUED, started_at=None))
+            raise
+        except Exception as e:
+            # Outages are worth another attempt later; anything else won't change by retrying
+            retry = isinstance(e, ProviderUnavailableError) and job.attempts < settings.image_job_max_attempts
+            logger.warning(f"Image job {job.id} attempt {job.attempts} failed: {e}")
+            if retry:
+                not_before = datetime.now(timezone.utc) + timedelta(seconds=_retry_delay(job.attempts, e))
+                await self._finish(
+                    job.id, status=IMAGE_JOB_QUEUED, started_at=None, not_before=not_before, error=str(e)
+                )
+            else:
+                await self._finish(
+                    job.id, status=IMAGE_JOB_FAILED, error=str(e), finished_at=datetime.now(timezone.utc)
+                )
+            metrics.inc("image_jobs_total", outcome="retried" if retry else "failed")
+            return
+
+        async with async_session() as db:
+            await db.execute(
+                update(ImageJob)
+                .where(ImageJob.id == job.id)
+                .values(
+                    status=IMAGE_JOB_SUCCEEDED,
+                    content_hash=content_hash,
+                    content_type=sniff_content_type(data),
+                    size_bytes=len(data),
+                    cost_usd=image.cost_usd,
+                    error=None,
+                    finished_at=datetime.now(timezone.utc),
+                )
+            )
+            await track_usage(db, job.user_id, cost_usd=image.cost_usd)
+            await db.commit()
+        metrics.inc("image_jobs_total", outcome="succeeded")
+        metrics.observe("image_job_seconds", time.monotonic() - started)
+
+    async def _work(self) -> None:
+        while True:
+            # Cleared before looking, so a submit landing in between still wakes us
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+                if job is not None:
+                    await self._run(job)
+                    continue
+            except Exception as e:
+                logger.error(f"Image worker failed: {e}", exc_info=True)
+            try:
+                async with asyncio.timeout(settings.image_job_poll_seconds):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+
+
+image_jobs = ImageJobQueue()
@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import math
+import re
+import unicodedata
+import uuid
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import orjson
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.config import settings
+from app.database import async_session
+from app.models.child_memory import ChildMemory
+from app.models.conversation import Conversation, Message
+from app.services.metrics import metrics
+from app.services.safety import check_content_safety
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Rough chars-per-token ratio for non-CJK text; CJK characters count as a token each
+CHARS_PER_TOKEN = 4
+# Messages read per catch-up query
+CATCH_UP_BATCH = 500
+
+_CJK_RUN_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+_WORD_RE = re.compile(r"[^\W_]+")
+# Function words of the supported languages carry no topic
+_STOPWORDS = frozenset(
+    "a an and are be but can did do does for from had has have he her him his how i if in is it its "
+    "me my no not of on or our she so that the their them then there they this to too was we were "
+    "what when where which who why will with you your yes ok okay "
+    "al como con de del el en es esta este la las lo los me mi muy no para pero por que se si su "
+    "te tu un una uno y yo".split()
+)
+
+_inserts = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_load_flight = SingleFlight("memory")
+
+
+def tokenize(text: str) -> list[str]:
+    """Index terms for zh/en/es text: CJK character bigrams, and folded, depluralized words."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    tokens = []
+    for run in _CJK_RUN_RE.findall(text):
+        tokens.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+    # Strip accents so "canción" and "cancion" meet
+    rest = "".join(ch for ch in unicodedata.normalize("NFKD", _CJK_RUN_RE.sub(" ", text)) if not unicodedata.combining(ch))
+    for word in _WORD_RE.findall(rest):
+        if word in _STOPWORDS:
+            continue
+        # Crude plural folding, good enough for "dinosaurs"/"perros"
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def estimate_tokens(text: str) -> int:
+    cjk = sum(len(run) for run in _CJK_RUN_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class MemoryDoc:
+    """One past turn: what the child said and what the character answered."""
+
+    conversation_id: str
+    day: str  # ISO date of the turn
+    child_text: str
+    reply_text: str
+
+    @property
+    def terms(self) -> list[str]:
+        return tokenize(f"{self.child_text} {self.reply_text}")
+
+
+class MemoryIndex:
+    """In-memory BM25 index over one child's past turns.
+
+    Only the turns are persisted; the postings are rebuilt when the index is loaded,
+    which keeps the stored form small.
+    """
+
+    def __init__(self, docs: list[MemoryDoc] | None = None):
+        self.docs: list[MemoryDoc] = []
+        # term -> [(doc index, term frequency)]
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._lengths: list[int] = []
+        self._total_length = 0
+        for doc in docs or []:
+            self.add(doc)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc: MemoryDoc) -> None:
+        index = len(self.docs)
+        counts = Counter(doc.terms)
+        for term, tf in counts.items():
+            self._postings[term].append((index, tf))
+        self.docs.append(doc)
+        self._lengths.append(sum(counts.values()))
+        self._total_length += self._lengths[-1]
+
+    def search(self, query: str, limit: int, exclude_conversation: str | None = None) -> list[tuple[float, MemoryDoc]]:
+        """Best-scoring turns for `query`, highest first."""
+        if not self.docs:
+            return []
+        average_length = self._total_length / len(self.docs) or 1
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[index] / average_length)
+                scores[index] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        hits = []
+        for index, score in ranked:
+            doc = self.docs[index]
+            if doc.conversation_id == exclude_conversation:
+                continue
+            hits.append((score, doc))
+            if len(hits) == limit:
+                break
+        return hits
+
+    def to_bytes(self) -> bytes:
+        rows = [[d.conversation_id, d.day, d.child_text, d.reply_text] for d in self.docs]
+        return zlib.compress(orjson.dumps(rows), 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MemoryIndex":
+        return cls([MemoryDoc(*row) for row in orjson.loads(zlib.decompress(data))])
+
+
+class _ChildMemory:
+    def __init__(self, index: MemoryIndex, watermark: tuple[datetime, uuid.UUID] | None):
+        self.index = index
+        self.watermark = watermark
+
+
+def _clip(text: str) -> str:
+    limit = settings.memory_snippet_chars // 2
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def turn_doc(conversation_id: uuid.UUID, day: str, child_text: str, reply_text: str) -> MemoryDoc:
+    """A turn as it is indexed, each side clipped to fit a snippet."""
+    return MemoryDoc(str(conversation_id), day, _clip(child_text), _clip(reply_text))
+
+
+class ChildMemoryStore:
+    """Loads, catches up and persists per-child memory indexes, keeping recent ones in process."""
+
+    def __init__(self):
+        self._cache: OrderedDict[uuid.UUID, _ChildMemory] = OrderedDict()
+
+    async def load(self, child_id: uuid.UUID) -> MemoryIndex:
+        """The child's index, including every turn stored since it was last read.
+
+        Memory is a nicety: if it can't be loaded the session goes on with an empty index.
+        """
+        try:
+            return await _load_flight.do(child_id, lambda: self._load(child_id))
+        except Exception as e:
+            logger.warning(f"Loading memory of child {child_id} failed: {e}")
+            return MemoryIndex()
+
+    async def _load(self, child_id: uuid.UUID) -> MemoryIndex:
+        memory = self._cache.get(child_id)
+        if memory is None:
+            async with async_session() as db:
+                row = await db.get(ChildMemory, child_id)
+            if row is None:
+                memory = _ChildMemory(MemoryIndex(), None)
+            else:
+                watermark = None
+                if row.last_message_created_at is not None:
+                    watermark = (row.last_message_created_at, row.last_message_id)
+                # Rebuilding the postings of a long history takes tens of milliseconds
+                memory = _ChildMemory(await asyncio.to_thread(MemoryIndex.from_bytes, row.data), watermark)
+        if await self._catch_up(child_id, memory):
+            await self._save(child_id, memory)
+        self._cache[child_id] = memory
+        self._cache.move_to_end(child_id)
+        while len(self._cache) > settings.memory_cache_size:
+            self._cache.popitem(last=False)
+        return memory.index
+
+    async def _catch_up(self, child_id: uuid.UUID, memory: _ChildMemory) -> bool:
+        """Index the child's turns stored after the watermark. Returns whether any were added."""
+        added = 0
+        pending: dict[uuid.UUID, Message] = {}
+        cursor = memory.watermark
+        while True:
+            query = (
+                select(Message)
+                .join(Conversation, Conversation.id == Message.conversation_id)
+                .where(Conversation.child_id == child_id)
+                .order_by(Message.created_at, Message.id)
+                .limit(CATCH_UP_BATCH)
+            )
+            if cursor:
+                created_at, message_id = cursor
+                query = query.where(
+                    or_(Message.created_at > created_at, and_(Message.created_at == created_at, Message.id > message_id))
+                )
+            async with async_session() as db:
+                messages = list((await db.execute(query)).scalars())
+            if messages:
+                cursor = (messages[-1].created_at, messages[-1].id)
+            for message in messages:
+                if message.role == "child":
+                    pending[message.conversation_id] = message
+                    continue
+                said = pending.pop(message.conversation_id, None)
+                # The watermark only passes complete turns, so a reply still being written isn't lost
+                memory.watermark = (message.created_at, message.id)
+                # Unsafe inputs were answered with a redirect; nothing worth remembering
+                if said is None or not check_content_safety(said.content)[0]:
+                    continue
+                memory.index.add(
+                    turn_doc(message.conversation_id, said.created_at.date().isoformat(), said.content, message.content)
+                )
+                added += 1
+            if len(messages) < CATCH_UP_BATCH:
+                break
+        if len(memory.index) > settings.memory_max_documents:
+            memory.index = MemoryIndex(memory.index.docs[-settings.memory_max_documents:])
+        if added:
+            metrics.inc("memory_indexed_turns_total", added)
+        return added > 0
+
+    async def _save(self, child_id: uuid.UUID, memory: _ChildMemory) -> None:
+        created_at, message_id = memory.watermark
+        values = dict(
+            data=memory.index.to_bytes(),
+            document_count=len(memory.index),
+            last_message_created_at=created_at,
+            last_message_id=message_id,
+            updated_at=datetime.now(timezone.utc),
+        )
+        async with async_session() as db:
+            insert = _inserts[db.bind.dialect.name]
+            await db.execute(
+                insert(ChildMemory)
+                .values(child_id=child_id, **values)
+                .on_conflict_do_update(index_elements=["child_id"], set_=values)
+            )
+            await db.commit()
+
+
+def recall(
+    index: MemoryIndex, query: str, exclude_conversation: uuid.UUID | None, session: MemoryIndex | None = None
+) -> list[str]:
+    """Snippets of earlier turns relevant to `query`, within the memory token budget.
+
+    `session` holds turns of the current conversation that are no longer replayed; they
+    compete with the earlier conversations' turns, from which the current one is excluded.
+    """
+    hits = index.search(
+        query,
+        settings.memory_top_k,
+        exclude_conversation=str(exclude_conversation) if exclude_conversation else None,
+    )
+    if session:
+        hits = sorted(hits + session.search(query, settings.memory_top_k), key=lambda hit: hit[0], reverse=True)
+        hits = hits[:settings.memory_top_k]
+    snippets, budget = [], settings.memory_max_tokens
+    for score, doc in hits:
+        if score < settings.memory_min_score:
+            break
+        snippet = f'({doc.day}) Child: "{doc.child_text}" You: "{doc.reply_text}"'
+        cost = estimate_tokens(snippet)
+        if cost > budget:
+            continue
+        snippets.append(snippet)
+        budget -= cost
+    metrics.inc("memory_recalls_total", outcome="hit" if snippets else "miss")
+    return snippets
+
+
+child_memories = ChildMemoryStore()
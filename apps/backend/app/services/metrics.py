@@ -0,0 +1,60 @@
+from collections import defaultdict
+
+# Minimal in-process metrics registry rendered in Prometheus text format at /metrics
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: dict[str, dict[tuple, float]] = defaultdict(dict)
+        # name -> labels -> [count, sum, max]
+        self._summaries: dict[str, dict[tuple, list[float]]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        self._counters[name][_label_key(labels)] += value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        self._gauges[name][_label_key(labels)] = value
+
+    def add_gauge(self, name: str, delta: float, **labels) -> None:
+        key = _label_key(labels)
+        self._gauges[name][key] = self._gauges[name].get(key, 0.0) + delta
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        stats = self._summaries[name].setdefault(_label_key(labels), [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += value
+        stats[2] = max(stats[2], value)
+
+    def render(self) -> str:
+        lines = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        for name, series in sorted(self._gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in series.items():
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        for name, series in sorted(self._summaries.items()):
+            lines.append(f"# TYPE {name} summary")
+            for key, (count, total, peak) in series.items():
+                lines.append(f"{name}_count{_format_labels(key)} {count:g}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total:g}")
+                lines.append(f"{name}_max{_format_labels(key)} {peak:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
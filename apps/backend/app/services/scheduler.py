@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from app.config import settings
+from app.services.metrics import metrics
+
+# Lower value is served first. Once a turn has started (STT done), its LLM/TTS
+# stages jump ahead of STT for new turns so in-progress replies finish quickly.
+PRIORITY_IN_TURN = 0
+PRIORITY_NEW_TURN = 1
+PRIORITY_BACKGROUND = 2
+
+
+@dataclass
+class _Waiter:
+    family: str
+    priority: int
+    tokens: int
+    tag: float
+    seq: int
+    enqueued_at: float
+    future: asyncio.Future = field(repr=False)
+
+
+class _Lane:
+    """Admission state for one provider/model pair."""
+
+    def __init__(self, key: str, concurrency: int, tpm: int):
+        self.key = key
+        self.concurrency = concurrency
+        self.tpm = tpm
+        self.in_flight = 0
+        self.waiters: list[_Waiter] = []
+        # Start-time fair queuing: each family's requests are tagged relative to
+        # the lane's virtual clock so a busy family can't starve a quiet one.
+        self.virtual_time = 0.0
+        self.family_tags: dict[str, float] = {}
+        self.tokens_available = float(tpm)
+        self.last_refill = time.monotonic()
+        self.wake_handle: asyncio.TimerHandle | None = None
+
+    def refill(self) -> None:
+        if not self.tpm:
+            return
+        now = time.monotonic()
+        self.tokens_available = min(self.tpm, self.tokens_available + (now - self.last_refill) * self.tpm / 60)
+        self.last_refill = now
+
+    def publish(self) -> None:
+        metrics.set_gauge("scheduler_queue_depth", len(self.waiters), lane=self.key)
+        metrics.set_gauge("scheduler_in_flight", self.in_flight, lane=self.key)
+
+
+class Lease:
+    """Handed to the caller while it holds a slot; lets it settle actual token usage."""
+
+    def __init__(self, lane: _Lane, reserved: int):
+        self._lane = lane
+        self._reserved = reserved
+
+    def settle(self, actual_tokens: int) -> None:
+        if self._lane.tpm:
+            self._lane.tokens_available += self._reserved - actual_tokens
+            self._reserved = actual_tokens
+
+
+class ProviderScheduler:
+    """Global admission control for provider calls.
+
+    Each provider/model pair gets a lane with a concurrency cap and an optional
+    tokens-per-minute budget. Waiters are ordered by priority, then by a
+    per-family fair-queuing tag.
+    """
+
+    def __init__(self):
+        self._lanes: dict[str, _Lane] = {}
+        self._seq = itertools.count()
+
+    def _lane(self, provider: str, model: str) -> _Lane:
+        key = f"{provider}:{model}" if model else provider
+        if key not in self._lanes:
+            concurrency = settings.provider_concurrency_limits.get(
+                key, settings.provider_concurrency_limits.get(provider, settings.provider_default_concurrency)
+            )
+            tpm = settings.provider_tpm_limits.get(key, settings.provider_tpm_limits.get(provider, 0))
+            self._lanes[key] = _Lane(key, concurrency, tpm)
+        return self._lanes[key]
+
+    def _dispatch(self, lane: _Lane) -> None:
+        lane.refill()
+        # A cancelled task's future is done before its slot() gets to unqueue it
+        lane.waiters = [w for w in lane.waiters if not w.future.done()]
+        while lane.waiters and lane.in_flight < lane.concurrency:
+            waiter = min(lane.waiters, key=lambda w: (w.priority, w.tag, w.seq))
+            if lane.tpm and waiter.tokens > lane.tokens_available:
+                # Hold the line for this waiter rather than letting smaller requests
+                # jump it forever; wake up when the bucket has refilled enough.
+                if lane.wake_handle is None:
+                    delay = (waiter.tokens - lane.tokens_available) * 60 / lane.tpm
+                    lane.wake_handle = asyncio.get_running_loop().call_later(delay, self._wake, lane)
+                break
+            lane.waiters.remove(waiter)
+            lane.virtual_time = max(lane.virtual_time, waiter.tag)
+            self._forget_tag(lane, waiter)
+            lane.in_flight += 1
+            if lane.tpm:
+                lane.tokens_available -= waiter.tokens
+            waiter.future.set_result(None)
+        lane.publish()
+
+    def _forget_tag(self, lane: _Lane, waiter: _Waiter) -> None:
+        # Once a family has nothing queued its tag adds nothing over the virtual clock;
+        # dropping it keeps family_tags to the families currently waiting
+        if lane.family_tags.get(waiter.family) == waiter.tag and all(w.family != waiter.family for w in lane.waiters):
+            del lane.family_tags[waiter.family]
+
+    def _wake(self, lane: _Lane) -> None:
+        lane.wake_handle = None
+        self._dispatch(lane)
+
+    def _release(self, lane: _Lane) -> None:
+        lane.in_flight -= 1
+        self._dispatch(lane)
+
+    @asynccontextmanager
+    async def slot(self, provider: str, model: str, family, priority: int = PRIORITY_NEW_TURN, tokens: int = 0):
+        """Wait for admission to the provider/model lane, then hold a slot for the block."""
+        lane = self._lane(provider, model)
+        family = str(family)
+        tokens = min(tokens, lane.tpm) if lane.tpm else 0
+
+        tag = max(lane.virtual_time, lane.family_tags.get(family, 0.0)) + 1
+        lane.family_tags[family] = tag
+        waiter = _Waiter(
+            family=family,
+            priority=priority,
+            tokens=tokens,
+            tag=tag,
+            seq=next(self._seq),
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        lane.waiters.append(waiter)
+        self._dispatch(lane)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.cancelled():
+                if waiter in lane.waiters:
+                    lane.waiters.remove(waiter)
+                self._forget_tag(lane, waiter)
+                lane.publish()
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as we were cancelled; give the slot back
+                self._release(lane)
+            raise
+
+        metrics.observe("scheduler_wait_seconds", time.monotonic() - waiter.enqueued_at, lane=lane.key, priority=priority)
+        try:
+            yield Lease(lane, tokens)
+        finally:
+            self._release(lane)
+
+
+provider_scheduler = ProviderScheduler()
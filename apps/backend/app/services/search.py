@@ -0,0 +1,90 @@
+import re
+import unicodedata
+
+# Han, kana and Hangul have no spaces between words, so each character is indexed
+# as its own token and a query like "恐龍" becomes the phrase "恐 龍"
+_CJK = "぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_CJK_CHAR_RE = re.compile(f"([{_CJK}])")
+_QUERY_TERM_RE = re.compile(f"[{_CJK}]+|[^\\W_]+")
+_CJK_TERM_RE = re.compile(f"^[{_CJK}]+$")
+
+MAX_QUERY_TERMS = 8
+SNIPPET_CONTEXT_CHARS = 40
+
+# Standalone FTS5 table over the segmented text, keyed by messages.rowid. unicode61
+# folds case and, with remove_diacritics 2, accents ("canción" matches "cancion").
+# The child column holds the owning child's id as a single token, so scoping a search
+# to one family is a posting-list intersection inside FTS rather than a join afterwards.
+FTS_CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts "
+    "USING fts5(body, child, tokenize = 'unicode61 remove_diacritics 2')"
+)
+# Archival deletes messages too, so archived conversations drop out of search
+FTS_DELETE_TRIGGER_SQL = (
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages "
+    "BEGIN DELETE FROM messages_fts WHERE rowid = old.rowid; END"
+)
+FTS_INSERT_SQL = (
+    "INSERT INTO messages_fts (rowid, body, child) "
+    "SELECT messages.rowid, :body, conversations.child_id FROM messages "
+    "JOIN conversations ON conversations.id = messages.conversation_id WHERE messages.id = :id"
+)
+
+
+def segment(text: str) -> str:
+    """Document text as stored in the index."""
+    return _CJK_CHAR_RE.sub(r" \1 ", text)
+
+
+def query_terms(query: str) -> list[str]:
+    return _QUERY_TERM_RE.findall(query)[:MAX_QUERY_TERMS]
+
+
+def build_match_query(terms: list[str], child_tokens: list[str]) -> str:
+    """FTS5 MATCH expression requiring every term within the given children's messages.
+
+    Latin terms also match as prefixes. Terms only ever contain word characters, so
+    quoting them is enough to keep user input from being parsed as FTS syntax.
+    """
+    parts = []
+    for term in terms:
+        if _CJK_TERM_RE.match(term):
+            parts.append('"' + " ".join(term) + '"')
+        else:
+            parts.append(f'"{term}"*')
+    children = " OR ".join(f'"{token}"' for token in child_tokens)
+    return f"child : ({children}) AND body : ({' AND '.join(parts)})"
+
+
+def _fold(text: str) -> str:
+    # Same folding as the tokenizer, keeping one output character per input character
+    return "".join(
+        unicodedata.normalize("NFKD", ch)[0] if ch.isalpha() else ch for ch in text
+    ).lower()
+
+
+def make_snippet(content: str, terms: list[str]) -> tuple[str, list[tuple[int, int]]]:
+    """Excerpt around the first hit, with (start, end) offsets of every hit in the excerpt."""
+    folded = _fold(content)
+    found = []
+    for term in terms:
+        needle = re.escape(_fold(term))
+        # Latin terms match word prefixes, like the index does
+        pattern = needle if _CJK_TERM_RE.match(term) else rf"(?<![^\W_]){needle}"
+        found.extend(m.span() for m in re.finditer(pattern, folded))
+    hits = []
+    for start, end in sorted(found):
+        if hits and start < hits[-1][1]:
+            hits[-1] = (hits[-1][0], max(end, hits[-1][1]))
+        else:
+            hits.append((start, end))
+    if not hits:
+        return content[: SNIPPET_CONTEXT_CHARS * 2], []
+
+    begin = max(0, hits[0][0] - SNIPPET_CONTEXT_CHARS)
+    end = min(len(content), hits[0][1] + SNIPPET_CONTEXT_CHARS)
+    prefix = "…" if begin > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    offset = len(prefix) - begin
+    highlights = [(s + offset, e + offset) for s, e in hits if s >= begin and e <= end]
+    return prefix + content[begin:end] + suffix, highlights
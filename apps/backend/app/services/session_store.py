@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+from app.config import settings
+from app.services.coordination import coordination
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class HotSessionStore:
+    """LRU of recently disconnected sessions, kept for a grace period so a quick
+    reconnect can pick up the in-memory state without touching the database."""
+
+    def __init__(self):
+        # conversation_id -> (parked_at, user_id, child_id, session)
+        self._entries: OrderedDict[uuid.UUID, tuple[float, uuid.UUID, uuid.UUID, object]] = OrderedDict()
+
+    def _evict(self) -> None:
+        cutoff = time.monotonic() - settings.session_hot_grace_seconds
+        while self._entries:
+            conversation_id, (parked_at, *_) = next(iter(self._entries.items()))
+            if parked_at >= cutoff and len(self._entries) <= settings.session_hot_capacity:
+                break
+            del self._entries[conversation_id]
+        metrics.set_gauge("hot_sessions", len(self._entries))
+
+    def park(self, session) -> None:
+        if session.conversation is None:
+            return
+        # Owner ids are captured now: the ORM objects may be expired by the time of take()
+        conversation_id = session.conversation.id
+        self._entries[conversation_id] = (time.monotonic(), session.user_id, session.child.id, session)
+        self._entries.move_to_end(conversation_id)
+        self._evict()
+
+    def take(self, conversation_id: uuid.UUID, user_id: uuid.UUID, child_id: uuid.UUID):
+        """Remove and return the parked session if it is still fresh and belongs to this child."""
+        self._evict()
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            metrics.inc("session_resume_total", source="miss")
+            return None
+        _, owner_id, owner_child_id, session = entry
+        if owner_id != user_id or owner_child_id != child_id:
+            return None
+        del self._entries[conversation_id]
+        metrics.set_gauge("hot_sessions", len(self._entries))
+        metrics.inc("session_resume_total", source="memory")
+        return session
+
+    def discard(self, conversation_id: uuid.UUID) -> None:
+        if self._entries.pop(conversation_id, None) is not None:
+            metrics.set_gauge("hot_sessions", len(self._entries))
+
+
+hot_sessions = HotSessionStore()
+# A conversation resumed on any worker makes every other parked copy of it stale
+coordination.subscribe("session_resumed", lambda payload: hot_sessions.discard(uuid.UUID(payload["conversation_id"])))
+
+
+class LiveSessionRegistry:
+    """Open voice connections of this worker, so a shutdown can drain them.
+
+    A drain refuses new connections and turns, waits for turns already underway to
+    finish, then asks every connection to tell its client to reconnect and close; each
+    connection ends its session (flushing usage) before it unregisters.
+    """
+
+    def __init__(self):
+        self.draining = False
+        # key -> coroutine that tells the client to reconnect and closes the socket
+        self._connections: dict[object, Callable[[], Awaitable[None]]] = {}
+        self._turns = 0
+
+    def register(self, key: object, on_drain: Callable[[], Awaitable[None]]) -> None:
+        self._connections[key] = on_drain
+        metrics.set_gauge("live_voice_sessions", len(self._connections))
+
+    def unregister(self, key: object) -> None:
+        self._connections.pop(key, None)
+        metrics.set_gauge("live_voice_sessions", len(self._connections))
+
+    @asynccontextmanager
+    async def turn(self):
+        self._turns += 1
+        try:
+            yield
+        finally:
+            self._turns -= 1
+
+    @staticmethod
+    async def _wait(condition: Callable[[], bool], deadline: float) -> bool:
+        # Polled rather than event-driven: a drain is rare and may run on another loop
+        while not condition():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def drain(self, timeout: float) -> None:
+        if self.draining:
+            return
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        logger.info(f"Draining {len(self._connections)} voice sessions ({self._turns} turns in flight)")
+        if not await self._wait(lambda: self._turns == 0, deadline):
+            logger.warning(f"Drain deadline passed with {self._turns} turns still in flight")
+        await asyncio.gather(*(on_drain() for on_drain in list(self._connections.values())), return_exceptions=True)
+        if not await self._wait(lambda: not self._connections, deadline):
+            logger.warning(f"Drain deadline passed with {len(self._connections)} sessions still open")
+        metrics.inc("voice_drains_total")
+
+
+live_sessions = LiveSessionRegistry()
@@ -0,0 +1,79 @@
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from app.config import settings
+from app.database import async_session, engine, replica_engine
+from app.models.child import Child
+from app.models.user import User
+from app.providers.factory import prebuild_default_providers
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+async def _open_connections(target: AsyncEngine, count: int) -> None:
+    # Held open together so the pool ends up with `count` distinct connections
+    async with contextlib.AsyncExitStack() as stack:
+        connections = [await stack.enter_async_context(target.connect()) for _ in range(count)]
+        await asyncio.gather(*(c.execute(text("SELECT 1")) for c in connections))
+
+
+async def _prime_queries() -> None:
+    # Mapper configuration and statement compilation otherwise land on the first requests;
+    # these are the lookups every authenticated request and voice connection makes
+    configure_mappers()
+    missing = uuid.uuid4()
+    async with async_session() as db:
+        await db.execute(select(User).where(User.id == missing))
+        await db.execute(select(Child).where(Child.id == missing, Child.user_id == missing))
+
+
+class WarmUp:
+    """Pays a worker's first-request costs before it reports ready on /health.
+
+    Runs in the background once the server is up: connections are accepted meanwhile,
+    they just do not get the warm path yet. A failing step is logged and skipped.
+    """
+
+    def __init__(self):
+        self.ready = False
+
+    async def _step(self, name: str, step) -> None:
+        started = time.perf_counter()
+        try:
+            await step
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            metrics.inc("warmup_failures_total", step=name)
+        metrics.observe("warmup_step_seconds", time.perf_counter() - started, step=name)
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        steps = [
+            # Vendor SDK imports block for hundreds of milliseconds, so they go to a thread
+            self._step("providers", asyncio.to_thread(prebuild_default_providers)),
+            self._step("db_pool", _open_connections(engine, settings.warmup_db_connections)),
+            self._step("queries", _prime_queries()),
+        ]
+        if replica_engine is not None:
+            steps.append(self._step("replica_pool", _open_connections(replica_engine, settings.warmup_db_connections)))
+        tasks = [asyncio.create_task(step) for step in steps]
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=settings.warmup_timeout_seconds)
+        finally:
+            for task in tasks:
+                task.cancel()
+        if pending:
+            logger.warning(f"Warm-up still running after {settings.warmup_timeout_seconds}s, reporting ready")
+        self.ready = True
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+
+warmup = WarmUp()
@@ -0,0 +1,108 @@
+"""Dashboard-polling benchmark for the authenticated read endpoints.
+
+Seeds a scratch SQLite database with one parent account, then polls the endpoints the
+dashboard refreshes, in-process through the ASGI app. It reports requests per second and
+database statements per request, for three clients:
+
+  cold        principal cache cleared before every request (token decode + user select)
+  cached      the default: verified tokens and users come from the principal cache
+  revalidate  cached, and the client sends back its ETags (If-None-Match)
+
+    cd apps/backend
+    python scripts/dashboard_poll_bench.py              # 300 polls of each endpoint
+    python scripts/dashboard_poll_bench.py --polls 1000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Never the configured database: the schema is created and seeded from scratch
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+from sqlalchemy import event
+
+import app.models  # noqa: F401 (registers every table)
+from app.auth.cache import principal_cache
+from app.auth.security import create_access_token
+from app.database import Base, async_session, engine
+from app.main import app
+from app.models import Child, Conversation, User
+
+ENDPOINTS = [
+    "/api/parent/auth/me",
+    "/api/parent/children",
+    "/api/parent/conversations",
+    "/api/parent/usage/daily",
+]
+
+
+async def _seed() -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        user = User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        for name in ("Amy", "Ben", "Cai"):
+            child = Child(user_id=user.id, name=name, age=6, primary_language="en")
+            db.add(child)
+            await db.flush()
+            db.add_all(Conversation(child_id=child.id, language="en") for _ in range(20))
+        await db.commit()
+        return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+
+async def _poll(client: httpx.AsyncClient, headers: dict, mode: str, polls: int) -> tuple[float, int, dict]:
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    etags: dict[str, str] = {}
+    statuses: dict[int, int] = {}
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    try:
+        for _ in range(polls):
+            for url in ENDPOINTS:
+                if mode == "cold":
+                    principal_cache.clear()
+                request_headers = headers
+                if mode == "revalidate" and url in etags:
+                    request_headers = {**headers, "If-None-Match": etags[url]}
+                response = await client.get(url, headers=request_headers)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if etag := response.headers.get("ETag"):
+                    etags[url] = etag
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return time.perf_counter() - started, statements, statuses
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=300)
+    args = parser.parse_args()
+
+    headers = await _seed()
+    requests = args.polls * len(ENDPOINTS)
+    print(f"{args.polls} polls of {len(ENDPOINTS)} endpoints ({requests} requests each)")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for mode in ("cold", "cached", "revalidate"):
+            principal_cache.clear()
+            elapsed, statements, statuses = await _poll(client, headers, mode, args.polls)
+            codes = ", ".join(f"{count}x{code}" for code, count in sorted(statuses.items()))
+            print(f"  {mode:10s} {requests / elapsed:7.0f} req/s  {statements / requests:5.2f} statements/request  ({codes})")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
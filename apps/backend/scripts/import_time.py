@@ -0,0 +1,68 @@
+"""Import-time benchmark for worker boot.
+
+Imports a module in fresh interpreters under `-X importtime` and reports the median
+total plus the slowest top-level packages, so regressions in boot time show up before
+they reach autoscaling.
+
+    cd apps/backend
+    python scripts/import_time.py                  # app.main, 5 runs
+    python scripts/import_time.py app.providers.factory --runs 10 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _measure(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, for one fresh interpreter."""
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals: list[float] = []
+    packages: dict[str, list[int]] = defaultdict(list)
+    for _ in range(args.runs):
+        timings = _measure(args.module)
+        totals.append(timings[args.module] / 1000)
+        for name, cumulative in timings.items():
+            # Top-level packages only: their cumulative time already covers submodules
+            if "." not in name and name != args.module.split(".")[0]:
+                packages[name].append(cumulative)
+
+    print(f"{args.module}: median {statistics.median(totals):.0f} ms over {args.runs} runs "
+          f"(min {min(totals):.0f}, max {max(totals):.0f})")
+    slowest = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in slowest[: args.top]:
+        print(f"  {statistics.median(samples) / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Serialization CPU benchmark for conversation payloads and voice frames.
+
+Compares the response-model path (validate ORM objects, then dump) with the orjson
+column path the endpoints use, for one large conversation, and stdlib json with orjson
+for a voice audio frame. Times are process CPU per payload; no database is involved.
+
+    cd apps/backend
+    python scripts/serialization_bench.py                      # 2,000 messages
+    python scripts/serialization_bench.py --messages 10000 --repeat 5
+"""
+
+import argparse
+import base64
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.api.serialization import MESSAGE_FIELDS, conversation_dict, dumps, encode_ndjson, message_dicts
+from app.models.conversation import Conversation, Message
+from app.schemas.conversation import ConversationDetailResponse, MessageResponse
+
+
+def _conversation(count: int) -> Conversation:
+    started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    conversation = Conversation(
+        id=uuid.uuid4(),
+        child_id=uuid.uuid4(),
+        started_at=started,
+        ended_at=None,
+        language="en",
+        total_tokens=count * 40,
+        estimated_cost_usd=Decimal("0.1234"),
+        message_count=count,
+        audio_duration_ms=count * 1500,
+    )
+    conversation.messages = [
+        Message(
+            id=uuid.uuid4(),
+            conversation_id=conversation.id,
+            role="child" if i % 2 == 0 else "character",
+            content="Why is the sky blue? Tell me a story about dinosaurs. " * 3,
+            language="en",
+            emotion="happy",
+            created_at=started + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+    return conversation
+
+
+def _cpu_ms(fn, repeat: int) -> tuple[float, int]:
+    size = len(fn())  # warm-up, and the payload size
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) * 1000 / repeat, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conversation = _conversation(args.messages)
+    # What the endpoints select: message columns in response field order
+    rows = [tuple(getattr(m, field) for field in MESSAGE_FIELDS) for m in conversation.messages]
+    detail = TypeAdapter(ConversationDetailResponse)
+    messages = TypeAdapter(list[MessageResponse])
+    message = TypeAdapter(MessageResponse)
+
+    cases = [
+        (
+            "detail: response model",
+            lambda: detail.dump_json(detail.validate_python(conversation, from_attributes=True)),
+        ),
+        (
+            "detail: orjson columns",
+            lambda: dumps({**conversation_dict(conversation), "messages": message_dicts(rows)}),
+        ),
+        (
+            "ndjson: response model",
+            lambda: b"".join(
+                message.dump_json(m) + b"\n"
+                for m in messages.validate_python(conversation.messages, from_attributes=True)
+            ),
+        ),
+        ("ndjson: orjson columns", lambda: encode_ndjson(message_dicts(rows))),
+    ]
+    # Only a like-for-like comparison if the fast path produces the same bytes
+    assert cases[0][1]() == cases[1][1]() and cases[2][1]() == cases[3][1](), "fast path output differs"
+    print(f"{args.messages} messages, CPU per payload over {args.repeat} runs")
+    for name, fn in cases:
+        cpu, size = _cpu_ms(fn, args.repeat)
+        print(f"  {name:26s} {cpu:8.2f} ms  {size:>10,} bytes")
+
+    frame = {"type": "audio_chunk", "data": base64.b64encode(bytes(65532)).decode(), "format": "mp3", "segment": 0}
+    encoded = json.dumps(frame)
+    frame_cases = [
+        ("frame encode: json", lambda: json.dumps(frame)),
+        ("frame encode: orjson", lambda: orjson.dumps(frame).decode()),
+        ("frame decode: json", lambda: json.loads(encoded)["data"]),
+        ("frame decode: orjson", lambda: orjson.loads(encoded)["data"]),
+    ]
+    print("64 KiB audio_chunk frame, CPU per frame over 2,000 runs")
+    for name, fn in frame_cases:
+        cpu, _ = _cpu_ms(fn, 2000)
+        print(f"  {name:26s} {cpu:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Settings are read at import time, so point the app at a scratch database before anything
+# imports it. Set DATABASE_URL to run the suite against another database (e.g. PostgreSQL).
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    """Bring the test database to the latest migration once per run."""
+    from alembic import command
+    from alembic.config import Config
+
+    # No ini file: alembic.ini's logging config would silence the app's loggers
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture
+async def db(migrated):
+    from app.database import async_session, engine
+
+    async with async_session() as session:
+        yield session
+    # Every test runs on its own event loop; pooled connections must not outlive it
+    await engine.dispose()
+
+
+@pytest.fixture
+async def parent(db):
+    """A parent account with one child, and a bearer token for it."""
+    from app.auth.security import create_access_token
+    from app.models import Child, User
+
+    user = User(email=f"{uuid.uuid4().hex}@example.com", password_hash="x")
+    db.add(user)
+    await db.flush()
+    child = Child(user_id=user.id, name="Amy", age=5, primary_language="en")
+    db.add(child)
+    await db.commit()
+    return user, child, {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+
+@pytest.fixture
+async def client(db):
+    import httpx
+
+    from app.main import app
+
+    # The lifespan (warm-up, drain) is not run; requests go straight to the routes
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
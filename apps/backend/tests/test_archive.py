@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import ArchiveSegment, Conversation, Message
+from app.services import archive
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path))
+    return tmp_path
+
+
+async def _conversation(db, child, started_at, last_message_at, ended_at=None) -> Conversation:
+    conversation = Conversation(child_id=child.id, language="en", started_at=started_at, ended_at=ended_at)
+    db.add(conversation)
+    await db.flush()
+    db.add_all(
+        [
+            Message(conversation_id=conversation.id, role="child", content="hi", language="en", created_at=started_at),
+            Message(conversation_id=conversation.id, role="character", content="hello", language="en", created_at=last_message_at),
+        ]
+    )
+    await db.commit()
+    return conversation
+
+
+async def test_unended_conversations_are_archived_by_last_activity(db, parent):
+    _, child, _ = parent
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=settings.archive_after_days + 10)
+    abandoned = await _conversation(db, child, old, old + timedelta(minutes=5))
+    still_active = await _conversation(db, child, old, now - timedelta(days=1))
+    finished = await _conversation(db, child, old, old, ended_at=old + timedelta(minutes=1))
+
+    await archive.archive_old_conversations(now)
+
+    archived = set(
+        (await db.execute(select(Conversation.id).where(Conversation.archive_segment_id.is_not(None)))).scalars()
+    )
+    assert abandoned.id in archived
+    assert finished.id in archived
+    assert still_active.id not in archived
+
+
+async def test_deleting_a_child_removes_its_segments(db, parent, archive_dir):
+    _, child, _ = parent
+    old = datetime.now(timezone.utc) - timedelta(days=settings.archive_after_days + 10)
+    await _conversation(db, child, old, old, ended_at=old)
+    await archive.archive_old_conversations()
+    assert (archive_dir / str(child.id)).is_dir()
+
+    await db.delete(child)
+    await db.commit()
+    await asyncio.gather(*archive._cleanups)
+
+    assert not (archive_dir / str(child.id)).exists()
+    segments = await db.execute(select(ArchiveSegment).where(ArchiveSegment.child_id == child.id))
+    assert segments.first() is None
+
+
+async def test_conversation_claimed_by_another_archiver_is_skipped(db, parent):
+    _, child, _ = parent
+    # Commits below expire the child
+    child_id = child.id
+    old = datetime.now(timezone.utc) - timedelta(days=settings.archive_after_days + 10)
+    for n in range(3):
+        await _conversation(db, child, old + timedelta(minutes=n), old, ended_at=old + timedelta(minutes=n))
+    batch = list(
+        (await db.execute(select(Conversation).where(Conversation.child_id == child_id).order_by(Conversation.started_at)))
+        .scalars()
+    )
+    # Another worker archives the middle one after this batch was read
+    assert await archive._archive_child(child_id, batch[1:2]) == 1
+
+    assert await archive._archive_child(child_id, batch) == 2
+    db.expire_all()
+    rows = (await db.execute(select(Conversation).where(Conversation.child_id == child_id))).scalars().all()
+    assert len({row.archive_segment_id for row in rows}) == 2
+    for row in rows:
+        segment = await db.get(ArchiveSegment, row.archive_segment_id)
+        assert len(await archive.load_archived_messages(segment.path, row.id)) == 2
+    segments = (await db.execute(select(ArchiveSegment).where(ArchiveSegment.child_id == child_id))).scalars()
+    assert sorted(s.conversation_count for s in segments) == [1, 2]
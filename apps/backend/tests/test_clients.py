@@ -0,0 +1,21 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.providers import clients
+
+
+def test_racing_threads_share_one_client():
+    built = []
+
+    def build():
+        # Slow enough that the other thread looks up the key meanwhile
+        time.sleep(0.05)
+        built.append(object())
+        return built[-1]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda _: clients._shared("test", "sk-race", build), range(2)))
+
+    assert len(built) == 1
+    assert results[0] is results[1] is built[0]
+    clients._clients.pop(("test", clients.credential_scope("sk-race")))
@@ -0,0 +1,53 @@
+import uuid
+
+from starlette.requests import Request
+
+from app.api.caching import user_etag
+from app.services.coordination import coordination
+from app.services.cost import track_usage
+from app.services.data_version import data_versions
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/parent/usage/daily", "query_string": b"", "headers": []})
+
+
+async def test_no_etag_while_bump_is_pending(db, parent):
+    user, _, _ = parent
+    await data_versions.flush()
+    before = user_etag(_request(), user.id)
+    assert before is not None
+
+    data_versions._schedule_bump(user.id)
+    # The old tag must not be offered until the bump lands, or a poll would get a stale 304
+    assert user_etag(_request(), user.id) is None
+
+    await data_versions.flush()
+    after = user_etag(_request(), user.id)
+    assert after is not None and after != before
+
+
+async def test_commit_retires_the_old_etag(db, parent):
+    user, _, _ = parent
+    await data_versions.flush()
+    before = user_etag(_request(), user.id)
+
+    await track_usage(db, user.id, llm_tokens=1)
+    await db.commit()
+    assert user_etag(_request(), user.id) != before
+
+
+async def test_failed_bump_withholds_etag_until_next_version(monkeypatch):
+    user_id = uuid.uuid4()
+
+    async def broken_incr(key, amount=1):
+        raise ConnectionError("coordination backend down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(coordination, "incr", broken_incr)
+        data_versions._schedule_bump(user_id)
+        await data_versions.flush()
+    assert user_etag(_request(), user_id) is None
+
+    await data_versions.bump(user_id)
+    assert user_etag(_request(), user_id) is not None
@@ -0,0 +1,69 @@
+import orjson
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.api.parent import export
+from app.config import settings
+from app.models import Conversation, Message
+
+
+@pytest.fixture
+async def transcript(db, parent):
+    user, child, headers = parent
+    conversation = Conversation(child_id=child.id, language="en")
+    db.add(conversation)
+    await db.flush()
+    db.add_all(
+        Message(conversation_id=conversation.id, role=role, content=f"message {i}", language="en")
+        for i, role in enumerate(["child", "character"] * 2)
+    )
+    await db.commit()
+    return headers
+
+
+def _free_slots() -> int:
+    return export._export_slots._value
+
+
+async def test_export_streams_every_message_and_frees_its_slot(client, transcript):
+    response = await client.get("/api/parent/export", headers=transcript)
+    assert response.status_code == 200
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [row["content"] for row in rows] == [f"message {i}" for i in range(4)]
+    assert _free_slots() == settings.export_max_concurrent
+
+
+async def test_export_over_the_cap_is_refused(client, transcript):
+    for _ in range(settings.export_max_concurrent):
+        await export._export_slots.acquire()
+    try:
+        response = await client.get("/api/parent/export", headers=transcript)
+    finally:
+        for _ in range(settings.export_max_concurrent):
+            export._export_slots.release()
+    assert response.status_code == 429
+    assert _free_slots() == settings.export_max_concurrent
+
+
+async def test_failed_export_frees_its_slot(client, transcript):
+    response = await client.get(
+        "/api/parent/export", params={"child_id": "00000000-0000-0000-0000-000000000000"}, headers=transcript
+    )
+    assert response.status_code == 404
+    assert _free_slots() == settings.export_max_concurrent
+
+
+async def test_slot_is_freed_when_client_leaves_before_the_body():
+    async def body():
+        yield b"never sent"
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client gone")
+
+    await export._export_slots.acquire()
+    with pytest.raises(ClientDisconnect):
+        await export._ExportResponse(body())({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    assert _free_slots() == settings.export_max_concurrent
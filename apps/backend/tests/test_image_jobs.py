@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from app.config import settings
+from app.models.image_job import IMAGE_JOB_FAILED, IMAGE_JOB_QUEUED, IMAGE_JOB_RUNNING, ImageJob
+from app.providers.base import ImageProvider, ImageResponse
+from app.providers.resilience import ProviderUnavailableError
+from app.services import image_jobs as image_jobs_module
+from app.services.image_jobs import dedupe_key, image_jobs
+
+
+class _Provider(ImageProvider):
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+
+    async def generate(self, prompt: str, style: str = "") -> ImageResponse:
+        if self.error:
+            raise self.error
+        return ImageResponse(image_bytes=b"\x89PNG\r\n\x1a\n")
+
+    def name(self) -> str:
+        return "fake"
+
+    def model(self) -> str:
+        return "fake-1"
+
+
+@pytest.fixture
+async def provider(db, monkeypatch):
+    """Every account's image provider; the queue starts empty, since claims span accounts."""
+    provider = _Provider()
+
+    async def get_image_provider(user_id):
+        return provider
+
+    monkeypatch.setattr(image_jobs_module, "get_image_provider", get_image_provider)
+    await db.execute(delete(ImageJob))
+    await db.commit()
+    return provider
+
+
+def _job(user, prompt: str, **values) -> ImageJob:
+    return ImageJob(
+        user_id=user.id, dedupe_key=dedupe_key(prompt, "", "fake-1"), prompt=prompt, provider="fake", model="fake-1",
+        **values,
+    )
+
+
+async def _jobs(db, user_id) -> int:
+    return (await db.execute(select(func.count()).select_from(ImageJob).where(ImageJob.user_id == user_id))).scalar_one()
+
+
+async def test_resubmitting_the_same_picture_returns_the_existing_job(db, parent, provider):
+    user, _, _ = parent
+    job, created = await image_jobs.submit(db, user.id, "A red kite")
+    again, created_again = await image_jobs.submit(db, user.id, "  a RED   kite ")
+    assert created and not created_again
+    assert again.id == job.id
+
+
+async def test_racing_submit_returns_the_job_that_committed_first(db, parent, provider, monkeypatch):
+    user, _, _ = parent
+    # The rollback below expires everything loaded through this session
+    user_id = user.id
+    job, _ = await image_jobs.submit(db, user_id, "A red kite")
+    job_id = job.id
+
+    # The second submit looks before the first commits, so only the unique index stops it
+    lookup = image_jobs._existing
+    calls = 0
+
+    async def existing(*args):
+        nonlocal calls
+        calls += 1
+        return None if calls == 1 else await lookup(*args)
+
+    monkeypatch.setattr(image_jobs, "_existing", existing)
+    again, created = await image_jobs.submit(db, user_id, "A red kite")
+    assert not created and again.id == job_id
+    assert await _jobs(db, user_id) == 1
+
+
+async def test_a_failed_job_does_not_block_resubmitting(db, parent, provider):
+    user, _, _ = parent
+    job, _ = await image_jobs.submit(db, user.id, "A red kite")
+    await db.execute(update(ImageJob).where(ImageJob.id == job.id).values(status=IMAGE_JOB_FAILED))
+    await db.commit()
+    again, created = await image_jobs.submit(db, user.id, "A red kite")
+    assert created and again.id != job.id
+
+
+async def test_claim_takes_the_oldest_queued_job_once(db, parent, provider):
+    user, _, _ = parent
+    now = datetime.now(timezone.utc)
+    db.add_all([_job(user, "newer", created_at=now), _job(user, "older", created_at=now - timedelta(minutes=1))])
+    await db.commit()
+
+    first, second = await image_jobs._claim(), await image_jobs._claim()
+    assert (first.prompt, first.status, first.attempts) == ("older", IMAGE_JOB_RUNNING, 1)
+    assert second.prompt == "newer"
+    assert await image_jobs._claim() is None
+
+
+async def test_running_job_is_reclaimed_only_once_its_lease_expires(db, parent, provider):
+    user, _, _ = parent
+    db.add(_job(user, "A red kite"))
+    await db.commit()
+    job = await image_jobs._claim()
+    assert await image_jobs._claim() is None
+
+    # The worker holding it died
+    lapsed = datetime.now(timezone.utc) - timedelta(seconds=settings.image_job_lease_seconds + 1)
+    await db.execute(update(ImageJob).where(ImageJob.id == job.id).values(started_at=lapsed))
+    await db.commit()
+    reclaimed = await image_jobs._claim()
+    assert reclaimed.id == job.id and reclaimed.attempts == 2
+
+
+async def test_outage_sends_the_job_back_with_a_backoff(db, parent, provider):
+    user, _, _ = parent
+    provider.error = ProviderUnavailableError("image:fake", "circuit open", retry_after=1.0)
+    db.add(_job(user, "A red kite"))
+    await db.commit()
+
+    await image_jobs._run(await image_jobs._claim())
+    job = (await db.execute(select(ImageJob).where(ImageJob.user_id == user.id))).scalar_one()
+    assert job.status == IMAGE_JOB_QUEUED and job.attempts == 1
+    # The base delay outweighs the shorter hint
+    waited = job.not_before.replace(tzinfo=timezone.utc) - datetime.now(timezone.utc)
+    assert waited > timedelta(seconds=settings.image_job_retry_base_seconds - 5)
+    assert await image_jobs._claim() is None
+
+    await db.execute(
+        update(ImageJob).where(ImageJob.id == job.id).values(not_before=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    await db.commit()
+    retried = await image_jobs._claim()
+    assert retried.id == job.id and retried.attempts == 2
@@ -0,0 +1,64 @@
+from app.config import settings
+from app.providers.base import LLMProvider, LLMResponse, STTProvider, STTResponse, TTSProvider, TTSResponse
+from app.services import conversation as conversation_module
+from app.services.conversation import ConversationSession
+
+
+class _STT(STTProvider):
+    def __init__(self):
+        self.next_text = ""
+
+    async def transcribe(self, audio_bytes: bytes, language: str = "") -> STTResponse:
+        return STTResponse(text=self.next_text)
+
+    def name(self) -> str:
+        return "fake-stt"
+
+
+class _LLM(LLMProvider):
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    async def chat(self, messages, system_prompt: str = "") -> LLMResponse:
+        self.prompts.append(system_prompt)
+        return LLMResponse(text="That sounds like fun!")
+
+    def name(self) -> str:
+        return "fake-llm"
+
+
+class _TTS(TTSProvider):
+    async def synthesize(self, text, language="en", voice="", speed=None, audio_format="mp3") -> TTSResponse:
+        return TTSResponse(audio_bytes=b"audio", format=audio_format)
+
+    def name(self) -> str:
+        return "fake-tts"
+
+
+def _returning(provider):
+    async def get_provider(user_id):
+        return provider
+
+    return get_provider
+
+
+async def test_fact_from_the_first_turn_is_recalled_late_in_a_long_session(db, parent, monkeypatch):
+    user, child, _ = parent
+    stt, llm, tts = _STT(), _LLM(), _TTS()
+    for name, provider in [("get_stt_provider", stt), ("get_llm_provider", llm), ("get_tts_provider", tts)]:
+        monkeypatch.setattr(conversation_module, name, _returning(provider))
+    monkeypatch.setattr(settings, "speculative_tts_budget_chars", 0)
+
+    session = ConversationSession(db=db, child=child, user_id=user.id)
+    await session.start()
+    turns = ["My turtle is named Sheldon"] + [f"I counted to {n} today" for n in range(28)]
+    turns.append("Do you remember my turtle Sheldon?")
+    for text in turns:
+        stt.next_text = text
+        await session.process_audio(b"audio")
+
+    # Turn 1 left the replayed history long ago, yet still reaches the last prompt
+    assert len(session.history) <= settings.llm_history_messages
+    assert "Sheldon" not in " ".join(m.content for m in session.history[:-2])
+    assert "My turtle is named Sheldon" in llm.prompts[-1]
+    await session.end()
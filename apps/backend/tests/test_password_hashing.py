@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import update
+
+import app.auth.security as security
+from app.models import User
+
+HASH_SECONDS = 0.25
+
+
+class _SlowContext:
+    """Stands in for bcrypt: blocks its calling thread, releasing the GIL, for a fixed time."""
+
+    def hash(self, password: str) -> str:
+        time.sleep(HASH_SECONDS)
+        return f"slow${password}"
+
+    def verify(self, password: str, hashed: str) -> bool:
+        time.sleep(HASH_SECONDS)
+        return hashed == f"slow${password}"
+
+
+@pytest.fixture
+async def slow_hashing(monkeypatch):
+    monkeypatch.setattr(security, "pwd_context", _SlowContext())
+    # A fresh pool, so its semaphore belongs to this test's event loop
+    monkeypatch.setattr(security, "_hash_pool", security._HashPool(2, 64, 10.0))
+
+
+async def _max_loop_lag(work) -> tuple[float, list]:
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - started - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    try:
+        results = await work
+    finally:
+        done = True
+        await tick
+    return max(lags), results
+
+
+async def test_login_burst_keeps_event_loop_responsive(client, db, parent, slow_hashing):
+    user, _, _ = parent
+    await db.execute(update(User).where(User.id == user.id).values(password_hash="slow$pw"))
+    await db.commit()
+
+    logins = 8
+    lag, responses = await _max_loop_lag(
+        asyncio.gather(
+            *(client.post("/api/parent/auth/login", json={"email": user.email, "password": "pw"}) for _ in range(logins))
+        )
+    )
+    assert [r.status_code for r in responses] == [200] * logins
+    # Inline, each verify would stall the loop for the whole hash; eight in a row for two seconds
+    assert lag < HASH_SECONDS / 2
+
+
+async def test_full_queue_is_refused_with_503(monkeypatch, slow_hashing):
+    monkeypatch.setattr(security, "_hash_pool", security._HashPool(1, 1, 10.0))
+    results = await asyncio.gather(*(security.hash_password("pw") for _ in range(3)), return_exceptions=True)
+    refused = [r for r in results if isinstance(r, Exception)]
+    assert len(refused) == 1
+    assert refused[0].status_code == 503
@@ -0,0 +1,93 @@
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.models import Conversation, Message
+from app.providers.factory import _load_provider_configs
+from app.services.cost import track_usage
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite's")
+
+# A plain "SCAN <table>" reads every row; scans through an index (covering or ordered) are fine
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def assert_indexed(statements):
+    assert statements, "no queries were captured"
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+            scans = [row[3] for row in plan if _FULL_SCAN.match(row[3])]
+            assert not scans, f"{scans} in plan of:\n{statement}\n{[row[3] for row in plan]}"
+
+
+@pytest.fixture
+async def history(db, parent):
+    user, child, headers = parent
+    # Two conversations, so the listing has a second page
+    db.add(Conversation(child_id=child.id, language="en"))
+    conversation = Conversation(child_id=child.id, language="en")
+    db.add(conversation)
+    await db.flush()
+    db.add_all(
+        Message(conversation_id=conversation.id, role=role, content=f"message {i}", language="en")
+        for i, role in enumerate(["child", "character"] * 3)
+    )
+    await db.commit()
+    return user, child, conversation, headers
+
+
+async def test_parent_dashboard_queries_use_indexes(client, history):
+    user, child, conversation, headers = history
+    first_page = await client.get("/api/parent/conversations", params={"limit": 1}, headers=headers)
+    assert "X-Next-Cursor" in first_page.headers
+    urls = [
+        ("/api/parent/conversations", {}),
+        ("/api/parent/conversations", {"child_id": str(child.id)}),
+        ("/api/parent/conversations", {"cursor": first_page.headers["X-Next-Cursor"], "limit": 1}),
+        (f"/api/parent/conversations/{conversation.id}", {}),
+        (f"/api/parent/conversations/{conversation.id}/messages", {"limit": 2}),
+        ("/api/parent/children", {}),
+        ("/api/parent/usage/daily", {}),
+        ("/api/parent/usage/summary", {}),
+        ("/api/parent/providers", {}),
+    ]
+    for url, params in urls:
+        with captured_statements() as statements:
+            response = await client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, (url, response.text)
+        await assert_indexed(statements)
+
+
+async def test_provider_config_lookup_uses_index(parent):
+    user, _, _ = parent
+    with captured_statements() as statements:
+        await _load_provider_configs(user.id, "llm")
+    await assert_indexed(statements)
+
+
+async def test_usage_upsert_uses_index(db, parent):
+    user, _, _ = parent
+    with captured_statements() as statements:
+        await track_usage(db, user.id, llm_tokens=10, is_new_session=True)
+        await track_usage(db, user.id, llm_tokens=5)
+        await db.commit()
+    await assert_indexed(statements)
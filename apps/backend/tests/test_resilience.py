@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.providers import resilience
+from app.providers.resilience import CLOSED, HALF_OPEN, OPEN, ProviderUnavailableError, call_with_resilience
+
+
+def _open_breaker(endpoint: str, monkeypatch) -> resilience.CircuitBreaker:
+    monkeypatch.setattr(settings, "circuit_breaker_reset_seconds", 0.0)
+    breaker = resilience.get_breaker(endpoint)
+    for _ in range(settings.circuit_breaker_failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker
+
+
+async def test_cancelled_probe_releases_half_open_breaker(monkeypatch):
+    breaker = _open_breaker("test:cancelled_probe", monkeypatch)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(60)
+
+    probe = asyncio.create_task(call_with_resilience("test:cancelled_probe", hang))
+    await started.wait()
+    assert breaker.state == HALF_OPEN
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+
+    async def ok():
+        return "ok"
+
+    assert await call_with_resilience("test:cancelled_probe", ok) == "ok"
+    assert breaker.state == CLOSED
+
+
+async def test_open_breaker_short_circuits(monkeypatch):
+    breaker = _open_breaker("test:short_circuit", monkeypatch)
+    monkeypatch.setattr(settings, "circuit_breaker_reset_seconds", 60.0)
+    breaker._opened_at = time.monotonic()
+
+    async def never():
+        raise AssertionError("breaker let the call through")
+
+    with pytest.raises(ProviderUnavailableError) as raised:
+        await call_with_resilience("test:short_circuit", never)
+    assert raised.value.retry_after > 0
+
+
+async def test_deadline_learned_from_short_calls_grows_to_fit_a_long_one(monkeypatch):
+    monkeypatch.setattr(settings, "provider_timeout_min_seconds", 0.05)
+    monkeypatch.setattr(settings, "provider_timeout_max_seconds", 5.0)
+    monkeypatch.setattr(settings, "provider_retry_base_delay_seconds", 0.0)
+    tracker = resilience.get_latency_tracker("test:long_reply")
+    for _ in range(20):
+        tracker.record(0.001)
+    assert tracker.deadline() == 0.05
+
+    async def long_reply():
+        await asyncio.sleep(0.12)
+        return "done"
+
+    # Times out at 0.05s and 0.1s, then fits in 0.2s
+    assert await call_with_resilience("test:long_reply", long_reply) == "done"
+    assert resilience.get_breaker("test:long_reply").state == CLOSED
+    # The timeouts were counted, so the next long reply doesn't start from 0.05s again
+    assert tracker.deadline() > 0.12
+
+
+async def test_metrics_need_the_token(client, monkeypatch):
+    assert (await client.get("/metrics")).status_code == 404
+    monkeypatch.setattr(settings, "metrics_token", "scrape-me")
+    assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 404
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
@@ -0,0 +1,67 @@
+import time
+from decimal import Decimal
+
+from app.config import settings
+from app.providers import factory
+from app.providers.base import LLMMessage, LLMProvider, LLMResponse
+from app.providers.llm import routing
+from app.providers.llm.routing import LATENCY_WINDOW_SECONDS, RoutedLLMProvider
+
+HARD_TURN = [LLMMessage(role="user", content="Why is the sky blue?")]
+
+
+class _LLM(LLMProvider):
+    def __init__(self, family: str, model: str):
+        self._family = family
+        self._model = model
+
+    async def chat(self, messages: list[LLMMessage], system_prompt: str = "") -> LLMResponse:
+        return LLMResponse(text="", model=self._model)
+
+    def name(self) -> str:
+        return self._family
+
+    def model(self) -> str:
+        return self._model
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
+        return Decimal("0")
+
+
+def test_slow_strong_model_is_tried_again_once_its_samples_expire(monkeypatch):
+    router = RoutedLLMProvider(_LLM("test-slow", "fast"), _LLM("test-slow", "strong"), {})
+    for _ in range(20):
+        routing._tracker("test-slow", "strong").record(routing.DEFAULT_THRESHOLDS["strong_max_p95_seconds"] + 1)
+    assert router.route(HARD_TURN)[1].reason == "strong_too_slow"
+
+    # Nothing is routed to it meanwhile, so only time can clear the slow samples
+    later = time.monotonic() + LATENCY_WINDOW_SECONDS + 1
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    provider, decision = router.route(HARD_TURN)
+    assert decision.tier == "strong" and provider.model() == "strong"
+
+
+async def test_account_threshold_overrides_win_over_vendor_defaults(db, parent, client, monkeypatch):
+    user, _, headers = parent
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "anthropic_api_key", "")
+    # The vendor defaults send this turn to the strong model
+    assert (await factory.get_llm_provider(user.id)).route(HARD_TURN)[1].tier == "strong"
+
+    response = await client.post(
+        "/api/parent/providers",
+        json={"provider_type": "llm", "provider_name": "openai", "config_json": {"routing_thresholds": {"strong_max_cost_usd": 0}}},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert (await factory.get_llm_provider(user.id)).route(HARD_TURN)[1].reason == "strong_too_costly"
+
+
+async def test_unknown_routing_threshold_is_rejected(parent, client):
+    _, _, headers = parent
+    response = await client.post(
+        "/api/parent/providers",
+        json={"provider_type": "llm", "provider_name": "openai", "config_json": {"routing_thresholds": {"strong_min_words": 3}}},
+        headers=headers,
+    )
+    assert response.status_code == 422
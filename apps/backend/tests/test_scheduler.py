@@ -0,0 +1,69 @@
+import asyncio
+
+from app.config import settings
+from app.services.scheduler import PRIORITY_NEW_TURN, ProviderScheduler
+
+
+def _scheduler(monkeypatch, concurrency: int) -> ProviderScheduler:
+    monkeypatch.setattr(settings, "provider_concurrency_limits", {"test": concurrency})
+    monkeypatch.setattr(settings, "provider_tpm_limits", {})
+    return ProviderScheduler()
+
+
+async def test_release_skips_waiter_cancelled_in_same_tick(monkeypatch):
+    scheduler = _scheduler(monkeypatch, 1)
+    holding, release = asyncio.Event(), asyncio.Event()
+
+    async def holder():
+        async with scheduler.slot("test", "", family="a"):
+            holding.set()
+            await release.wait()
+
+    async def queued():
+        async with scheduler.slot("test", "", family="b"):
+            pass
+
+    first = asyncio.create_task(holder())
+    await holding.wait()
+    second = asyncio.create_task(queued())
+    await asyncio.sleep(0)
+    # The holder releases and the queued waiter is cancelled before either runs again
+    release.set()
+    second.cancel()
+    await asyncio.gather(first, second, return_exceptions=True)
+    assert first.exception() is None
+
+    lane = scheduler._lanes["test"]
+    assert lane.in_flight == 0
+    async with asyncio.timeout(1):
+        async with scheduler.slot("test", "", family="c"):
+            pass
+
+
+async def test_family_tags_are_pruned_once_served(monkeypatch):
+    scheduler = _scheduler(monkeypatch, 1)
+    for family in range(100):
+        async with scheduler.slot("test", "", family=family, priority=PRIORITY_NEW_TURN):
+            pass
+    assert scheduler._lanes["test"].family_tags == {}
+
+
+async def test_families_are_served_fairly(monkeypatch):
+    scheduler = _scheduler(monkeypatch, 1)
+    order = []
+    gate = asyncio.Event()
+
+    async def call(family):
+        async with scheduler.slot("test", "", family=family):
+            order.append(family)
+            await gate.wait()
+
+    blocker = asyncio.create_task(call("blocker"))
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(call("busy")) for _ in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("quiet")))
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *tasks)
+    assert order.index("quiet") < 3
@@ -0,0 +1,83 @@
+import asyncio
+import base64
+import uuid
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from app.api.ws import voice
+from app.models import Child
+from app.providers.base import TTSResponse
+from app.providers.tts.chunked import SegmentedSynthesis, split_for_tts
+from app.services.conversation import ConversationSession
+
+
+def test_split_handles_chinese_and_latin_punctuation():
+    text = "你好！今天天氣很好。我們去公園玩吧？ Sure thing. Let's go!"
+    chunks = split_for_tts(text, max_chars=12, min_chars=1)
+    assert len(chunks) > 1
+    assert "".join(chunks).replace(" ", "") == text.replace(" ", "")
+
+
+def _session() -> ConversationSession:
+    child = Child(name="Amy", age=5, primary_language="en", character_id="bear", learning_languages=["en"])
+    return ConversationSession(db=None, child=child, user_id=uuid.uuid4())
+
+
+async def _slow_synthesize(chunk: str) -> TTSResponse:
+    await asyncio.sleep(0.01 if chunk == "one." else 60)
+    return TTSResponse(audio_bytes=chunk.encode(), cost_usd=Decimal("0.01"))
+
+
+async def test_deliver_stops_synthesis_when_sink_fails_before_iterating():
+    speech = SegmentedSynthesis(_slow_synthesize, ["one.", "two.", "three."], concurrency=3)
+
+    async def broken_sink(head, segments):
+        raise ConnectionError("socket closed")
+
+    with pytest.raises(ConnectionError):
+        await _session()._deliver({"text": "one. two. three."}, speech, broken_sink, "mp3")
+    assert all(task.done() for task in speech._tasks)
+
+
+async def test_deliver_stops_synthesis_when_sink_abandons_stream():
+    speech = SegmentedSynthesis(_slow_synthesize, ["one.", "two.", "three."], concurrency=3)
+
+    async def first_only(head, segments):
+        async for segment in segments:
+            return
+
+    await _session()._deliver({"text": "one. two. three."}, speech, first_only, "mp3")
+    assert all(task.done() for task in speech._tasks)
+    assert speech.cost_usd == Decimal("0.01")
+
+
+async def test_each_segment_arrives_whole_in_its_own_frames(monkeypatch):
+    # Lengths that aren't multiples of 3, so an aligned cut would leave a tail to carry over
+    clips = [bytes([i]) * n for i, n in enumerate([7, 11, 4])]
+    monkeypatch.setattr(voice, "AUDIO_CHUNK_SIZE", 6)
+
+    async def segments():
+        for i, clip in enumerate(clips):
+            yield TTSResponse(audio_bytes=clip, segment_index=i, segment_count=len(clips))
+
+    class _Socket:
+        def __init__(self):
+            self.frames = []
+
+        async def send_text(self, text):
+            self.frames.append(orjson.loads(text))
+
+    socket = _Socket()
+    await voice._stream_response(socket, {"text": "hi", "format": "mp3"}, segments())
+
+    received: dict[int, list[str]] = {}
+    for frame in socket.frames:
+        if frame["type"] == "audio_chunk":
+            received.setdefault(frame["segment"], []).append(frame["data"])
+        elif frame["type"] == "segment_end":
+            # Complete by the time it is announced; clients join its strings, then decode
+            assert base64.b64decode("".join(received[frame["segment"]])) == clips[frame["segment"]]
+    assert sorted(received) == [0, 1, 2]
+    assert socket.frames[-1]["type"] == "audio_end"
@@ -0,0 +1,99 @@
+import asyncio
+from decimal import Decimal
+
+from app.providers.base import TTSProvider, TTSResponse
+from app.providers.coalescing import CoalescingTTSProvider
+from app.services.singleflight import SingleFlight
+
+
+class _Gate:
+    """A call that blocks until released, counting how often it ran and whether it was cancelled."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "shared"
+
+
+async def _waiting(flight: SingleFlight, gate: _Gate, count: int) -> list[asyncio.Task]:
+    waiters = [asyncio.create_task(flight.do("key", gate)) for _ in range(count)]
+    await asyncio.sleep(0)
+    return waiters
+
+
+async def test_cancelled_waiter_leaves_the_others_their_result():
+    flight, gate = SingleFlight("test"), _Gate()
+    first, *others = await _waiting(flight, gate, 3)
+    first.cancel()
+    await asyncio.sleep(0)
+    gate.release.set()
+
+    assert await asyncio.gather(*others) == ["shared", "shared"]
+    assert first.cancelled() and gate.calls == 1 and not gate.cancelled
+
+
+async def test_shared_call_is_cancelled_with_its_last_waiter():
+    flight, gate = SingleFlight("test"), _Gate()
+    waiters = await _waiting(flight, gate, 2)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert gate.cancelled
+
+    # A later caller starts afresh rather than joining the cancelled call
+    gate.release.set()
+    assert await flight.do("key", gate) == "shared"
+    assert gate.calls == 2
+
+
+async def test_every_waiter_gets_the_exception():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise ConnectionError("backend down")
+
+    waiters = [asyncio.create_task(flight.do("key", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+class _TTS(TTSProvider):
+    def __init__(self):
+        self.calls = 0
+
+    async def synthesize(self, text, language="en", voice="", speed=None, audio_format="mp3") -> TTSResponse:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return TTSResponse(audio_bytes=b"hello", cost_usd=Decimal("0.02"))
+
+    def name(self) -> str:
+        return "fake-tts"
+
+
+async def test_coalesced_synthesis_is_billed_once():
+    inner = _TTS()
+    tts = CoalescingTTSProvider(inner, scope="test-billing")
+    responses = await asyncio.gather(*(tts.synthesize("Hi Amy!") for _ in range(3)))
+
+    assert inner.calls == 1
+    assert all(response.audio_bytes == b"hello" for response in responses)
+    assert sum(response.cost_usd for response in responses) == Decimal("0.02")
+
+
+async def test_uncoalesced_synthesis_keeps_its_cost():
+    tts = CoalescingTTSProvider(_TTS(), scope="test-single")
+    assert (await tts.synthesize("Bye Amy!")).cost_usd == Decimal("0.02")
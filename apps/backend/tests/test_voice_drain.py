@@ -0,0 +1,56 @@
+import asyncio
+
+import orjson
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.ws.voice import voice_websocket
+from app.auth.security import create_access_token
+from app.services.session_store import live_sessions
+
+
+class _Socket:
+    """Just enough of a WebSocket for the voice handler, driven from the test's own loop."""
+
+    def __init__(self):
+        self.incoming: asyncio.Queue[str | None] = asyncio.Queue()
+        self.sent: list[dict] = []
+        self.closed_with: int | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(orjson.loads(text))
+
+    async def receive_text(self) -> str:
+        text = await self.incoming.get()
+        if text is None or self.closed_with is not None:
+            raise WebSocketDisconnect(self.closed_with or 1000)
+        return text
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+        self.incoming.put_nowait(None)
+
+    def send(self, message: dict) -> None:
+        self.incoming.put_nowait(orjson.dumps(message).decode())
+
+
+async def test_message_arriving_during_drain_gets_reconnect_not_a_turn(parent, monkeypatch):
+    user, child, _ = parent
+    socket = _Socket()
+    handler = asyncio.create_task(
+        voice_websocket(socket, child.id, token=create_access_token(user.id), resume=None, formats="")
+    )
+    while not socket.sent:
+        await asyncio.sleep(0.01)
+    started = socket.sent[0]
+    assert started["type"] == "session_started"
+
+    # The handler is idle in receive when the drain begins
+    monkeypatch.setattr(live_sessions, "draining", True)
+    socket.send({"type": "audio_end"})
+    await asyncio.wait_for(handler, 5)
+
+    assert socket.sent[1:] == [{"type": "reconnect", "conversation_id": started["conversation_id"]}]
+    assert socket.closed_with == 1012
@@ -1,4 +1,5 @@
 import { useState, useRef, useCallback, useEffect } from "react";
+import { Platform } from "react-native";
 import { WS_BASE_URL } from "../constants/api";
 import { getToken } from "../services/api";
 import { AudioManager, RecordingManager } from "../services/audioManager";
@@ -21,6 +22,13 @@ export interface VoiceSessionState {
   conversationId: string | null;
 }
 
+// Close code of a server that is restarting; the session continues on a new connection
+const SERVICE_RESTART = 1012;
+const RECONNECT_DELAY_MS = 500;
+// TTS formats we can play, most preferred first: Opus is the smallest over cellular,
+// but iOS has no Ogg Opus playback
+const AUDIO_FORMATS = Platform.OS === "android" ? "opus,mp3" : "mp3";
+
 export function useVoiceSession(childId: string) {
   const [state, setState] = useState<VoiceSessionState>({
     stage: "idle",
@@ -35,16 +43,22 @@ export function useVoiceSession(childId: string) {
   const wsRef = useRef<WebSocket | null>(null);
   const audioManagerRef = useRef(new AudioManager());
   const recordingManagerRef = useRef(new RecordingManager());
-  const audioChunksRef = useRef<string[]>([]);
+  // Base64 audio per TTS segment
+  const audioChunksRef = useRef<string[][]>([]);
   const audioFormatRef = useRef("mp3");
   const amplitudeCallbackRef = useRef<((amp: number) => void) | null>(null);
+  const conversationIdRef = useRef<string | null>(null);
 
   // Connect WebSocket
   const connect = useCallback(async () => {
     const token = await getToken();
     if (!token || !childId) return;
 
-    const ws = new WebSocket(`${WS_BASE_URL}/ws/voice/${childId}?token=${token}`);
+    // Reconnects carry the previous conversation so the backend can resume it
+    const resume = conversationIdRef.current ? `&resume=${conversationIdRef.current}` : "";
+    const ws = new WebSocket(
+      `${WS_BASE_URL}/ws/voice/${childId}?token=${token}&formats=${AUDIO_FORMATS}${resume}`
+    );
     wsRef.current = ws;
 
     ws.onopen = () => {
@@ -56,6 +70,7 @@ export function useVoiceSession(childId: string) {
 
       switch (msg.type) {
         case "session_started":
+          conversationIdRef.current = msg.conversation_id;
           setState((s) => ({ ...s, conversationId: msg.conversation_id }));
           break;
 
@@ -65,6 +80,7 @@ export function useVoiceSession(childId: string) {
 
         case "response_start":
           audioChunksRef.current = [];
+          audioFormatRef.current = msg.format || "mp3";
           setState((s) => ({
             ...s,
             stage: "speaking",
@@ -75,17 +91,20 @@ export function useVoiceSession(childId: string) {
           break;
 
         case "audio_chunk":
-          audioChunksRef.current.push(msg.data);
-          audioFormatRef.current = msg.format || "mp3";
+          (audioChunksRef.current[msg.segment ?? 0] ??= []).push(msg.data);
           break;
 
-        case "audio_end":
-          setState((s) => ({ ...s, transcript: msg.transcript || "" }));
-          // Play collected audio
-          await audioManagerRef.current.playAudioChunks(
-            audioChunksRef.current,
+        case "segment_end":
+          // Play each segment as soon as it is complete, while later ones still arrive
+          audioManagerRef.current.enqueueSegment(
+            audioChunksRef.current[msg.segment] ?? [],
             audioFormatRef.current
           );
+          break;
+
+        case "audio_end":
+          setState((s) => ({ ...s, transcript: msg.transcript || "" }));
+          await audioManagerRef.current.whenPlayed();
           // After playback, go back to idle
           setState((s) => ({ ...s, stage: "idle" }));
           break;
@@ -94,6 +113,11 @@ export function useVoiceSession(childId: string) {
           setState((s) => ({ ...s, stage: "idle" }));
           break;
 
+        case "reconnect":
+          // The server is draining; the close that follows triggers the reconnect
+          if (msg.conversation_id) conversationIdRef.current = msg.conversation_id;
+          break;
+
         case "error":
           setState((s) => ({ ...s, error: msg.message, stage: "idle" }));
           break;
@@ -104,8 +128,11 @@ export function useVoiceSession(childId: string) {
       setState((s) => ({ ...s, error: "Connection error", stage: "error" }));
     };
 
-    ws.onclose = () => {
+    ws.onclose = (event) => {
       wsRef.current = null;
+      if (event.code === SERVICE_RESTART) {
+        setTimeout(connect, RECONNECT_DELAY_MS);
+      }
     };
 
     await audioManagerRef.current.initialize();
@@ -7,6 +7,12 @@ export class AudioManager {
   private isPlaying = false;
   private amplitudeCallback: ((amplitude: number) => void) | null = null;
   private animationFrame: ReturnType<typeof setInterval> | null = null;
+  // Segments play one after another on this chain; stopping bumps the generation,
+  // which skips whatever is still queued
+  private playback: Promise<void> = Promise.resolve();
+  private generation = 0;
+  private segmentFiles = 0;
+  private endSegment: (() => void) | null = null;
 
   async initialize() {
     await Audio.setAudioModeAsync({
@@ -21,49 +27,68 @@ export class AudioManager {
     this.amplitudeCallback = callback;
   }
 
-  async playAudioChunks(base64Chunks: string[], format: string = "mp3") {
-    // Combine all chunks into one base64 string
-    const combined = base64Chunks.join("");
-    if (!combined) return;
-
-    try {
-      // Write to temp file
-      const ext = format === "mp3" ? "mp3" : "wav";
-      const uri = `${FileSystem.cacheDirectory}response_${Date.now()}.${ext}`;
-      await FileSystem.writeAsStringAsync(uri, combined, {
-        encoding: FileSystem.EncodingType.Base64,
+  /**
+   * Queue one complete TTS segment (its base64 frames) for playback. Segments play in
+   * the order they are queued, the first one at once, while later ones are still arriving.
+   */
+  enqueueSegment(chunks: string[], format: string = "mp3") {
+    const data = chunks.join("");
+    if (!data) return;
+    const generation = this.generation;
+    const ext = format === "opus" ? "ogg" : format === "mp3" ? "mp3" : "wav";
+    const uri = `${FileSystem.cacheDirectory}response_${Date.now()}_${this.segmentFiles++}.${ext}`;
+    const written = FileSystem.writeAsStringAsync(uri, data, {
+      encoding: FileSystem.EncodingType.Base64,
+    });
+    this.playback = this.playback
+      .then(async () => {
+        await written;
+        await this.playSegment(uri, generation);
+      })
+      .catch((err) => {
+        console.error("Audio playback error:", err);
       });
+  }
 
-      // Unload previous sound
-      if (this.sound) {
-        await this.sound.unloadAsync();
-        this.sound = null;
-      }
+  /** Resolves once every queued segment has played (or playback was stopped). */
+  async whenPlayed() {
+    await this.playback;
+  }
 
-      const { sound } = await Audio.Sound.createAsync({ uri });
-      this.sound = sound;
-      this.isPlaying = true;
+  private async playSegment(uri: string, generation: number) {
+    if (generation !== this.generation) return;
+    // Unload previous sound
+    if (this.sound) {
+      await this.sound.unloadAsync();
+      this.sound = null;
+    }
 
-      // Simulate amplitude from playback for lip-sync
-      this.startAmplitudeSimulation();
+    const { sound } = await Audio.Sound.createAsync({ uri });
+    if (generation !== this.generation) {
+      await sound.unloadAsync();
+      return;
+    }
+    this.sound = sound;
+    this.isPlaying = true;
+    // Simulate amplitude from playback for lip-sync
+    this.startAmplitudeSimulation();
 
+    await new Promise<void>((resolve) => {
+      this.endSegment = resolve;
       sound.setOnPlaybackStatusUpdate((status) => {
-        if (status.isLoaded && status.didJustFinish) {
-          this.isPlaying = false;
-          this.stopAmplitudeSimulation();
-          this.amplitudeCallback?.(0);
-        }
+        if (status.isLoaded && status.didJustFinish) resolve();
       });
-
-      await sound.playAsync();
-    } catch (err) {
-      console.error("Audio playback error:", err);
-      this.isPlaying = false;
-      this.stopAmplitudeSimulation();
-    }
+      sound.playAsync().catch(() => resolve());
+    });
+    this.endSegment = null;
+    if (generation !== this.generation) return;
+    this.isPlaying = false;
+    this.stopAmplitudeSimulation();
+    this.amplitudeCallback?.(0);
   }
 
   private startAmplitudeSimulation() {
+    if (this.animationFrame) return;
     // Simulate mouth movement with a simple oscillation
     // In production, extract actual amplitude from audio data
     this.animationFrame = setInterval(() => {
@@ -83,6 +108,8 @@ export class AudioManager {
   }
 
   async stopPlayback() {
+    this.generation++;
+    this.endSegment?.();
     this.isPlaying = false;
     this.stopAmplitudeSimulation();
     if (this.sound) {
@@ -34,6 +34,9 @@ interface VoiceSessionActions {
 }
 
 const CHUNK_SIZE = 64 * 1024; // 64KB for sending base64 audio
+// Close code of a server that is restarting; the session continues on a new connection
+const SERVICE_RESTART = 1012;
+const RECONNECT_DELAY_MS = 500;
 
 export function useVoiceSession(
   options: VoiceSessionOptions
@@ -43,6 +46,8 @@ export function useVoiceSession(
   const [mouthOpen, setMouthOpen] = useState(0);
   const [transcript, setTranscript] = useState("");
   const [error, setError] = useState<string | null>(null);
+  // Bumped to open a fresh connection when the server asks us to reconnect
+  const [connection, setConnection] = useState(0);
 
   const wsRef = useRef<WebSocket | null>(null);
   const audioManagerRef = useRef(new WebAudioManager());
@@ -52,9 +57,15 @@ export function useVoiceSession(
   // Connect WebSocket
   useEffect(() => {
     const { childId, token } = options;
-    const url = `${WS_BASE}/ws/voice/${childId}?token=${encodeURIComponent(token)}`;
+    // Reconnects carry the previous conversation so the backend can resume it
+    const resumeKey = `voice-conversation:${childId}`;
+    const previous = sessionStorage.getItem(resumeKey);
+    const resume = previous ? `&resume=${encodeURIComponent(previous)}` : "";
+    const formats = WebAudioManager.supportedFormats();
+    const url = `${WS_BASE}/ws/voice/${childId}?token=${encodeURIComponent(token)}&formats=${formats}${resume}`;
     const ws = new WebSocket(url);
     wsRef.current = ws;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
 
     const audioManager = audioManagerRef.current;
     audioManager.onAmplitude = (v) => setMouthOpen(v);
@@ -71,7 +82,11 @@ export function useVoiceSession(
       const type = msg.type as string;
 
       if (type === "session_started") {
+        sessionStorage.setItem(resumeKey, msg.conversation_id as string);
         setStage("idle");
+      } else if (type === "reconnect") {
+        // The server is draining; the close that follows triggers the reconnect
+        if (msg.conversation_id) sessionStorage.setItem(resumeKey, msg.conversation_id as string);
       } else if (type === "processing") {
         const s = msg.stage as string;
         if (s === "listening") setStage("listening");
@@ -83,10 +98,13 @@ export function useVoiceSession(
         audioFormatRef.current = fmt;
         audioManager.beginReceiving(fmt);
       } else if (type === "audio_chunk") {
-        audioManager.receiveChunk(msg.data as string);
+        audioManager.receiveChunk(msg.data as string, msg.segment as number | undefined);
+      } else if (type === "segment_end") {
+        // Play each segment as soon as it is complete, while later ones still arrive
+        audioManager.segmentComplete(msg.segment as number);
       } else if (type === "audio_end") {
         setTranscript((msg.transcript as string) || "");
-        await audioManager.play();
+        await audioManager.finish();
       } else if (type === "error") {
         setError((msg.message as string) || "Unknown error");
         setStage("error");
@@ -98,16 +116,21 @@ export function useVoiceSession(
       setStage("error");
     };
 
-    ws.onclose = () => {
+    ws.onclose = (event) => {
+      if (event.code === SERVICE_RESTART) {
+        reconnectTimer = setTimeout(() => setConnection((n) => n + 1), RECONNECT_DELAY_MS);
+        return;
+      }
       if (stage !== "error") setStage("idle");
     };
 
     return () => {
+      clearTimeout(reconnectTimer);
       ws.close();
       audioManager.stop();
     };
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [options.childId, options.token]);
+  }, [options.childId, options.token, connection]);
 
   const sendWs = useCallback((payload: unknown) => {
     if (wsRef.current?.readyState === WebSocket.OPEN) {
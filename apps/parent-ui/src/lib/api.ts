@@ -249,6 +249,8 @@ export interface Conversation {
   language: string | null;
   total_tokens: number;
   estimated_cost_usd: number;
+  message_count: number;
+  audio_duration_ms: number;
 }
 
 export interface ConversationDetail extends Conversation {
@@ -63,26 +63,55 @@ export class WebAudioManager {
   private objectUrls: string[] = [];
   private amplitudeTimer: ReturnType<typeof setInterval> | null = null;
 
-  private chunks: Blob[] = [];
+  // Received audio per TTS segment
+  private chunks: Blob[][] = [];
   private mimeType = "audio/mpeg";
+  // Complete segments play one after another on this chain; stopping bumps the
+  // generation, which skips whatever is still queued
+  private playback: Promise<void> = Promise.resolve();
+  private generation = 0;
+  private endCurrent: (() => void) | null = null;
 
   onAmplitude?: (value: number) => void;
   onPlaybackEnd?: () => void;
 
+  /** TTS formats this browser plays, most preferred first; Opus is the smallest on the wire. */
+  static supportedFormats(): string {
+    const opus = new Audio().canPlayType('audio/ogg; codecs="opus"') !== "";
+    return opus ? "opus,mp3" : "mp3";
+  }
+
   beginReceiving(format: string) {
     this.chunks = [];
-    this.mimeType = format === "mp3" ? "audio/mpeg" : "audio/wav";
+    this.mimeType = format === "mp3" ? "audio/mpeg" : format === "opus" ? "audio/ogg" : "audio/wav";
   }
 
-  receiveChunk(base64: string) {
+  receiveChunk(base64: string, segment = 0) {
     const binary = atob(base64);
     const bytes = new Uint8Array(binary.length);
     for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
-    this.chunks.push(new Blob([bytes], { type: this.mimeType }));
+    (this.chunks[segment] ??= []).push(new Blob([bytes], { type: this.mimeType }));
+  }
+
+  /** Queue a complete segment; the first plays at once, while later ones are still arriving. */
+  segmentComplete(segment: number) {
+    const part = this.chunks[segment];
+    if (!part?.length) return;
+    const blob = new Blob(part, { type: this.mimeType });
+    const generation = this.generation;
+    this.playback = this.playback
+      .then(() => (generation === this.generation ? this._playBlob(blob) : undefined))
+      .catch(() => undefined);
+  }
+
+  /** Wait for every queued segment to play, then report the end unless playback was stopped. */
+  async finish(): Promise<void> {
+    const generation = this.generation;
+    await this.playback;
+    if (generation === this.generation) this.onPlaybackEnd?.();
   }
 
-  async play(): Promise<void> {
-    const blob = new Blob(this.chunks, { type: this.mimeType });
+  private async _playBlob(blob: Blob): Promise<void> {
     const url = URL.createObjectURL(blob);
     this.objectUrls.push(url);
 
@@ -100,9 +129,11 @@ export class WebAudioManager {
     this._startAmplitudePolling();
 
     return new Promise((resolve) => {
+      this.endCurrent = resolve;
       audio.onended = () => {
         this._stopAmplitudePolling();
-        this.onPlaybackEnd?.();
+        this.audioContext?.close();
+        this.audioContext = null;
         resolve();
       };
       audio.onerror = () => {
@@ -114,6 +145,9 @@ export class WebAudioManager {
   }
 
   stop() {
+    this.generation++;
+    this.endCurrent?.();
+    this.endCurrent = null;
     this.currentAudio?.pause();
     this.currentAudio = null;
     this._stopAmplitudePolling();